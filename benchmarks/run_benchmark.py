@@ -0,0 +1,179 @@
+"""离线音频链路基准测试
+
+在本机启动替身服务器和虚拟音频设备，用正式的协议与编解码代码跑若干轮对话，
+报告唤醒到监听、端点、stt、tts start、首包播放等延迟以及 CPU / 内存占用。
+无需声卡和云端服务，可在无界面的 Linux 机器上运行，用于发现性能回退。
+
+用法（在项目根目录执行）:
+    python -m benchmarks.run_benchmark --protocol websocket --turns 5
+    python -m benchmarks.run_benchmark --protocol mqtt --input-wav say.wav --tts-wav reply.wav \\
+        --report bench.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+
+import psutil
+
+from src.utils.logging_config import get_logger, setup_logging
+from src.utils.opus_loader import setup_opus
+
+setup_opus()
+
+from src.audio_backends.file_backend import load_wav_pcm  # noqa: E402
+from src.constants.constants import AudioConfig  # noqa: E402
+from src.headless.session_audio import summarize  # noqa: E402
+from src.utils.latency_tracer import LatencyTracer  # noqa: E402
+from benchmarks import virtual_audio  # noqa: E402
+
+logger = get_logger(__name__)
+
+
+class ResourceMonitor:
+    """采样本进程的 CPU 占用和常驻内存"""
+
+    def __init__(self, interval=0.1):
+        self.process = psutil.Process()
+        self.interval = interval
+        self.peak_rss = 0
+        self._running = False
+        self._thread = None
+        self._cpu_start = None
+        self._wall_start = None
+        self.cpu_percent = 0.0
+
+    def start(self):
+        self._running = True
+        times = self.process.cpu_times()
+        self._cpu_start = times.user + times.system
+        self._wall_start = time.monotonic()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        times = self.process.cpu_times()
+        wall = time.monotonic() - self._wall_start
+        if wall > 0:
+            self.cpu_percent = (times.user + times.system - self._cpu_start) / wall * 100
+
+    def _sample(self):
+        while self._running:
+            self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+            time.sleep(self.interval)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="离线音频链路基准测试")
+    parser.add_argument("--protocol", choices=["websocket", "mqtt"], default="websocket",
+                        help="通信协议")
+    parser.add_argument("--turns", type=int, default=5, help="对话轮数")
+    parser.add_argument("--input-wav", help="用户发言WAV（默认合成2秒类语音信号）")
+    parser.add_argument("--tts-wav", help="服务器回复WAV（默认合成1.5秒类语音信号）")
+    parser.add_argument("--processing-delay", type=float, default=0.3,
+                        help="模拟服务器识别/生成耗时（秒）")
+    parser.add_argument("--turn-gap", type=float, default=0.5, help="两轮之间的间隔（秒）")
+    parser.add_argument("--report", help="结果JSON输出路径")
+    parser.add_argument("--record", help="把播放设备收到的音频保存为WAV")
+    parser.add_argument("--verbose", action="store_true", help="输出详细日志")
+    return parser.parse_args()
+
+
+async def run(args):
+    from benchmarks.stub_server import StubMqttServer, StubWebsocketServer
+    from src.headless.headless_session import HeadlessSession
+
+    loop = asyncio.get_running_loop()
+
+    input_pcm = (load_wav_pcm(args.input_wav, AudioConfig.INPUT_SAMPLE_RATE)
+                 if args.input_wav else
+                 virtual_audio.synth_speech(2.0, AudioConfig.INPUT_SAMPLE_RATE))
+    tts_pcm = (load_wav_pcm(args.tts_wav, AudioConfig.OUTPUT_SAMPLE_RATE)
+               if args.tts_wav else
+               virtual_audio.synth_speech(1.5, AudioConfig.OUTPUT_SAMPLE_RATE, seed=1))
+
+    server_options = dict(sample_rate=AudioConfig.OUTPUT_SAMPLE_RATE,
+                          frame_duration=AudioConfig.FRAME_DURATION,
+                          processing_delay=args.processing_delay)
+
+    # 替身服务器地址直接交给会话，不修改用户的配置
+    if args.protocol == "mqtt":
+        server = StubMqttServer(tts_pcm, **server_options)
+        await server.start()
+        endpoint = dict(mqtt_info=server.mqtt_info())
+    else:
+        server = StubWebsocketServer(tts_pcm, **server_options)
+        await server.start()
+        endpoint = dict(websocket_url=server.url)
+
+    tracer = LatencyTracer.get_instance()
+    tracer.enabled = True
+
+    monitor = ResourceMonitor()
+    monitor.start()
+
+    # 与无界面多会话模式使用同一个会话实现，测量口径一致
+    session = HeadlessSession(0, args.protocol, loop, input_pcm,
+                              record=bool(args.record), **endpoint)
+    session.start()
+
+    results = []
+    try:
+        for turn in range(args.turns):
+            result = (await session.run_turn()).as_dict()
+            results.append(result)
+            print(f"第{turn + 1}轮: " + ", ".join(
+                f"{key}={value * 1000:.1f}ms" if isinstance(value, float) else f"{key}={value}"
+                for key, value in result.items()))
+            await asyncio.sleep(args.turn_gap)
+    finally:
+        await session.close()
+        monitor.stop()
+        await server.stop()
+
+    if args.record:
+        session.audio.save_output(args.record, AudioConfig.OUTPUT_SAMPLE_RATE)
+
+    return {
+        "protocol": args.protocol,
+        "turns": len(results),
+        "failed_turns": sum(1 for result in results if not result["ok"]),
+        "latency_ms": summarize(results),
+        "pipeline_ms": tracer.get_summary()["stages"],
+        "cpu_percent": round(monitor.cpu_percent, 1),
+        "peak_rss_mb": round(monitor.peak_rss / 1024 / 1024, 1),
+        "results": results,
+    }
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    report = asyncio.run(run(args))
+
+    print("\n=== 基准测试结果 ===")
+    print(f"协议: {report['protocol']}  轮数: {report['turns']}  失败: {report['failed_turns']}")
+    print(f"{'指标':<18}{'p50':>10}{'p95':>10}{'max':>10}")
+    for name, item in {**report["latency_ms"], **report["pipeline_ms"]}.items():
+        print(f"{name:<18}{item['p50']:>10.1f}{item['p95']:>10.1f}{item['max']:>10.1f}")
+    print(f"CPU: {report['cpu_percent']}%  峰值内存: {report['peak_rss_mb']}MB")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.report}")
+
+    return 1 if report["failed_turns"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
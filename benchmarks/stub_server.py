@@ -0,0 +1,394 @@
+"""本地替身服务器
+
+实现 WebsocketProtocol 和 MqttProtocol 所使用的 hello / listen / tts 协议，
+用于离线基准测试：
+- StubWebsocketServer: WebSocket 传输；
+- StubMqttServer: 最小 MQTT 3.1.1 代理（仅 QoS0/1，无 TLS）+ AES-CTR 加密的 UDP 音频通道。
+
+服务器收到 listen stop（或 listen 超时）后，模拟处理耗时，依次下发
+stt、llm、tts start、sentence_start，按实时节奏推送 TTS 音频，最后下发 tts stop。
+"""
+import asyncio
+import json
+import os
+import struct
+import time
+import uuid
+
+import opuslib
+import websockets
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def encode_opus_frames(pcm, sample_rate, frame_duration):
+    """将PCM切帧并编码为Opus帧列表"""
+    frame_size = sample_rate * frame_duration // 1000
+    frame_bytes = frame_size * 2
+    encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_AUDIO)
+    frames = []
+    for i in range(0, len(pcm), frame_bytes):
+        chunk = pcm[i:i + frame_bytes]
+        chunk += bytes(frame_bytes - len(chunk))
+        frames.append(encoder.encode(chunk, frame_size))
+    return frames
+
+
+class StubSession:
+    """一个客户端连接上的对话逻辑，与传输方式无关"""
+
+    def __init__(self, server):
+        self.server = server
+        self.session_id = str(uuid.uuid4())
+        self.listening = False
+        self.listen_mode = None
+        self.uplink_frames = 0
+        self.turns = 0
+        self._reply_task = None
+        self._listen_timer = None
+
+    async def send_json(self, data):
+        raise NotImplementedError
+
+    async def send_audio(self, data):
+        raise NotImplementedError
+
+    def hello_response(self):
+        raise NotImplementedError
+
+    async def handle_json(self, data):
+        msg_type = data.get("type")
+        if msg_type == "hello":
+            await self.send_json(self.hello_response())
+        elif msg_type == "listen":
+            state = data.get("state")
+            if state == "start":
+                self._start_listening(data.get("mode"))
+            elif state == "stop":
+                self._stop_listening()
+        elif msg_type == "abort":
+            self._cancel_reply()
+        elif msg_type == "goodbye":
+            self._cancel_reply()
+            self.listening = False
+
+    def handle_audio(self, data):
+        if self.listening:
+            self.uplink_frames += 1
+
+    def _start_listening(self, mode):
+        self._cancel_reply()
+        self.listening = True
+        self.listen_mode = mode
+        self.uplink_frames = 0
+        # 客户端没有发送 listen stop 时，超时后按说完处理
+        loop = asyncio.get_running_loop()
+        self._listen_timer = loop.call_later(
+            self.server.listen_timeout, self._stop_listening)
+
+    def _stop_listening(self):
+        if not self.listening:
+            return
+        self.listening = False
+        if self._listen_timer:
+            self._listen_timer.cancel()
+            self._listen_timer = None
+        self._reply_task = asyncio.ensure_future(self._reply())
+
+    def _cancel_reply(self):
+        if self._listen_timer:
+            self._listen_timer.cancel()
+            self._listen_timer = None
+        if self._reply_task and not self._reply_task.done():
+            self._reply_task.cancel()
+        self._reply_task = None
+
+    async def _reply(self):
+        """模拟一轮回复：识别结果、情绪、TTS音频"""
+        try:
+            self.turns += 1
+            await asyncio.sleep(self.server.processing_delay)
+            await self.send_json({"session_id": self.session_id, "type": "stt",
+                                  "text": f"测试语句{self.turns}"})
+            await self.send_json({"session_id": self.session_id, "type": "llm",
+                                  "emotion": "happy", "text": "😊"})
+            await self.send_json({"session_id": self.session_id, "type": "tts",
+                                  "state": "start", "sample_rate": self.server.sample_rate})
+            await self.send_json({"session_id": self.session_id, "type": "tts",
+                                  "state": "sentence_start", "text": f"回复{self.turns}"})
+
+            # 前几帧突发发送作为客户端预缓冲，之后按实时节奏推送
+            interval = self.server.frame_duration / 1000
+            start = time.monotonic()
+            for index, frame in enumerate(self.server.tts_frames):
+                due = start + max(0, index - self.server.burst_frames) * interval
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await self.send_audio(frame)
+
+            await self.send_json({"session_id": self.session_id, "type": "tts",
+                                  "state": "stop"})
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"替身服务器回复失败: {e}")
+
+    def close(self):
+        self._cancel_reply()
+
+
+class StubServerBase:
+    """替身服务器公共参数"""
+
+    def __init__(self, tts_pcm, sample_rate=16000, frame_duration=60,
+                 processing_delay=0.3, listen_timeout=10.0, burst_frames=3):
+        self.sample_rate = sample_rate
+        self.frame_duration = frame_duration
+        self.processing_delay = processing_delay
+        self.listen_timeout = listen_timeout
+        self.burst_frames = burst_frames
+        self.tts_frames = encode_opus_frames(tts_pcm, sample_rate, frame_duration)
+        self.sessions = []
+
+    def audio_params(self):
+        return {"format": "opus", "sample_rate": self.sample_rate,
+                "channels": 1, "frame_duration": self.frame_duration}
+
+
+class _WebsocketSession(StubSession):
+
+    def __init__(self, server, websocket):
+        super().__init__(server)
+        self.websocket = websocket
+
+    async def send_json(self, data):
+        await self.websocket.send(json.dumps(data))
+
+    async def send_audio(self, data):
+        await self.websocket.send(data)
+
+    def hello_response(self):
+        return {"type": "hello", "transport": "websocket",
+                "session_id": self.session_id,
+                "audio_params": self.server.audio_params()}
+
+
+class StubWebsocketServer(StubServerBase):
+    """WebSocket 替身服务器"""
+
+    def __init__(self, tts_pcm, host="127.0.0.1", port=0, **kwargs):
+        super().__init__(tts_pcm, **kwargs)
+        self.host = host
+        self.port = port
+        self._server = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/xiaozhi/v1/"
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"WebSocket替身服务器已启动: {self.url}")
+
+    async def stop(self):
+        for session in list(self.sessions):
+            session.close()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handler(self, websocket, path=None):
+        session = _WebsocketSession(self, websocket)
+        self.sessions.append(session)
+        try:
+            async for message in websocket:
+                if isinstance(message, str):
+                    await session.handle_json(json.loads(message))
+                else:
+                    session.handle_audio(message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            session.close()
+            self.sessions.remove(session)
+
+
+def _aes_ctr(key, nonce, data):
+    cipher = Cipher(algorithms.AES(key), modes.CTR(nonce), backend=default_backend())
+    encryptor = cipher.encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+class _MqttSession(StubSession):
+
+    def __init__(self, server, writer, client_id):
+        super().__init__(server)
+        self.writer = writer
+        self.client_id = client_id
+        self.aes_key = os.urandom(16).hex()
+        self.aes_nonce = "01000000" + os.urandom(12).hex()
+        self.nonce_tag = bytes.fromhex(self.aes_nonce[8:24])
+        self.udp_addr = None
+        self.sequence = 0
+
+    async def send_json(self, data):
+        self.server.publish(self.writer, self.server.subscribe_topic,
+                            json.dumps(data).encode("utf-8"))
+
+    async def send_audio(self, data):
+        if not self.udp_addr:
+            return
+        self.sequence += 1
+        nonce = bytes.fromhex(self.aes_nonce[:4] + format(len(data), "04x") +
+                              self.aes_nonce[8:24] + format(self.sequence, "08x"))
+        packet = nonce + _aes_ctr(bytes.fromhex(self.aes_key), nonce, data)
+        self.server.udp_transport.sendto(packet, self.udp_addr)
+
+    def handle_udp(self, packet, addr):
+        self.udp_addr = addr
+        if len(packet) < 16:
+            return
+        self.handle_audio(_aes_ctr(bytes.fromhex(self.aes_key), packet[:16], packet[16:]))
+
+    def hello_response(self):
+        return {"type": "hello", "transport": "udp",
+                "session_id": self.session_id,
+                "audio_params": self.server.audio_params(),
+                "udp": {"server": self.server.host, "port": self.server.udp_port,
+                        "key": self.aes_key, "nonce": self.aes_nonce}}
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        # 包头nonce的第4~12字节来自会话nonce，据此找到所属会话
+        for session in self.server.sessions:
+            if data[4:12] == session.nonce_tag:
+                session.handle_udp(data, addr)
+                return
+
+
+class StubMqttServer(StubServerBase):
+    """最小 MQTT 3.1.1 代理 + UDP 音频通道的替身服务器
+
+    MqttProtocol 不主动订阅主题，因此服务器消息直接以 PUBLISH 推给对应连接。
+    """
+
+    def __init__(self, tts_pcm, host="127.0.0.1", port=0, udp_port=0,
+                 subscribe_topic="devices/p2p/stub", **kwargs):
+        super().__init__(tts_pcm, **kwargs)
+        self.host = host
+        self.port = port
+        self.udp_port = udp_port
+        self.subscribe_topic = subscribe_topic
+        self._server = None
+        self.udp_transport = None
+
+    def mqtt_info(self, client_id="stub-client"):
+        """供客户端配置 SYSTEM_OPTIONS.NETWORK.MQTT_INFO"""
+        return {"endpoint": f"{self.host}:{self.port}", "client_id": client_id,
+                "username": "stub", "password": "stub",
+                "publish_topic": "device-server",
+                "subscribe_topic": self.subscribe_topic, "tls": False}
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.udp_transport, _ = await loop.create_datagram_endpoint(
+            lambda: _UdpProtocol(self), local_addr=(self.host, self.udp_port))
+        self.udp_port = self.udp_transport.get_extra_info("sockname")[1]
+        logger.info(f"MQTT替身服务器已启动: {self.host}:{self.port}, UDP: {self.udp_port}")
+
+    async def stop(self):
+        for session in list(self.sessions):
+            session.close()
+            session.writer.close()
+        if self.udp_transport:
+            self.udp_transport.close()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        # 等待连接处理协程退出
+        await asyncio.sleep(0.1)
+
+    @staticmethod
+    def _encode_length(length):
+        encoded = bytearray()
+        while True:
+            byte = length % 128
+            length //= 128
+            if length:
+                byte |= 0x80
+            encoded.append(byte)
+            if not length:
+                return bytes(encoded)
+
+    @staticmethod
+    async def _read_packet(reader):
+        header = (await reader.readexactly(1))[0]
+        multiplier, length = 1, 0
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+        body = await reader.readexactly(length) if length else b""
+        return header, body
+
+    def publish(self, writer, topic, payload):
+        topic = topic.encode("utf-8")
+        body = struct.pack("!H", len(topic)) + topic + payload
+        writer.write(b"\x30" + self._encode_length(len(body)) + body)
+
+    async def _handle_client(self, reader, writer):
+        session = None
+        try:
+            while True:
+                header, body = await self._read_packet(reader)
+                packet_type = header >> 4
+                if packet_type == 1:  # CONNECT
+                    name_len = struct.unpack("!H", body[:2])[0]
+                    offset = 2 + name_len + 4  # 协议名 + 版本 + 标志 + keepalive
+                    id_len = struct.unpack("!H", body[offset:offset + 2])[0]
+                    client_id = body[offset + 2:offset + 2 + id_len].decode("utf-8")
+                    session = _MqttSession(self, writer, client_id)
+                    self.sessions.append(session)
+                    writer.write(b"\x20\x02\x00\x00")
+                elif packet_type == 3:  # PUBLISH
+                    qos = (header >> 1) & 0x03
+                    topic_len = struct.unpack("!H", body[:2])[0]
+                    offset = 2 + topic_len
+                    if qos:
+                        packet_id = body[offset:offset + 2]
+                        offset += 2
+                        writer.write(b"\x40\x02" + packet_id)
+                    if session:
+                        await session.handle_json(json.loads(body[offset:].decode("utf-8")))
+                elif packet_type == 8:  # SUBSCRIBE
+                    packet_id = body[:2]
+                    writer.write(b"\x90\x03" + packet_id + b"\x00")
+                elif packet_type == 12:  # PINGREQ
+                    writer.write(b"\xd0\x00")
+                elif packet_type == 14:  # DISCONNECT
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"MQTT替身服务器处理连接失败: {e}")
+        finally:
+            if session:
+                session.close()
+                self.sessions.remove(session)
+            writer.close()
@@ -0,0 +1,20 @@
+"""基准测试用的合成音频
+
+没有提供 WAV 文件时，用合成的类语音信号作为用户发言和服务器回复。
+回放发言、记录输出的虚拟音频设备见 src.headless.session_audio.SessionAudio。
+"""
+import numpy as np
+
+
+def synth_speech(seconds, sample_rate, seed=0):
+    """合成类语音信号（带谐波和音节包络），能被 WebRTC VAD 判为语音"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    f0 = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    signal = sum(np.sin(k * phase) / k for k in range(1, 11))
+    envelope = np.maximum(0.5 * (1 - np.cos(2 * np.pi * 4 * t)), 0.15)
+    signal = signal * envelope
+    signal = signal / np.max(np.abs(signal)) * 0.5 * 32767
+    signal += rng.normal(0, 30, len(t))
+    return np.clip(signal, -32768, 32767).astype(np.int16).tobytes()
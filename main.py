@@ -5,7 +5,6 @@ import signal
 import io
 import subprocess
 import psutil
-from src.application import Application
 from src.utils.logging_config import setup_logging, get_logger
 
 logger = get_logger(__name__)
@@ -24,9 +23,9 @@ def parse_args():
     # 添加界面模式参数
     parser.add_argument(
         '--mode', 
-        choices=['gui', 'cli'],
+        choices=['gui', 'cli', 'headless'],
         default='cli',
-        help='运行模式：gui(图形界面) 或 cli(命令行)'
+        help='运行模式：gui(图形界面)、cli(命令行) 或 headless(多会话无界面压测)'
     )
     
     # 添加协议选择参数
@@ -36,12 +35,33 @@ def parse_args():
         default='websocket',
         help='通信协议：mqtt 或 websocket'
     )
-    
+
+    # 无界面模式参数
+    parser.add_argument(
+        '--sessions',
+        type=int,
+        help='无界面模式：同时运行的虚拟设备数（默认读取 HEADLESS.SESSIONS）'
+    )
+    parser.add_argument(
+        '--turns',
+        type=int,
+        help='无界面模式：每个会话的对话轮数（默认读取 HEADLESS.TURNS）'
+    )
+    parser.add_argument(
+        '--input-wav',
+        help='无界面模式：每轮回放的发言WAV（默认读取 AUDIO_BACKEND.INPUT_FILE）'
+    )
+    parser.add_argument(
+        '--report',
+        help='无界面模式：结果JSON输出路径'
+    )
+
     return parser.parse_args()
 
 def signal_handler(sig, frame):
     """处理Ctrl+C信号"""
     logger.info("接收到中断信号，正在关闭...")
+    from src.application import Application
     app = Application.get_instance()
     app.shutdown()
     sys.exit(0)
@@ -75,13 +95,21 @@ def start_mpv():
 
 def main():
     """程序入口点"""
-    # 注册信号处理器
-    signal.signal(signal.SIGINT, signal_handler)
     # 解析命令行参数
     args = parse_args()
+    # 注册信号处理器（无界面模式直接由 asyncio.run 响应 Ctrl+C）
+    if args.mode != 'headless':
+        signal.signal(signal.SIGINT, signal_handler)
     try:
         # 日志
         setup_logging()
+
+        # 无界面模式不创建 Application，也不加载界面、键盘监听和唤醒词
+        if args.mode == 'headless':
+            from src.headless.headless_runner import run_headless
+            return run_headless(args)
+
+        from src.application import Application
         # 启动MPV视频播放器
         # start_mpv()
 
@@ -18,8 +18,10 @@ from src.display import cli_display
 # from src.display import gui_display, cli_display
 from src.utils.config_manager import ConfigManager
 from src.utils.common_utils import handle_verification_code
+from src.utils.latency_tracer import LatencyTracer, TraceStage, TraceEvent
 # 导入 VAD 检测器
 from src.audio_processing.vad_detector import VADDetector
+from src.audio_processing.silence_gate import SilenceGate, GateDecision
 
 setup_opus()
 
@@ -91,6 +93,7 @@ class Application:
 
         # 回调函数
         self.on_state_changed_callbacks = []
+        self.on_tts_playing_changed_callbacks = []
 
         # 初始化事件对象
         self.events = {
@@ -106,6 +109,10 @@ class Application:
         self.wake_word_detector = None
         # 添加 VAD 检测器
         self.vad_detector = None
+        # 上行静音门
+        self.silence_gate = None
+        # 延迟追踪
+        self.tracer = LatencyTracer.get_instance()
         logger.debug("Application实例初始化完成")
 
     def run(self, **kwargs):
@@ -162,7 +169,18 @@ class Application:
 
     def set_is_tts_playing(self, value: bool):
         with self._tts_lock:
+            changed = self.is_tts_playing != value
             self.is_tts_playing = value
+        if changed:
+            self._notify_tts_playing(value)
+
+    def _notify_tts_playing(self, value: bool):
+        """通知TTS播放状态变化"""
+        for callback in self.on_tts_playing_changed_callbacks:
+            try:
+                callback(value)
+            except Exception as e:
+                logger.error(f"执行TTS状态回调时出错: {e}")
 
     def get_is_tts_playing(self) -> bool:
         with self._tts_lock:
@@ -183,6 +201,9 @@ class Application:
         # 初始化 VAD 检测器
         self._initialize_vad_detector()
 
+        # 初始化上行静音门
+        self._initialize_silence_gate()
+
         # 初始化并启动唤醒词检测
         self._initialize_wake_word_detector()
         
@@ -312,15 +333,71 @@ class Application:
         if self.device_state != DeviceState.LISTENING:
             return
 
-        # 读取并发送音频数据
-        encoded_data = self.audio_codec.read_audio()
-        if (encoded_data and self.protocol and
+        # 未启用静音门时，读取并发送每一帧音频数据
+        if not self.silence_gate:
+            encoded_data = self.audio_codec.read_audio()
+            if (encoded_data and self.protocol and
+                    self.protocol.is_audio_channel_opened()):
+                self.tracer.mark_uplink()
+                asyncio.run_coroutine_threadsafe(
+                    self._send_audio_frames([encoded_data], self.tracer.now()),
+                    self.loop
+                )
+            return
+
+        pcm = self.audio_codec.read_pcm()
+        if not pcm:
+            return
+
+        # 端点已判定但服务器迟迟没有响应，重新开始监听
+        if self.silence_gate.is_response_timeout():
+            logger.warning("提前结束监听后服务器未响应，重新开始监听")
+            self.silence_gate.reset()
+            asyncio.run_coroutine_threadsafe(
+                self.protocol.send_start_listening(ListeningMode.AUTO_STOP),
+                self.loop
+            )
+            return
+
+        decision, frames = self.silence_gate.process(
+            pcm, allow_endpoint=self.keep_listening)
+
+        if decision == GateDecision.ENDPOINT:
+            # 自动模式下用户已说完，提前结束监听以缩短对话延迟
+            self.tracer.mark(TraceEvent.SPEECH_END)
+            asyncio.run_coroutine_threadsafe(
+                self.protocol.send_stop_listening(),
+                self.loop
+            )
+            return
+
+        if decision == GateDecision.KEEPALIVE:
+            encoded_frames = [self.audio_codec.get_silence_frame()]
+        elif decision == GateDecision.SEND:
+            encoded_frames = [self.audio_codec.encode(frame) for frame in frames]
+            self.tracer.mark_uplink()
+        else:
+            return
+
+        encoded_frames = [frame for frame in encoded_frames if frame]
+        if (encoded_frames and self.protocol and
                 self.protocol.is_audio_channel_opened()):
             asyncio.run_coroutine_threadsafe(
-                self.protocol.send_audio(encoded_data),
+                self._send_audio_frames(encoded_frames, self.tracer.now()),
                 self.loop
             )
 
+    async def _send_audio_frames(self, frames, enqueued=None):
+        """按顺序发送多帧音频数据
+
+        参数:
+            frames: 已编码的音频帧列表
+            enqueued: 入队时间戳，用于统计发送耗时（含事件循环调度等待）
+        """
+        for frame in frames:
+            await self.protocol.send_audio(frame)
+            self.tracer.record(TraceStage.SEND_AUDIO, enqueued)
+
     async def _send_text_tts(self, text):
         """将文本转换为语音并发送"""
         try:
@@ -397,6 +474,7 @@ class Application:
 
     def _on_incoming_audio(self, data):
         """接收音频数据回调"""
+        self.tracer.mark(TraceEvent.FIRST_DOWNLINK)
         if self.device_state == DeviceState.SPEAKING:
             self.audio_codec.write_audio(data)
             self.events[EventType.AUDIO_OUTPUT_READY_EVENT].set()
@@ -431,6 +509,7 @@ class Application:
         """处理TTS消息"""
         state = data.get("state", "")
         if state == "start":
+            self.tracer.mark(TraceEvent.TTS_START)
             self.schedule(lambda: self._handle_tts_start())
         elif state == "stop":
             self.schedule(lambda: self._handle_tts_stop())
@@ -486,8 +565,8 @@ class Application:
             wait_interval = 0.1  # 每次等待的时间间隔
             attempts = 0
 
-            # 等待直到队列为空或超过最大尝试次数
-            while (not self.audio_codec.audio_decode_queue.empty() and 
+            # 等待直到队列和混音器中的语音都播放完或超过最大尝试次数
+            while (self.audio_codec.has_pending_audio() and
                    attempts < max_wait_attempts):
                 time.sleep(wait_interval)
                 attempts += 1
@@ -516,6 +595,7 @@ class Application:
 
     def _handle_stt_message(self, data):
         """处理STT消息"""
+        self.tracer.mark(TraceEvent.STT)
         text = data.get("text", "")
         if text:
             logger.info(f">> {text}")
@@ -536,7 +616,10 @@ class Application:
         from src.iot.thing_manager import ThingManager
         thing_manager = ThingManager.get_instance()
         asyncio.run_coroutine_threadsafe(
-            self.protocol.send_iot_descriptors(thing_manager.get_descriptors_json()),
+            self.protocol.send_iot_descriptors(
+                thing_manager.get_descriptors_json(),
+                thing_manager.get_descriptors_hash()
+            ),
             self.loop
         )
         self._update_iot_states(False)
@@ -693,6 +776,10 @@ class Application:
             elif state == DeviceState.LISTENING:
                 self.display.update_status("聆听中...")
                 self.set_emotion("neutral")
+                # 新一轮监听，重置静音门状态
+                if self.silence_gate:
+                    self.silence_gate.reset()
+                self.tracer.end_turn()
                 self._update_iot_states(True)
                 # 暂停唤醒词检测
                 if self.wake_word_detector:
@@ -987,6 +1074,7 @@ class Application:
     def _stop_listening_impl(self):
         """停止监听的实现"""
         if self.device_state == DeviceState.LISTENING:
+            self.tracer.mark(TraceEvent.SPEECH_END)
             asyncio.run_coroutine_threadsafe(
                 self.protocol.send_stop_listening(),
                 self.loop
@@ -1003,8 +1091,10 @@ class Application:
         logger.info(f"中止语音输出，原因: {reason}")
         self.aborted = True
 
-        # 设置TTS播放状态为False
-        self.set_is_tts_playing(False)
+        # 设置TTS播放状态为False，即使原本没有在播放也通知监听者（如暂停音乐）
+        with self._tts_lock:
+            self.is_tts_playing = False
+        self._notify_tts_playing(False)
         
         # 立即清空音频队列
         if self.audio_codec:
@@ -1069,6 +1159,10 @@ class Application:
         """注册状态变化回调"""
         self.on_state_changed_callbacks.append(callback)
 
+    def on_tts_playing_changed(self, callback):
+        """注册TTS播放状态变化回调，callback(is_playing) 在调用方线程中执行"""
+        self.on_tts_playing_changed_callbacks.append(callback)
+
     def shutdown(self):
         """关闭应用程序"""
         logger.info("正在关闭应用程序...")
@@ -1089,6 +1183,19 @@ class Application:
         if self.audio_codec:
             self.audio_codec.close()
 
+        # 释放音频后端
+        from src.audio_backends.audio_backend import close_audio_backend
+        close_audio_backend()
+
+        # 停止物联网命令执行器
+        from src.iot.iot_executor import IotExecutor
+        IotExecutor.get_instance().shutdown()
+
+        # 断开共享的 MQTT 连接（仅在有传感器使用时才存在）
+        from src.network.mqtt_hub import MqttHub
+        if MqttHub._instance is not None:
+            MqttHub._instance.close()
+
         # 关闭协议
         if self.protocol:
             asyncio.run_coroutine_threadsafe(
@@ -1104,6 +1211,9 @@ class Application:
         if self.loop_thread and self.loop_thread.is_alive():
             self.loop_thread.join(timeout=1.0)
 
+        # 写出延迟统计
+        self.tracer.dump()
+
         logger.info("应用程序已关闭")
 
     def _on_mode_changed(self, auto_mode):
@@ -1315,47 +1425,78 @@ class Application:
 
         # 添加Home Assistant设备
         ha_devices = self.config.get_config("HOME_ASSISTANT.DEVICES", [])
+        device_types = {
+            "light.": (HomeAssistantLight, "灯设备"),
+            "switch.": (HomeAssistantSwitch, "开关设备"),
+            "number.": (HomeAssistantNumber, "数值设备"),  # 如音量控制
+            "button.": (HomeAssistantButton, "按钮设备"),
+        }
+        ha_specs = []
         for device in ha_devices:
             entity_id = device.get("entity_id")
-            friendly_name = device.get("friendly_name")
-            if entity_id:
-                # 根据实体ID判断设备类型
-                if entity_id.startswith("light."):
-                    # 灯设备
-                    thing_manager.add_thing(HomeAssistantLight(entity_id, friendly_name))
-                    logger.info(f"已添加Home Assistant灯设备: {friendly_name or entity_id}")
-                elif entity_id.startswith("switch."):
-                    # 开关设备
-                    thing_manager.add_thing(HomeAssistantSwitch(entity_id, friendly_name))
-                    logger.info(f"已添加Home Assistant开关设备: {friendly_name or entity_id}")
-                elif entity_id.startswith("number."):
-                    # 数值设备（如音量控制）
-                    thing_manager.add_thing(HomeAssistantNumber(entity_id, friendly_name))
-                    logger.info(f"已添加Home Assistant数值设备: {friendly_name or entity_id}")
-                elif entity_id.startswith("button."):
-                    # 按钮设备
-                    thing_manager.add_thing(HomeAssistantButton(entity_id, friendly_name))
-                    logger.info(f"已添加Home Assistant按钮设备: {friendly_name or entity_id}")
-                else:
-                    # 默认作为灯设备处理
-                    thing_manager.add_thing(HomeAssistantLight(entity_id, friendly_name))
-                    logger.info(f"已添加Home Assistant设备(默认作为灯处理): {friendly_name or entity_id}")
+            if not entity_id:
+                continue
+            # 根据实体ID判断设备类型，未知类型默认作为灯设备处理
+            device_class, label = next(
+                (value for prefix, value in device_types.items() if entity_id.startswith(prefix)),
+                (HomeAssistantLight, "设备(默认作为灯处理)")
+            )
+            ha_specs.append((device_class, label, entity_id, device.get("friendly_name")))
+
+        if ha_specs:
+            from concurrent.futures import ThreadPoolExecutor
+            from src.network.ha_client import HomeAssistantClient
+
+            # 先批量拉取一次状态，各设备初始化时直接命中缓存
+            HomeAssistantClient.get_instance().refresh_states()
+
+            def create_device(spec):
+                device_class, label, entity_id, friendly_name = spec
+                try:
+                    return device_class(entity_id, friendly_name).finish_init()
+                except Exception as e:
+                    logger.error(f"创建Home Assistant设备失败 {entity_id}: {e}")
+                    return None
+
+            # 并行创建，按配置顺序添加
+            with ThreadPoolExecutor(max_workers=min(8, len(ha_specs))) as executor:
+                things = list(executor.map(create_device, ha_specs))
+            for (_, label, entity_id, friendly_name), thing in zip(ha_specs, things):
+                if thing is not None:
+                    thing_manager.add_thing(thing)
+                    logger.info(f"已添加Home Assistant{label}: {friendly_name or entity_id}")
+
+            # 所有设备都已注册回调后再启动推送连接
+            HomeAssistantClient.get_instance().start_event_stream()
 
         logger.info("物联网设备初始化完成")
 
     def _handle_iot_message(self, data):
-        """处理物联网消息"""
+        """处理物联网消息（交给执行器异步执行，不阻塞对话流程）"""
         from src.iot.thing_manager import ThingManager
-        thing_manager = ThingManager.get_instance()
 
         commands = data.get("commands", [])
-        for command in commands:
-            try:
-                result = thing_manager.invoke(command)
-                logger.info(f"执行物联网命令结果: {result}")
-                # self.schedule(lambda: self._update_iot_states())
-            except Exception as e:
-                logger.error(f"执行物联网命令失败: {e}")
+        if commands:
+            batch = ThingManager.get_instance().invoke_batch(commands)
+            batch.add_done_callback(self._on_iot_batch_done)
+
+    def _on_iot_batch_done(self, batch):
+        """一批物联网命令全部结束：记录结果并在一条 iot 消息中回传给服务器"""
+        try:
+            results = batch.result()
+        except Exception as e:
+            logger.error(f"执行物联网命令失败: {e}")
+            return
+        for item in results:
+            name = f"{item['name']}.{item['method']}"
+            if item["success"]:
+                logger.info(f"执行物联网命令结果 {name}: {item['result']}")
+            else:
+                logger.error(f"执行物联网命令失败 {name}: {item['error']}")
+
+        if self.protocol and self.loop:
+            asyncio.run_coroutine_threadsafe(
+                self.protocol.send_iot_results(results), self.loop)
 
     def _update_iot_states(self, delta=None):
         """
@@ -1428,3 +1569,15 @@ class Application:
         except Exception as e:
             logger.error("初始化 VAD 检测器失败: %s", e, exc_info=True)
             self.vad_detector = None
+
+    def _initialize_silence_gate(self):
+        """初始化上行静音门"""
+        try:
+            silence_gate = SilenceGate()
+            if not silence_gate.enabled:
+                logger.info("上行静音门已在配置中禁用")
+                return
+            self.silence_gate = silence_gate
+        except Exception as e:
+            logger.error("初始化上行静音门失败: %s", e, exc_info=True)
+            self.silence_gate = None
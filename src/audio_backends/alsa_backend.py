@@ -0,0 +1,119 @@
+import threading
+
+from src.audio_backends.audio_backend import AudioBackend
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AlsaStream:
+    """直接基于 ALSA PCM 的音频流（接口与 pyaudio.Stream 兼容）"""
+
+    def __init__(self, alsaaudio, device, is_input, rate, channels, frames_per_buffer, start=True):
+        self.alsaaudio = alsaaudio
+        self.device = device
+        self.is_input = is_input
+        self.rate = rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.frame_bytes = 2 * channels
+        self.pcm = None
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        if start:
+            self.start_stream()
+
+    def start_stream(self):
+        with self._lock:
+            if self.pcm is not None:
+                return
+            self.pcm = self.alsaaudio.PCM(
+                type=self.alsaaudio.PCM_CAPTURE if self.is_input else self.alsaaudio.PCM_PLAYBACK,
+                mode=self.alsaaudio.PCM_NORMAL,
+                device=self.device,
+                rate=self.rate,
+                channels=self.channels,
+                format=self.alsaaudio.PCM_FORMAT_S16_LE,
+                periodsize=self.frames_per_buffer
+            )
+            self._buffer.clear()
+
+    def stop_stream(self):
+        with self._lock:
+            if self.pcm is not None:
+                self.pcm.close()
+                self.pcm = None
+
+    def close(self):
+        self.stop_stream()
+
+    def is_active(self):
+        return self.pcm is not None
+
+    def get_read_available(self):
+        # ALSA 阻塞模式下无法查询内核缓冲，只报告本地已缓存的帧数
+        return len(self._buffer) // self.frame_bytes
+
+    def read(self, num_frames, exception_on_overflow=True):
+        size = num_frames * self.frame_bytes
+        with self._lock:
+            if self.pcm is None:
+                raise OSError("Stream closed")
+            while len(self._buffer) < size:
+                length, data = self.pcm.read()
+                if length < 0:
+                    if exception_on_overflow:
+                        raise OSError("Input overflowed")
+                    continue
+                self._buffer.extend(data)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return data
+
+    def write(self, data, num_frames=None, exception_underflow=False):
+        with self._lock:
+            if self.pcm is None:
+                raise OSError("Stream closed")
+            self.pcm.write(bytes(data))
+
+
+class AlsaBackend(AudioBackend):
+    """直接访问 ALSA 的音频后端（需要 pyalsaaudio，仅 Linux）
+
+    绕过 PortAudio 的设备探测，启动更快，适合嵌入式设备和服务器。
+    """
+
+    name = "alsa"
+
+    def __init__(self, input_device=None, output_device=None):
+        super().__init__(input_device, output_device)
+        try:
+            import alsaaudio
+        except ImportError:
+            raise RuntimeError("ALSA 后端需要安装 pyalsaaudio: pip install pyalsaaudio")
+        self.alsaaudio = alsaaudio
+
+    def _enumerate_devices(self):
+        devices = []
+        for name in self.alsaaudio.pcms(self.alsaaudio.PCM_CAPTURE):
+            devices.append({"index": len(devices), "name": name, "maxInputChannels": 1,
+                            "maxOutputChannels": 0, "defaultSampleRate": 16000.0})
+        for name in self.alsaaudio.pcms(self.alsaaudio.PCM_PLAYBACK):
+            devices.append({"index": len(devices), "name": name, "maxInputChannels": 0,
+                            "maxOutputChannels": 1, "defaultSampleRate": 16000.0})
+        return devices
+
+    def _default_device_index(self, is_input):
+        channel_key = "maxInputChannels" if is_input else "maxOutputChannels"
+        for dev in self.list_devices():
+            if dev["name"] == "default" and dev[channel_key] > 0:
+                return dev["index"]
+        return None
+
+    def open_stream(self, is_input, rate, channels=1, frames_per_buffer=1024,
+                    device_index=None, start=True):
+        if device_index is None:
+            device_index = self.get_default_device(is_input)
+        device = self.list_devices()[device_index]["name"]
+        return AlsaStream(self.alsaaudio, device, is_input, rate, channels,
+                          frames_per_buffer, start)
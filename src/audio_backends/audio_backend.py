@@ -0,0 +1,165 @@
+import threading
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AudioBackend:
+    """音频I/O后端基类
+
+    AudioCodec、VADDetector 和 WakeWordDetector 都从后端获取音频流，
+    返回的流对象与 pyaudio.Stream 接口兼容（read / write / start_stream /
+    stop_stream / close / is_active / get_read_available），数据格式固定为16位PCM。
+    设备只在第一次使用时枚举一次并缓存。
+    """
+
+    name = "base"
+
+    def __init__(self, input_device=None, output_device=None):
+        """初始化后端
+
+        参数:
+            input_device: 指定输入设备（索引或名称片段），None 表示默认设备
+            output_device: 指定输出设备（索引或名称片段），None 表示默认设备
+        """
+        self.input_device = input_device
+        self.output_device = output_device
+        self._devices = None
+        self._selected = {}
+        self._lock = threading.Lock()
+
+    def _enumerate_devices(self):
+        """枚举设备，返回与 PyAudio 设备信息格式相同的字典列表"""
+        raise NotImplementedError("_enumerate_devices方法必须由子类实现")
+
+    def _default_device_index(self, is_input):
+        """系统默认设备索引，没有时返回 None"""
+        return None
+
+    def list_devices(self):
+        """获取设备列表（缓存）"""
+        with self._lock:
+            if self._devices is None:
+                self._devices = self._enumerate_devices()
+            return self._devices
+
+    def refresh_devices(self):
+        """清除设备缓存，下次使用时重新枚举"""
+        with self._lock:
+            self._devices = None
+            self._selected.clear()
+
+    def get_default_device(self, is_input=True):
+        """选择输入/输出设备：指定设备 > 系统默认设备 > 第一个可用设备"""
+        if is_input in self._selected:
+            return self._selected[is_input]
+
+        channel_key = "maxInputChannels" if is_input else "maxOutputChannels"
+        devices = [dev for dev in self.list_devices() if dev[channel_key] > 0]
+        if not devices:
+            raise RuntimeError("没有可用的音频设备")
+
+        preferred = self.input_device if is_input else self.output_device
+        device = None
+        if preferred is not None:
+            for dev in devices:
+                if (isinstance(preferred, int) and dev["index"] == preferred) or \
+                        (isinstance(preferred, str) and preferred in dev["name"]):
+                    device = dev
+                    break
+            if device is None:
+                logger.warning(f"未找到指定的音频设备: {preferred}，使用默认设备")
+
+        if device is None:
+            default_index = self._default_device_index(is_input)
+            device = next(
+                (dev for dev in devices if dev["index"] == default_index),
+                devices[0]
+            )
+
+        logger.info(
+            f"[{self.name}] 使用{'输入' if is_input else '输出'}设备: "
+            f"{device['name']} (Index: {device['index']})"
+        )
+        self._selected[is_input] = device["index"]
+        return device["index"]
+
+    def open_stream(self, is_input, rate, channels=1, frames_per_buffer=1024,
+                    device_index=None, start=True):
+        """打开一个16位PCM音频流"""
+        raise NotImplementedError("open_stream方法必须由子类实现")
+
+    def terminate(self):
+        """释放后端资源"""
+        pass
+
+
+def create_audio_backend(backend_type=None, **options):
+    """根据类型创建音频后端
+
+    参数:
+        backend_type: portaudio / alsa / file / null，默认读取 AUDIO_BACKEND.TYPE
+        options: 覆盖配置中的后端参数
+    """
+    config = ConfigManager.get_instance()
+    backend_type = backend_type or config.get_config("AUDIO_BACKEND.TYPE", "portaudio")
+
+    def option(name, key, default=None):
+        if name in options:
+            return options[name]
+        return config.get_config(f"AUDIO_BACKEND.{key}", default)
+
+    if backend_type == "portaudio":
+        from src.audio_backends.portaudio_backend import PortAudioBackend
+        return PortAudioBackend(
+            input_device=option("input_device", "INPUT_DEVICE"),
+            output_device=option("output_device", "OUTPUT_DEVICE")
+        )
+    if backend_type == "alsa":
+        from src.audio_backends.alsa_backend import AlsaBackend
+        return AlsaBackend(
+            input_device=option("input_device", "INPUT_DEVICE"),
+            output_device=option("output_device", "OUTPUT_DEVICE")
+        )
+    if backend_type == "file":
+        from src.audio_backends.file_backend import FileBackend
+        return FileBackend(
+            input_file=option("input_file", "INPUT_FILE"),
+            output_file=option("output_file", "OUTPUT_FILE"),
+            realtime=option("realtime", "REALTIME", True),
+            loop=option("loop", "LOOP", True),
+            input_source=options.get("input_source"),
+            output_sink=options.get("output_sink")
+        )
+    if backend_type == "null":
+        from src.audio_backends.file_backend import NullBackend
+        return NullBackend(realtime=option("realtime", "REALTIME", True))
+    raise ValueError(f"不支持的音频后端: {backend_type}")
+
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def get_audio_backend():
+    """获取进程内共享的默认音频后端（按配置创建一次）"""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = create_audio_backend()
+            logger.info(f"音频后端: {_default_backend.name}")
+        return _default_backend
+
+
+def close_audio_backend():
+    """释放默认音频后端"""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is not None:
+            try:
+                _default_backend.terminate()
+            except Exception as e:
+                logger.warning(f"释放音频后端失败: {e}")
+            _default_backend = None
@@ -0,0 +1,216 @@
+import threading
+import time
+import wave
+
+import numpy as np
+
+from src.audio_backends.audio_backend import AudioBackend
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SAMPLE_WIDTH = 2  # 16位PCM
+
+
+def load_wav_pcm(path, sample_rate):
+    """读取16位WAV文件为单声道PCM，采样率不一致时做线性重采样"""
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError(f"只支持16位PCM WAV: {path}")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != sample_rate and len(samples):
+        duration = len(samples) / rate
+        target = np.linspace(0, len(samples) - 1, int(duration * sample_rate))
+        samples = np.interp(target, np.arange(len(samples)), samples).astype(np.int16)
+    return samples.tobytes()
+
+
+class WavSource:
+    """WAV文件音源，播放完后循环或输出静音"""
+
+    def __init__(self, path, sample_rate, loop=True):
+        self.pcm = load_wav_pcm(path, sample_rate)
+        self.loop = loop
+        self._cursor = 0
+
+    def take(self, size, chunk_end_time=None):
+        if not self.pcm:
+            return bytes(size)
+        chunk = bytearray()
+        while len(chunk) < size:
+            if self._cursor >= len(self.pcm):
+                if not self.loop:
+                    break
+                self._cursor = 0
+            part = self.pcm[self._cursor:self._cursor + size - len(chunk)]
+            self._cursor += len(part)
+            chunk.extend(part)
+        return bytes(chunk) + bytes(size - len(chunk))
+
+
+class WavSink:
+    """把播放的音频写入WAV文件"""
+
+    def __init__(self, path, sample_rate, channels=1):
+        self.wav = wave.open(str(path), "wb")
+        self.wav.setnchannels(channels)
+        self.wav.setsampwidth(SAMPLE_WIDTH)
+        self.wav.setframerate(sample_rate)
+        self._lock = threading.Lock()
+
+    def on_output(self, data):
+        with self._lock:
+            if self.wav:
+                self.wav.writeframes(data)
+
+    def close(self):
+        with self._lock:
+            if self.wav:
+                self.wav.close()
+                self.wav = None
+
+
+class FileStream:
+    """文件/内存音频流（接口与 pyaudio.Stream 兼容）
+
+    realtime 为 True 时按采样率节奏读写，模拟真实声卡；为 False 时不等待，
+    用于压测吞吐。
+    """
+
+    def __init__(self, is_input, rate, channels, source=None, sink=None,
+                 realtime=True, output_buffer=0.1, start=True):
+        self.is_input = is_input
+        self.rate = rate
+        self.channels = channels
+        self.frame_bytes = SAMPLE_WIDTH * channels
+        self.source = source
+        self.sink = sink
+        self.realtime = realtime
+        self.output_buffer = output_buffer
+        self._active = False
+        self._closed = False
+        self._frames = 0
+        self._t0 = 0.0
+        if start:
+            self.start_stream()
+
+    def start_stream(self):
+        if self._closed:
+            raise OSError("Stream closed")
+        if not self._active:
+            self._active = True
+            self._frames = 0
+            self._t0 = time.monotonic()
+
+    def stop_stream(self):
+        self._active = False
+
+    def close(self):
+        self._active = False
+        self._closed = True
+        if self.sink and hasattr(self.sink, "close"):
+            self.sink.close()
+
+    def is_active(self):
+        return self._active
+
+    def is_stopped(self):
+        return not self._active
+
+    def get_read_available(self):
+        if not self._active or not self.realtime:
+            return 0
+        captured = int((time.monotonic() - self._t0) * self.rate)
+        return max(0, captured - self._frames)
+
+    def get_write_available(self):
+        return int(self.output_buffer * self.rate)
+
+    def read(self, num_frames, exception_on_overflow=True):
+        if not self._active:
+            raise OSError("Stream closed")
+        self._frames += num_frames
+        due = self._t0 + self._frames / self.rate
+        if self.realtime:
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        size = num_frames * self.frame_bytes
+        if self.source is None:
+            return bytes(size)
+        return self.source.take(size, due)
+
+    def write(self, data, num_frames=None, exception_underflow=False):
+        if not self._active:
+            raise OSError("Stream closed")
+        data = bytes(data)
+        if self.sink:
+            self.sink.on_output(data)
+        if not self.realtime:
+            return
+        now = time.monotonic()
+        # 播放时钟落后于当前时间说明设备缓冲已播空
+        if self._t0 + self._frames / self.rate < now:
+            self._t0 = now
+            self._frames = 0
+        self._frames += len(data) // self.frame_bytes
+        ahead = self._t0 + self._frames / self.rate - now
+        if ahead > self.output_buffer:
+            time.sleep(ahead - self.output_buffer)
+
+
+class FileBackend(AudioBackend):
+    """文件回放后端：输入回放WAV文件，输出写入WAV文件（或丢弃）
+
+    也可以直接传入音源/接收端对象（实现 take(size, chunk_end_time) / on_output(data)），
+    供基准测试和多会话无界面模式使用。
+    """
+
+    name = "file"
+
+    def __init__(self, input_file=None, output_file=None, realtime=True, loop=True,
+                 input_source=None, output_sink=None, output_buffer=0.1):
+        super().__init__()
+        self.input_file = input_file
+        self.output_file = output_file
+        self.realtime = realtime
+        self.loop = loop
+        self.input_source = input_source
+        self.output_sink = output_sink
+        self.output_buffer = output_buffer
+
+    def _enumerate_devices(self):
+        return [
+            {"index": 0, "name": f"{self.name}-input", "maxInputChannels": 1,
+             "maxOutputChannels": 0, "defaultSampleRate": 16000.0},
+            {"index": 1, "name": f"{self.name}-output", "maxInputChannels": 0,
+             "maxOutputChannels": 1, "defaultSampleRate": 16000.0},
+        ]
+
+    def open_stream(self, is_input, rate, channels=1, frames_per_buffer=1024,
+                    device_index=None, start=True):
+        source = sink = None
+        if is_input:
+            source = self.input_source
+            if source is None and self.input_file:
+                source = WavSource(self.input_file, rate, self.loop)
+        else:
+            sink = self.output_sink
+            if sink is None and self.output_file:
+                sink = WavSink(self.output_file, rate, channels)
+        return FileStream(is_input, rate, channels, source, sink,
+                          self.realtime, self.output_buffer, start)
+
+
+class NullBackend(FileBackend):
+    """空后端：输入静音，输出丢弃"""
+
+    name = "null"
+
+    def __init__(self, realtime=True):
+        super().__init__(realtime=realtime)
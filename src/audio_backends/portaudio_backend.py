@@ -0,0 +1,57 @@
+import pyaudio
+
+from src.audio_backends.audio_backend import AudioBackend
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PortAudioBackend(AudioBackend):
+    """基于 PyAudio(PortAudio) 的音频后端，进程内只创建一个 PyAudio 实例"""
+
+    name = "portaudio"
+
+    def __init__(self, input_device=None, output_device=None):
+        super().__init__(input_device, output_device)
+        self.pa = pyaudio.PyAudio()
+
+    def _enumerate_devices(self):
+        devices = []
+        for i in range(self.pa.get_device_count()):
+            try:
+                devices.append(self.pa.get_device_info_by_index(i))
+            except OSError as e:
+                logger.warning(f"读取音频设备信息失败 (Index: {i}): {e}")
+        return devices
+
+    def _default_device_index(self, is_input):
+        try:
+            device = self.pa.get_default_input_device_info() if is_input else \
+                self.pa.get_default_output_device_info()
+            return device["index"]
+        except OSError:
+            logger.warning("默认设备不可用，查找替代设备...")
+            return None
+
+    def open_stream(self, is_input, rate, channels=1, frames_per_buffer=1024,
+                    device_index=None, start=True):
+        params = {
+            "format": pyaudio.paInt16,
+            "channels": channels,
+            "rate": rate,
+            "input" if is_input else "output": True,
+            "frames_per_buffer": frames_per_buffer,
+            "start": start
+        }
+        if device_index is None:
+            device_index = self.get_default_device(is_input)
+        if is_input:
+            params["input_device_index"] = device_index
+        else:
+            params["output_device_index"] = device_index
+        return self.pa.open(**params)
+
+    def terminate(self):
+        if self.pa:
+            self.pa.terminate()
+            self.pa = None
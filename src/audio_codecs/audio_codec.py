@@ -1,11 +1,13 @@
 import queue
-import numpy as np
-import pyaudio
 import opuslib
 import time
 import threading
 
+from src.audio_backends.audio_backend import get_audio_backend
+from src.audio_codecs.output_mixer import OutputMixer
 from src.constants.constants import AudioConfig
+from src.utils.config_manager import ConfigManager
+from src.utils.latency_tracer import LatencyTracer, TraceStage, TraceEvent
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -14,29 +16,48 @@ logger = get_logger(__name__)
 class AudioCodec:
     """音频编解码器类，处理音频的录制和播放（严格兼容版）"""
 
-    def __init__(self):
+    def __init__(self, backend=None, mixer_thread=True):
+        """
+        参数:
+            backend: 音频后端，默认使用按配置创建的进程内共享后端
+            mixer_thread: 是否启动混音线程；为 False 时在写入音源的调用中同步混音，
+                仅适用于输出流写入不阻塞的后端（无界面多会话模式）
+        """
+        self.backend = backend
+        self.mixer_thread = mixer_thread
         self.audio = None
         self.input_stream = None
         self.output_stream = None
         self.opus_encoder = None
         self.opus_decoder = None
         self.audio_decode_queue = queue.Queue()
+        # TTS、音乐、提示音共用的输出混音器
+        self.mixer = None
+        self.tts_source = None
 
         # 状态管理（保留原始变量名）
         self._is_closing = False
         self._is_input_paused = False
         self._input_paused_lock = threading.Lock()
         self._stream_lock = threading.Lock()
+        # 输出流单独加锁，音乐持续播放时不阻塞输入读取
+        self._output_lock = threading.Lock()
 
         # 新增设备索引缓存
         self._cached_input_device = -1
         self._cached_output_device = -1
 
+        # 预编码的静音帧缓存
+        self._silence_frame = None
+
+        # 延迟追踪
+        self.tracer = LatencyTracer.get_instance()
+
         self._initialize_audio()
         
     def _initialize_audio(self):
         try:
-            self.audio = pyaudio.PyAudio()
+            self.audio = self.backend or get_audio_backend()
 
             # 缓存设备索引
             self._cached_input_device = self._get_default_or_first_available_device(True)
@@ -57,56 +78,73 @@ class AudioCodec:
                 AudioConfig.CHANNELS
             )
 
+            self._initialize_mixer()
+
             logger.info("音频设备和编解码器初始化成功")
         except Exception as e:
             logger.error(f"初始化音频设备失败: {e}")
             self.close()
             raise
 
-    def _get_default_or_first_available_device(self, is_input=True):
-        """设备选择逻辑（优化异常处理）"""
-        if is_input:
-            logger.info("选择输入设备")
-            return 1
-        else:
-            logger.info("选择输出设备")
-            # return 3
+    def _initialize_mixer(self):
+        """创建输出混音器：所有声音都经由它写入唯一的输出流"""
+        config = ConfigManager.get_instance()
+        self.mixer = OutputMixer(
+            self._write_output,
+            sample_rate=AudioConfig.OUTPUT_SAMPLE_RATE,
+            channels=AudioConfig.CHANNELS,
+            frame_size=AudioConfig.OUTPUT_FRAME_SIZE,
+            duck_gain=config.get_config("AUDIO_MIXER.DUCK_GAIN", 0.2),
+            ramp_ms=config.get_config("AUDIO_MIXER.RAMP_MS", 30),
+            duck_hold_ms=config.get_config("AUDIO_MIXER.DUCK_HOLD_MS", 300)
+        )
+        music_buffer = config.get_config("AUDIO_MIXER.MUSIC_BUFFER_MS", 2000)
+        self.tts_source = self.mixer.add_source(
+            "tts", gain=config.get_config("AUDIO_MIXER.TTS_GAIN", 1.0), ducks_others=True)
+        self.mixer.add_source(
+            "notify", gain=config.get_config("AUDIO_MIXER.NOTIFY_GAIN", 1.0), ducks_others=True)
+        self.mixer.add_source(
+            "music", gain=config.get_config("AUDIO_MIXER.MUSIC_GAIN", 1.0),
+            max_frames=int(AudioConfig.OUTPUT_SAMPLE_RATE * music_buffer / 1000))
+        if self.mixer_thread:
+            self.mixer.start()
+
+    def _pump_output(self):
+        """没有混音线程时，写入音源后立即在当前线程混音输出"""
+        if self.mixer and not self.mixer_thread:
+            self.mixer.pump()
+
+    def _write_output(self, pcm, sources):
+        """混音线程回调：把一块混音结果写入输出流"""
+        with self._output_lock:
+            if not self.output_stream or not self.output_stream.is_active():
+                # 输出流未启动时丢弃数据，但保持实时节奏，音乐进度不会跑飞
+                time.sleep(len(pcm) / (2 * AudioConfig.CHANNELS * AudioConfig.OUTPUT_SAMPLE_RATE))
+                return
+            try:
+                start = self.tracer.now()
+                self.output_stream.write(pcm)
+                self.tracer.record(TraceStage.DEVICE_WRITE, start)
+                if "tts" in sources:
+                    self.tracer.mark(TraceEvent.FIRST_WRITE)
+            except OSError as e:
+                logger.error(f"写入输出流失败: {e}")
+                self._reinitialize_output_stream()
 
-        try:
-            device = self.audio.get_default_input_device_info() if is_input else \
-                self.audio.get_default_output_device_info()
-            logger.info(f"使用默认设备: {device['name']} (Index: {device['index']})")
-            return device["index"]
-        except OSError:
-            logger.warning("默认设备不可用，查找替代设备...")
-            for i in range(self.audio.get_device_count()):
-                dev = self.audio.get_device_info_by_index(i)
-                if is_input and dev["maxInputChannels"] > 0:
-                    logger.info(f"使用替代输入设备: {dev['name']} (Index: {i})")
-                    return i
-                if not is_input and dev["maxOutputChannels"] > 0:
-                    logger.info(f"使用替代输出设备: {dev['name']} (Index: {i})")
-                    return i
-            raise RuntimeError("没有可用的音频设备")
+    def _get_default_or_first_available_device(self, is_input=True):
+        """设备选择逻辑（由音频后端按配置选择并缓存）"""
+        return self.audio.get_default_device(is_input)
 
     def _create_stream(self, is_input=True):
-        """流创建逻辑（新增设备缓存）"""
-        params = {
-            "format": pyaudio.paInt16,
-            "channels": AudioConfig.CHANNELS,
-            "rate": AudioConfig.INPUT_SAMPLE_RATE if is_input else AudioConfig.OUTPUT_SAMPLE_RATE,
-            "input" if is_input else "output": True,
-            "frames_per_buffer": AudioConfig.INPUT_FRAME_SIZE if is_input else AudioConfig.OUTPUT_FRAME_SIZE,
-            "start": False
-        }
-
-        # 使用缓存设备索引
-        if is_input:
-            params["input_device_index"] = self._cached_input_device
-        else:
-            params["output_device_index"] = self._cached_output_device
-
-        return self.audio.open(**params)
+        """流创建逻辑（使用缓存设备索引）"""
+        return self.audio.open_stream(
+            is_input=is_input,
+            rate=AudioConfig.INPUT_SAMPLE_RATE if is_input else AudioConfig.OUTPUT_SAMPLE_RATE,
+            channels=AudioConfig.CHANNELS,
+            frames_per_buffer=AudioConfig.INPUT_FRAME_SIZE if is_input else AudioConfig.OUTPUT_FRAME_SIZE,
+            device_index=self._cached_input_device if is_input else self._cached_output_device,
+            start=False
+        )
 
     def _reinitialize_input_stream(self):
         """输入流重建（优化设备缓存）"""
@@ -169,10 +207,18 @@ class AudioCodec:
             return self._is_input_paused
 
     def read_audio(self):
-        """（优化缓冲区管理）"""
+        """读取一帧音频并编码为Opus"""
+        pcm = self.read_pcm()
+        if not pcm:
+            return None
+        return self.encode(pcm)
+
+    def read_pcm(self):
+        """读取一帧原始PCM数据（优化缓冲区管理）"""
         if self.is_input_paused():
             return None
 
+        start = self.tracer.now()
         try:
             with self._stream_lock:
                 # 流状态检查优化
@@ -204,15 +250,36 @@ class AudioCodec:
                     self._reinitialize_input_stream()
                     return None
 
-                return self.opus_encoder.encode(data, AudioConfig.INPUT_FRAME_SIZE)
+                self.tracer.record(TraceStage.CAPTURE_READ, start)
+                return data
 
         except Exception as e:
             logger.error(f"音频读取失败: {e}")
             self._reinitialize_input_stream()
             return None
 
+    def encode(self, pcm):
+        """将一帧PCM编码为Opus"""
+        start = self.tracer.now()
+        try:
+            encoded = self.opus_encoder.encode(pcm, AudioConfig.INPUT_FRAME_SIZE)
+            self.tracer.record(TraceStage.ENCODE, start)
+            return encoded
+        except Exception as e:
+            logger.error(f"音频编码失败: {e}")
+            return None
+
+    def get_silence_frame(self):
+        """获取预编码的静音帧（用作静音期间的保活/舒适噪声帧）"""
+        if self._silence_frame is None and self.opus_encoder:
+            self._silence_frame = self.opus_encoder.encode(
+                bytes(AudioConfig.INPUT_FRAME_SIZE * 2),
+                AudioConfig.INPUT_FRAME_SIZE
+            )
+        return self._silence_frame
+
     def play_audio(self):
-        """（优化批量处理）"""
+        """批量解码收到的 Opus 数据，交给混音器的 TTS 音源播放"""
         try:
             if self.audio_decode_queue.empty():
                 return
@@ -223,7 +290,9 @@ class AudioCodec:
             for _ in range(batch_size):
                 try:
                     opus_data = self.audio_decode_queue.get_nowait()
+                    start = self.tracer.now()
                     pcm = self.opus_decoder.decode(opus_data, AudioConfig.OUTPUT_FRAME_SIZE)
+                    self.tracer.record(TraceStage.DECODE, start)
                     buffer.extend(pcm)
                 except queue.Empty:
                     break
@@ -231,18 +300,16 @@ class AudioCodec:
                     logger.error(f"解码失败: {e}")
 
             if buffer:
-                # 优化写入流程
-                with self._stream_lock:
-                    if self.output_stream and self.output_stream.is_active():
-                        try:
-                            self.output_stream.write(np.frombuffer(buffer, dtype=np.int16).tobytes())
-                        except OSError as e:
-                            if "Stream closed" in str(e):
-                                self._reinitialize_output_stream()
-                                self.output_stream.write(buffer)
+                self.tts_source.write(bytes(buffer))
+                self._pump_output()
         except Exception as e:
             logger.error(f"播放失败: {e}")
-            self._reinitialize_output_stream()
+
+    def play_notification(self, pcm):
+        """播放提示音（16位单声道 PCM，采样率同输出流），播放期间音乐会被压低"""
+        if self.mixer:
+            self.mixer.source("notify").write(pcm)
+            self._pump_output()
 
     def close(self):
         """（优化资源释放顺序和线程安全性）"""
@@ -255,9 +322,11 @@ class AudioCodec:
         try:
             # 清空队列先行处理
             self.clear_audio_queue()
+            if self.mixer:
+                self.mixer.close()
             
             # 安全停止和关闭流
-            with self._stream_lock:
+            with self._stream_lock, self._output_lock:
                 # 先关闭输入流
                 if self.input_stream:
                     try:
@@ -280,14 +349,8 @@ class AudioCodec:
                     finally:
                         self.output_stream = None
                 
-                # 最后释放PyAudio
-                if self.audio:
-                    try:
-                        self.audio.terminate()
-                    except Exception as e:
-                        logger.warning(f"释放PyAudio失败: {e}")
-                    finally:
-                        self.audio = None
+                # 音频后端由创建者统一释放，这里只清除引用
+                self.audio = None
 
             # 清理编解码器
             self.opus_encoder = None
@@ -303,7 +366,9 @@ class AudioCodec:
         self.audio_decode_queue.put(opus_data)
 
     def has_pending_audio(self):
-        return not self.audio_decode_queue.empty()
+        if not self.audio_decode_queue.empty():
+            return True
+        return bool(self.tts_source and self.tts_source.pending_frames)
 
     def wait_for_audio_complete(self, timeout=5.0):
         start = time.time()
@@ -317,6 +382,9 @@ class AudioCodec:
                     self.audio_decode_queue.get_nowait()
                 except queue.Empty:
                     break
+        # 打断时已解码未播放的语音也一并丢弃，音乐随即恢复音量
+        if self.tts_source:
+            self.tts_source.clear()
 
     def start_streams(self):
         for stream in [self.input_stream, self.output_stream]:
@@ -328,7 +396,7 @@ class AudioCodec:
 
     def stop_streams(self):
         """安全停止流（优化错误处理）"""
-        with self._stream_lock:
+        with self._stream_lock, self._output_lock:
             for name, stream in [("输入", self.input_stream), ("输出", self.output_stream)]:
                 if stream:
                     try:
@@ -0,0 +1,255 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SAMPLE_WIDTH = 2  # 16位PCM
+
+
+class MixerSource:
+    """混音器的一路 PCM 输入（16位、与输出流相同的采样率和声道数）
+
+    生产者调用 write() 追加数据，混音线程按块取走。暂停时不消耗数据，
+    frames_played 也不前进，可以直接用作播放时钟。max_frames 不为 0 时，
+    生产者可以用 wait_writable() 做背压，避免把整首歌解码进内存。
+    生产者调用 finish() 且缓冲播完时调用一次 on_drained（不持有锁）。
+    所有方法共用混音器的条件变量。
+    """
+
+    def __init__(self, name: str, cond: threading.Condition, sample_rate: int, channels: int,
+                 gain: float = 1.0, ducks_others: bool = False, max_frames: int = 0):
+        self.name = name
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.gain = gain
+        self.ducks_others = ducks_others  # 有数据时压低其他音源
+        self.max_frames = max_frames
+        self.frames_played = 0
+        self.on_drained: Optional[Callable[[], None]] = None
+
+        self._cond = cond
+        self._buffer = bytearray()
+        self._paused = False
+        self._finished = False
+        self._level = gain  # 当前实际增益，按采样逐步逼近目标增益
+
+    def write(self, pcm: bytes):
+        with self._cond:
+            self._buffer.extend(pcm)
+            self._finished = False
+            self._cond.notify_all()
+
+    def wait_writable(self, timeout: Optional[float] = None) -> bool:
+        """等待缓冲低于 max_frames，返回是否可以继续写入"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self.max_frames or self._pending() < self.max_frames, timeout)
+
+    def finish(self):
+        """生产者已写完（例如解码到文件末尾），缓冲播完后 drained 为 True"""
+        with self._cond:
+            self._finished = True
+            self._cond.notify_all()
+            drained = not self._buffer
+        if drained:
+            self._notify_drained()
+
+    def clear(self):
+        with self._cond:
+            self._buffer.clear()
+            self._finished = False
+            self._cond.notify_all()
+
+    def pause(self):
+        with self._cond:
+            self._paused = True
+
+    def resume(self):
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def set_gain(self, gain: float):
+        with self._cond:
+            self.gain = gain
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def pending_frames(self) -> int:
+        with self._cond:
+            return self._pending()
+
+    @property
+    def drained(self) -> bool:
+        with self._cond:
+            return self._finished and not self._buffer
+
+    def position_ms(self) -> int:
+        """已送入输出流的时长（毫秒）"""
+        return int(self.frames_played * 1000 / self.sample_rate)
+
+    def _notify_drained(self):
+        if self.on_drained:
+            try:
+                self.on_drained()
+            except Exception as e:
+                logger.error(f"音源 {self.name} 播放结束回调出错: {e}")
+
+    # 以下方法由混音器在持有条件变量时调用
+
+    def _pending(self) -> int:
+        return len(self._buffer) // (SAMPLE_WIDTH * self.channels)
+
+    def _readable(self) -> bool:
+        return not self._paused and bool(self._buffer)
+
+    def _take(self, frames: int) -> np.ndarray:
+        """取出最多 frames 帧，不足的部分补零"""
+        size = frames * SAMPLE_WIDTH * self.channels
+        chunk = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.frames_played += len(chunk) // (SAMPLE_WIDTH * self.channels)
+        if len(chunk) < size:
+            chunk += bytes(size - len(chunk))
+        return np.frombuffer(chunk, dtype=np.int16)
+
+    def _ramp(self, target: float, samples: int, step: float) -> Optional[np.ndarray]:
+        """从当前增益线性过渡到目标增益，每个采样最多变化 step；增益为 1 时返回 None"""
+        start = self._level
+        end = start + max(-step * samples, min(step * samples, target - start))
+        self._level = end
+        if start == end == 1.0:
+            return None
+        return np.linspace(start, end, samples, dtype=np.float32)
+
+
+class OutputMixer:
+    """统一的音频输出混音器
+
+    TTS、音乐、提示音各自作为一路 PCM 音源写入，混音线程按输出帧大小
+    逐块取数、乘以各自增益后相加并限幅，再写入唯一的输出流。标记为
+    ducks_others 的音源（TTS、提示音）有数据时，其他音源在 ramp_ms 内平滑
+    压低到 duck_gain，语音结束 duck_hold_ms 后再平滑恢复，避免句间忽大忽小。
+    所有音源都没有数据时混音线程阻塞等待，不写静音。
+
+    不调用 start() 时没有混音线程，由调用方在写入数据后调用 pump() 同步混音
+    （输出流写入不阻塞的场景，例如无界面多会话模式）。这种方式下不能依赖
+    wait_writable() 背压，否则会一直等待。
+    """
+
+    def __init__(self, write: Callable[[bytes, Iterable[str]], None], sample_rate: int,
+                 channels: int, frame_size: int, duck_gain: float = 0.2,
+                 ramp_ms: float = 30, duck_hold_ms: float = 300):
+        """
+        参数:
+            write: 写出一块混音结果，第二个参数是这一块包含的音源名
+            sample_rate: 输出采样率
+            channels: 输出声道数
+            frame_size: 每块的帧数
+            duck_gain: 被压低的音源的增益系数
+            ramp_ms: 增益从 0 变化到 1 所需的时间（毫秒）
+            duck_hold_ms: 压低状态在语音结束后保持的时间（毫秒）
+        """
+        self._write = write
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_size = frame_size
+        self.duck_gain = duck_gain
+        self.duck_hold = duck_hold_ms / 1000
+        self._step = 1.0 / max(1.0, sample_rate * ramp_ms / 1000)
+
+        self._cond = threading.Condition()
+        self._sources: Dict[str, MixerSource] = {}
+        self._duck_until = 0.0
+        self._closed = False
+        self._thread = None
+
+    def add_source(self, name: str, gain: float = 1.0, ducks_others: bool = False,
+                   max_frames: int = 0) -> MixerSource:
+        with self._cond:
+            source = MixerSource(name, self._cond, self.sample_rate, self.channels,
+                                 gain, ducks_others, max_frames)
+            self._sources[name] = source
+            return source
+
+    def source(self, name: str) -> MixerSource:
+        return self._sources[name]
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="audio-mixer")
+        self._thread.start()
+        return self
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def pump(self) -> int:
+        """在调用方线程中把当前已有的数据全部混音写出，返回写出的块数"""
+        blocks = 0
+        while self._mix_once(wait=False):
+            blocks += 1
+        return blocks
+
+    def _run(self):
+        while self._mix_once(wait=True):
+            pass
+        logger.debug("混音线程已退出")
+
+    def _mix_once(self, wait: bool) -> bool:
+        """混合并写出一块，没有可读数据（wait 为 False 时）或已关闭时返回 False"""
+        with self._cond:
+            readable = lambda: any(source._readable() for source in self._sources.values())
+            if wait:
+                self._cond.wait_for(lambda: self._closed or readable())
+            if self._closed or not readable():
+                return False
+            block, active = self._mix()
+            drained = [source for source in active
+                       if source._finished and not source._buffer]
+            # 唤醒等待缓冲空间的生产者
+            self._cond.notify_all()
+        try:
+            self._write(block, [source.name for source in active])
+        except Exception as e:
+            logger.error(f"写入混音输出失败: {e}")
+        for source in drained:
+            source._notify_drained()
+        return True
+
+    def _mix(self):
+        """混合一块音频（调用方需持有条件变量）"""
+        samples = self.frame_size * self.channels
+        readable = [source for source in self._sources.values() if source._readable()]
+
+        now = time.monotonic()
+        if any(source.ducks_others for source in readable):
+            self._duck_until = now + self.duck_hold
+        ducking = now < self._duck_until
+
+        mixed = np.zeros(samples, dtype=np.float32)
+        for source in readable:
+            target = source.gain
+            if ducking and not source.ducks_others:
+                target *= self.duck_gain
+            data = source._take(self.frame_size)
+            ramp = source._ramp(target, samples, self._step)
+            mixed += data if ramp is None else data * ramp
+
+        np.clip(mixed, -32768, 32767, out=mixed)
+        return mixed.astype(np.int16).tobytes(), readable
@@ -0,0 +1,171 @@
+import collections
+import math
+import time
+
+import webrtcvad
+
+from src.constants.constants import AudioConfig
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class GateDecision:
+    """静音门判定结果"""
+    SEND = "send"            # 语音帧（含预录帧），编码后发送
+    KEEPALIVE = "keepalive"  # 静音期间的保活帧（舒适噪声/DTX）
+    DROP = "drop"            # 静音帧，不编码也不发送
+    ENDPOINT = "endpoint"    # 判定用户已说完，应提前发送 listen/stop
+
+
+class SilenceGate:
+    """上行静音门
+
+    基于 WebRTC VAD 判断每个采集帧是否为语音：
+    - 语音及其拖尾（hangover）帧正常编码发送；
+    - 静音期间不再编码发送，只按固定间隔发送一个预编码的静音帧作为保活，
+      效果等同于 Opus DTX；
+    - 语音起始时补发缓存的预录帧，避免吞掉句首；
+    - AUTO_STOP 模式下静音持续足够长时判定端点，由调用方提前结束监听。
+    """
+
+    # webrtcvad 只接受 10/20/30ms 的帧，采集帧按 10ms 拆分后逐个判定
+    SUB_FRAME_MS = 10
+
+    def __init__(self,
+                 sample_rate=AudioConfig.INPUT_SAMPLE_RATE,
+                 frame_duration=AudioConfig.FRAME_DURATION):
+        """初始化静音门
+
+        参数:
+            sample_rate: 输入采样率
+            frame_duration: 采集帧时长（毫秒）
+        """
+        config = ConfigManager.get_instance()
+        self.enabled = config.get_config("SILENCE_GATE.ENABLED", True)
+        self.sample_rate = sample_rate
+        self.frame_duration = frame_duration
+
+        self.vad = webrtcvad.Vad(config.get_config("SILENCE_GATE.VAD_MODE", 2))
+        self.sub_frame_bytes = int(sample_rate * self.SUB_FRAME_MS / 1000) * 2
+        self.speech_ratio = config.get_config("SILENCE_GATE.SPEECH_RATIO", 0.3)
+
+        # 毫秒参数统一换算为帧数
+        self.hangover_frames = self._ms_to_frames(
+            config.get_config("SILENCE_GATE.HANGOVER_MS", 300))
+        self.keepalive_frames = max(1, self._ms_to_frames(
+            config.get_config("SILENCE_GATE.KEEPALIVE_MS", 400)))
+        self.endpoint_frames = self._ms_to_frames(
+            config.get_config("SILENCE_GATE.ENDPOINT_MS", 800))
+        self.min_speech_frames = self._ms_to_frames(
+            config.get_config("SILENCE_GATE.MIN_SPEECH_MS", 200))
+        self.response_timeout = config.get_config(
+            "SILENCE_GATE.RESPONSE_TIMEOUT_MS", 5000) / 1000
+
+        self.preroll = collections.deque(
+            maxlen=max(1, self._ms_to_frames(
+                config.get_config("SILENCE_GATE.PREROLL_MS", 180))))
+
+        # 统计信息
+        self.sent_frames = 0
+        self.dropped_frames = 0
+
+        self.reset()
+        logger.info(
+            f"静音门初始化完成 [启用={self.enabled}] [拖尾={self.hangover_frames}帧] "
+            f"[端点={self.endpoint_frames}帧] [保活间隔={self.keepalive_frames}帧]"
+        )
+
+    def _ms_to_frames(self, ms):
+        return int(math.ceil(ms / self.frame_duration))
+
+    def reset(self):
+        """重置一轮对话的检测状态（进入LISTENING时调用）"""
+        self.in_speech = False
+        self.speech_frames = 0
+        self.silence_frames = 0
+        self.frames_since_keepalive = 0
+        self.endpointed = False
+        self.endpoint_time = 0
+        self.preroll.clear()
+
+    def is_speech(self, pcm) -> bool:
+        """判断一个采集帧是否为语音"""
+        total = len(pcm) // self.sub_frame_bytes
+        if total == 0:
+            return False
+
+        voiced = 0
+        for i in range(total):
+            chunk = pcm[i * self.sub_frame_bytes:(i + 1) * self.sub_frame_bytes]
+            try:
+                if self.vad.is_speech(chunk, self.sample_rate):
+                    voiced += 1
+            except Exception as e:
+                logger.debug(f"VAD判定失败: {e}")
+                return True  # 判定失败时保守地按语音处理
+        return voiced / total >= self.speech_ratio
+
+    def process(self, pcm, allow_endpoint=False):
+        """处理一个采集帧
+
+        参数:
+            pcm: 16位单声道PCM数据
+            allow_endpoint: 是否允许端点检测（仅AUTO_STOP模式）
+
+        返回:
+            Tuple[str, List[bytes]]: (判定结果, 需要编码发送的PCM帧列表)
+        """
+        if not self.enabled:
+            return GateDecision.SEND, [pcm]
+
+        if self.endpointed:
+            return GateDecision.DROP, []
+
+        if self.is_speech(pcm):
+            self.speech_frames += 1
+            self.silence_frames = 0
+            self.frames_since_keepalive = 0
+            if not self.in_speech:
+                # 语音起始，补发预录帧
+                self.in_speech = True
+                frames = list(self.preroll) + [pcm]
+                self.preroll.clear()
+                self.sent_frames += len(frames)
+                return GateDecision.SEND, frames
+            self.sent_frames += 1
+            return GateDecision.SEND, [pcm]
+
+        self.silence_frames += 1
+
+        # 语音结束后的拖尾帧照常发送，避免截断尾音
+        if self.in_speech and self.silence_frames <= self.hangover_frames:
+            self.sent_frames += 1
+            return GateDecision.SEND, [pcm]
+        self.in_speech = False
+
+        if (allow_endpoint and self.speech_frames >= self.min_speech_frames and
+                self.silence_frames >= self.endpoint_frames):
+            self.endpointed = True
+            self.endpoint_time = time.time()
+            logger.info(
+                f"检测到用户说话结束 [语音帧={self.speech_frames}] "
+                f"[静音帧={self.silence_frames}] [已发送={self.sent_frames}] "
+                f"[已丢弃={self.dropped_frames}]"
+            )
+            return GateDecision.ENDPOINT, []
+
+        self.preroll.append(pcm)
+        self.frames_since_keepalive += 1
+        if self.frames_since_keepalive >= self.keepalive_frames:
+            self.frames_since_keepalive = 0
+            return GateDecision.KEEPALIVE, []
+
+        self.dropped_frames += 1
+        return GateDecision.DROP, []
+
+    def is_response_timeout(self) -> bool:
+        """端点判定后服务器迟迟没有响应"""
+        return (self.endpointed and
+                time.time() - self.endpoint_time > self.response_timeout)
@@ -1,8 +1,8 @@
 import threading
 import time
 import numpy as np
-import pyaudio
 import webrtcvad
+from src.audio_backends.audio_backend import get_audio_backend
 from src.utils.logging_config import get_logger
 from src.constants.constants import AbortReason, DeviceState
 
@@ -51,7 +51,7 @@ class VADDetector:
         self.energy_history = []
         self.history_size = 100
         
-        # 创建独立的PyAudio实例和流
+        # 音频后端和独立流
         self.pa = None
         self.stream = None
         
@@ -175,38 +175,25 @@ class VADDetector:
     def _initialize_audio_stream(self):
         """初始化独立的音频流"""
         try:
-            # 创建PyAudio实例
-            self.pa = pyaudio.PyAudio()
-            
-            # 列出所有设备以便诊断
-            # logger.info(f"发现 {device_count} 个音频设备:")
-            # for i in range(device_count):
-            #     device_info = self.pa.get_device_info_by_index(i)
-            #     logger.info(f"设备 {i}: {device_info['name']} (输入通道: {device_info.get('maxInputChannels', 0)})")
-            
+            # 使用共享的音频后端（设备枚举结果已缓存）
+            self.pa = self.audio_codec.audio if (
+                self.audio_codec and getattr(self.audio_codec, 'audio', None)
+            ) else get_audio_backend()
+
             # 获取默认输入设备
-            device_index = None
-            for i in range(self.pa.get_device_count()):
-                device_info = self.pa.get_device_info_by_index(i)
-                if device_info['maxInputChannels'] > 0:
-                    device_index = i
-                    break
-            
-            if device_index is None:
+            try:
+                device_index = self.pa.get_default_device(is_input=True)
+            except RuntimeError:
                 logger.error("找不到可用的输入设备")
                 return False
-                
-            # 输出设备信息
-            # logger.info(f"VAD将使用音频输入设备: {self.pa.get_device_info_by_index(device_index)['name']} (索引: {device_index})")
-                
+
             # 创建输入流
-            self.stream = self.pa.open(
-                format=pyaudio.paInt16,
-                channels=1,
+            self.stream = self.pa.open_stream(
+                is_input=True,
                 rate=self.sample_rate,
-                input=True,
-                input_device_index=device_index,
+                channels=1,
                 frames_per_buffer=self.frame_size,
+                device_index=device_index,
                 start=True
             )
             
@@ -249,10 +236,8 @@ class VADDetector:
                 self.stream.close()
                 self.stream = None
                 
-            # 只在使用独立PyAudio实例时关闭
-            if not is_shared_stream and self.pa:
-                self.pa.terminate()
-                self.pa = None
+            # 音频后端为共享实例，只清除引用
+            self.pa = None
                 
             # logger.info("VAD音频流已关闭")
         except Exception as e:
@@ -6,8 +6,8 @@ import sys
 from pathlib import Path
 from vosk import Model, KaldiRecognizer, SetLogLevel
 from pypinyin import lazy_pinyin
-import pyaudio
 
+from src.audio_backends.audio_backend import get_audio_backend
 from src.constants.constants import AudioConfig
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
@@ -585,12 +585,11 @@ class WakeWordDetector:
     def _start_standalone(self):
         """独立音频模式"""
         try:
-            self.audio = pyaudio.PyAudio()
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=AudioConfig.CHANNELS,
+            self.audio = get_audio_backend()
+            self.stream = self.audio.open_stream(
+                is_input=True,
                 rate=self.sample_rate,
-                input=True,
+                channels=AudioConfig.CHANNELS,
                 frames_per_buffer=self.buffer_size
             )
 
@@ -793,12 +792,7 @@ class WakeWordDetector:
                 except Exception as e:
                     logger.error(f"关闭音频流失败: {e}")
                     
-            # 清理PyAudio实例
-            if self.audio:
-                try:
-                    self.audio.terminate()
-                except Exception as e:
-                    logger.error(f"终止音频设备失败: {e}")
+            # 音频后端为共享实例，不在这里释放
 
             # 重置状态
             self.stream = None
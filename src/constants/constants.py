@@ -47,13 +47,14 @@ def get_frame_duration() -> int:
     返回:
         int: 帧长度(毫秒)
     """
-    import pyaudio
     try:
 
         if (platform.system() == "Linux" or
                 not is_official_server(config.get_config("SYSTEM_OPTIONS.NETWORK.OTA_VERSION_URL"))):
             return 60
 
+        # 只在需要探测设备时才加载 PortAudio
+        import pyaudio
         p = pyaudio.PyAudio()
         # 获取默认输入设备信息
         device_info = p.get_default_input_device_info()
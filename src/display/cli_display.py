@@ -203,6 +203,7 @@ class CliDisplay(BaseDisplay):
         print("  a     - 开始/停止自动对话")
         print("  x     - 打断当前对话")
         print("  s     - 显示当前状态")
+        print("  p     - 显示音频链路延迟统计")
         print("  q     - 退出程序")
         print("  h     - 显示此帮助信息")
         # 注释掉快捷键说明
@@ -224,6 +225,8 @@ class CliDisplay(BaseDisplay):
                         self._print_help()
                     elif cmd == 's':
                         self._print_current_status()
+                    elif cmd == 'p':
+                        self._print_latency_stats()
                     elif cmd == 'a':
                         if self.auto_callback:
                             self.auto_callback()
@@ -277,6 +280,13 @@ class CliDisplay(BaseDisplay):
         # 启动更新线程
         threading.Thread(target=update_loop, daemon=True).start()
 
+    def _print_latency_stats(self):
+        """打印音频链路延迟统计（毫秒）"""
+        from src.utils.latency_tracer import LatencyTracer
+        print("\n=== 延迟统计(ms) ===")
+        print(LatencyTracer.get_instance().format_summary())
+        print("===================\n")
+
     def _print_current_status(self):
         """打印当前状态"""
         # 检查是否有状态变化
@@ -198,6 +198,7 @@ class GuiDisplay(BaseDisplay, QObject, metaclass=CombinedMeta):
         self.history_title = None
         self.iot_card = None
         self.ha_update_timer = None
+        self._ha_refreshing = False
         self.device_states = {}
         
         # 新增系统托盘相关变量
@@ -1963,49 +1964,47 @@ class GuiDisplay(BaseDisplay, QObject, metaclass=CombinedMeta):
                 self.logger.warning("Home Assistant URL或Token未配置，无法更新设备状态")
                 return
                 
-            # 为每个设备查询状态
-            for entity_id, label in self.device_labels.items():
-                threading.Thread(
-                    target=self._fetch_device_state,
-                    args=(ha_url, ha_token, entity_id, label),
-                    daemon=True
-                ).start()
-                
+            # 上一次批量刷新尚未返回时跳过本次，避免请求堆积
+            if self._ha_refreshing:
+                return
+            self._ha_refreshing = True
+
+            from src.network.ha_client import HomeAssistantClient
+            client = HomeAssistantClient.get_instance()
+            client.configure(ha_url, ha_token)
+            threading.Thread(
+                target=self._fetch_device_states,
+                args=(client, dict(self.device_labels)),
+                daemon=True
+            ).start()
+
         except Exception as e:
             self.logger.error(f"更新Home Assistant设备状态失败: {e}", exc_info=True)
-            
-    def _fetch_device_state(self, ha_url, ha_token, entity_id, label):
-        """获取单个设备的状态"""
-        import requests
-        
+
+    def _fetch_device_states(self, client, device_labels):
+        """一次请求批量获取所有设备的状态"""
         try:
-            # 构造API请求URL
-            api_url = f"{ha_url}/api/states/{entity_id}"
-            headers = {
-                "Authorization": f"Bearer {ha_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # 发送请求
-            response = requests.get(api_url, headers=headers, timeout=5)
-            
-            if response.status_code == 200:
-                state_data = response.json()
+            # 推送在线时直接读缓存，否则按 STATE_TTL 批量拉取
+            client.start_event_stream()
+            states = client.refresh_states()
+            for entity_id, label in device_labels.items():
+                state_data = states.get(entity_id)
+                if state_data is None:
+                    self.logger.warning(f"获取设备状态失败: {entity_id}")
+                    continue
+
                 state = state_data.get("state", "unknown")
-                
+
                 # 更新设备状态
                 self.device_states[entity_id] = state
-                
+
                 # 更新UI
                 self._update_device_ui(entity_id, state, label)
-            else:
-                self.logger.warning(f"获取设备状态失败: {entity_id}, 状态码: {response.status_code}")
-                
-        except requests.RequestException as e:
-            self.logger.error(f"请求Home Assistant API失败: {e}")
         except Exception as e:
             self.logger.error(f"处理设备状态时出错: {e}")
-            
+        finally:
+            self._ha_refreshing = False
+
     def _update_device_ui(self, entity_id, state, label):
         """更新设备UI显示"""
         # 在主线程中执行UI更新
@@ -0,0 +1,135 @@
+"""多会话无界面模式
+
+在一个进程、一个事件循环内同时运行多个虚拟设备（HeadlessSession），
+每个会话有自己的协议连接、AudioCodec 和 ThingManager，音频来自 WAV 文件，
+不加载 GUI、键盘监听、唤醒词模型和声卡。用于对后端做压测。
+
+用法（在项目根目录执行）:
+    python main.py --mode headless --sessions 50 --turns 3 --input-wav say.wav --report load.json
+"""
+import asyncio
+import json
+import logging
+import time
+
+from src.headless.session_audio import summarize
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+from src.utils.opus_loader import setup_opus
+
+logger = get_logger(__name__)
+
+
+async def run_sessions(protocol_type, speech_pcm, sessions, turns, turn_gap,
+                       ramp_up, turn_timeout):
+    """创建并并发运行所有会话，返回报告字典"""
+    from src.headless.headless_session import HeadlessSession
+
+    loop = asyncio.get_running_loop()
+    config = ConfigManager.get_instance()
+    websocket_url = config.get_config("SYSTEM_OPTIONS.NETWORK.WEBSOCKET_URL")
+    mqtt_info = config.get_config("SYSTEM_OPTIONS.NETWORK.MQTT_INFO")
+
+    session_list = [
+        HeadlessSession(index, protocol_type, loop, speech_pcm,
+                        websocket_url=websocket_url, mqtt_info=mqtt_info)
+        for index in range(sessions)
+    ]
+
+    async def start(session):
+        # 错开启动，避免所有会话同时建连
+        await asyncio.sleep(session.index * ramp_up)
+        return await session.run(turns, turn_gap, turn_timeout)
+
+    started = time.monotonic()
+    outcomes = await asyncio.gather(*(start(session) for session in session_list),
+                                    return_exceptions=True)
+    elapsed = time.monotonic() - started
+
+    per_session = []
+    all_results = []
+    for session, outcome in zip(session_list, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"[{session.name}] 运行失败: {outcome}")
+            results = [result.as_dict() for result in session.results]
+            error = str(outcome)
+        else:
+            results = [result.as_dict() for result in outcome]
+            error = None
+        all_results.extend(results)
+        per_session.append({
+            "session": session.name,
+            "device_id": session.device_id,
+            "turns": len(results),
+            "failed_turns": sum(1 for result in results if not result["ok"]) +
+            (turns - len(results)),
+            "error": error,
+            "latency_ms": summarize(results),
+            "results": results,
+        })
+
+    return {
+        "protocol": protocol_type,
+        "sessions": sessions,
+        "turns_per_session": turns,
+        "elapsed_s": round(elapsed, 2),
+        "total_turns": sessions * turns,
+        "failed_turns": sum(item["failed_turns"] for item in per_session),
+        "latency_ms": summarize(all_results),
+        "per_session": per_session,
+    }
+
+
+def print_report(report):
+    print("\n=== 无界面多会话结果 ===")
+    print(f"协议: {report['protocol']}  会话: {report['sessions']}  "
+          f"每会话轮数: {report['turns_per_session']}  失败: {report['failed_turns']}  "
+          f"耗时: {report['elapsed_s']}s")
+    print(f"{'指标':<20}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, item in report["latency_ms"].items():
+        print(f"{name:<20}{item['p50']:>10.1f}{item['p95']:>10.1f}"
+              f"{item['p99']:>10.1f}{item['max']:>10.1f}")
+    print(f"\n{'会话':<14}{'轮数':>6}{'失败':>6}{'turn p50':>12}{'turn max':>12}")
+    for item in report["per_session"]:
+        turn = item["latency_ms"]["turn_latency"]
+        print(f"{item['session']:<14}{item['turns']:>6}{item['failed_turns']:>6}"
+              f"{turn['p50']:>12.1f}{turn['max']:>12.1f}")
+
+
+def run_headless(args):
+    """main.py --mode headless 的入口，返回进程退出码"""
+    config = ConfigManager.get_instance()
+
+    input_wav = args.input_wav or config.get_config("AUDIO_BACKEND.INPUT_FILE")
+    if not input_wav:
+        logger.error("无界面模式需要通过 --input-wav 或 AUDIO_BACKEND.INPUT_FILE 指定发言WAV")
+        return 1
+
+    setup_opus()
+    from src.audio_backends.file_backend import load_wav_pcm
+    from src.constants.constants import AudioConfig
+
+    speech_pcm = load_wav_pcm(input_wav, AudioConfig.INPUT_SAMPLE_RATE)
+
+    sessions = args.sessions or config.get_config("HEADLESS.SESSIONS", 1)
+    turns = args.turns or config.get_config("HEADLESS.TURNS", 3)
+    logger.info(f"无界面模式: {sessions} 个会话, 每个 {turns} 轮, 协议 {args.protocol}")
+
+    # 大量会话时逐条 INFO 日志本身就会成为瓶颈
+    if sessions > 1:
+        logging.disable(logging.INFO)
+
+    report = asyncio.run(run_sessions(
+        args.protocol, speech_pcm, sessions, turns,
+        turn_gap=config.get_config("HEADLESS.TURN_GAP", 1.0),
+        ramp_up=config.get_config("HEADLESS.RAMP_UP", 0.05),
+        turn_timeout=config.get_config("HEADLESS.TURN_TIMEOUT", 30.0)
+    ))
+    print_report(report)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.report}")
+
+    return 1 if report["failed_turns"] else 0
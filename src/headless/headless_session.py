@@ -0,0 +1,231 @@
+import asyncio
+import json
+import time
+import uuid
+
+from src.audio_codecs.audio_codec import AudioCodec
+from src.audio_processing.silence_gate import GateDecision, SilenceGate
+from src.constants.constants import AudioConfig, DeviceState, ListeningMode
+from src.headless.session_audio import SessionAudio, TurnResult
+from src.iot.thing_manager import ThingManager
+from src.iot.things.lamp import Lamp
+from src.protocols.mqtt_protocol import MqttProtocol
+from src.protocols.websocket_protocol import WebsocketProtocol
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class HeadlessSession:
+    """单个虚拟设备的对话状态机
+
+    与 Application 的流程一致（打开音频通道 -> 监听 -> 静音门端点 -> 接收并播放TTS），
+    但不依赖任何单例：协议、AudioCodec、SilenceGate 和 ThingManager 都由会话自己持有，
+    采集、播放和混音都在共享的事件循环上完成，会话不创建自己的线程（MQTT 协议的
+    paho 客户端自带一个网络线程），便于单进程内运行大量会话。
+    """
+
+    def __init__(self, index, protocol_type, loop, speech_pcm,
+                 websocket_url=None, mqtt_info=None, record=False):
+        """
+        参数:
+            index: 会话编号，用于生成设备ID和日志
+            protocol_type: websocket 或 mqtt
+            loop: 共享的事件循环
+            speech_pcm: 每轮回放的发言（INPUT_SAMPLE_RATE 单声道16位PCM）
+            websocket_url: 覆盖配置中的 WebSocket 地址
+            mqtt_info: MQTT连接信息，会为每个会话生成独立的 client_id
+            record: 是否记录播放设备收到的全部音频（self.audio.save_output）
+        """
+        self.index = index
+        self.loop = loop
+        self.name = f"session-{index}"
+        self.state = DeviceState.IDLE
+        self.results = []
+
+        # 本地管理的MAC地址，保证每个会话的设备ID唯一
+        self.device_id = "02:00:{:02x}:{:02x}:{:02x}:{:02x}".format(
+            *index.to_bytes(4, "big"))
+        self.client_id = str(uuid.uuid4())
+
+        if protocol_type == "mqtt":
+            info = dict(mqtt_info or {})
+            if info.get("client_id"):
+                info["client_id"] = f"{info['client_id']}-{index}"
+            self.protocol = MqttProtocol(loop, mqtt_info=info)
+        else:
+            self.protocol = WebsocketProtocol(
+                url=websocket_url, device_id=self.device_id, client_id=self.client_id)
+
+        self.audio = SessionAudio(speech_pcm, AudioConfig.INPUT_SAMPLE_RATE, record=record)
+        # 非实时输出写入不阻塞，不需要混音线程，播放时在事件循环上同步混音
+        self.audio_codec = AudioCodec(backend=self.audio.create_backend(), mixer_thread=False)
+        self.silence_gate = SilenceGate()
+
+        # 每个会话独立的物联网设备表（只用纯虚拟设备，避免依赖 Application）
+        self.thing_manager = ThingManager()
+        self.thing_manager.add_thing(Lamp())
+
+        self._result = None
+        self._turn_done = None
+        self._capture_task = None
+
+        self.protocol.on_incoming_json = self._on_incoming_json
+        self.protocol.on_incoming_audio = self._on_incoming_audio
+        self.protocol.on_audio_channel_opened = self._on_audio_channel_opened
+        self.protocol.on_audio_channel_closed = self._on_audio_channel_closed
+        # MqttProtocol 会 await 网络错误回调，WebsocketProtocol 则直接调用
+        if isinstance(self.protocol, MqttProtocol):
+            self.protocol.on_network_error = self._on_network_error_async
+        else:
+            self.protocol.on_network_error = self._on_network_error
+
+    async def run(self, turns, turn_gap=1.0, turn_timeout=30.0):
+        """执行若干轮对话，返回每轮结果列表"""
+        self.start()
+        try:
+            for turn in range(turns):
+                result = await self.run_turn(turn_timeout)
+                self.results.append(result)
+                logger.info(f"[{self.name}] 第{turn + 1}轮: ok={result.ok}, "
+                            f"turn_latency={result.turn_latency}")
+                if turn < turns - 1:
+                    await asyncio.sleep(turn_gap)
+        finally:
+            await self.close()
+        return self.results
+
+    def start(self):
+        """启动虚拟音频流（单独调用 run_turn 前需要先调用）"""
+        self.audio_codec.start_streams()
+
+    async def run_turn(self, timeout=30.0):
+        """执行一轮对话，返回 TurnResult"""
+        self._result = TurnResult()
+        self._turn_done = asyncio.Event()
+        self.audio_codec.clear_audio_queue()
+
+        wake_time = time.monotonic()
+        if not self.protocol.is_audio_channel_opened():
+            if not await self.protocol.open_audio_channel():
+                self._result.error = self._result.error or "open_audio_channel"
+                logger.error(f"[{self.name}] 打开音频通道失败")
+                return self._result
+        await self.protocol.send_start_listening(ListeningMode.AUTO_STOP)
+        self._result.wake_to_listen = time.monotonic() - wake_time
+
+        self.silence_gate.reset()
+        self.audio.start_turn()
+        self.state = DeviceState.LISTENING
+        self._capture_task = asyncio.ensure_future(self._capture())
+
+        try:
+            await asyncio.wait_for(self._turn_done.wait(), timeout)
+            self._result.ok = self._result.error is None
+        except asyncio.TimeoutError:
+            self._result.error = "timeout"
+            logger.error(f"[{self.name}] 本轮对话超时")
+        finally:
+            self.state = DeviceState.IDLE
+            if not self._capture_task.done():
+                self._capture_task.cancel()
+        return self._result
+
+    async def close(self):
+        try:
+            if self.protocol.is_audio_channel_opened():
+                await self.protocol.close_audio_channel()
+        except Exception as e:
+            logger.warning(f"[{self.name}] 关闭音频通道失败: {e}")
+        self.audio_codec.close()
+
+    def _elapsed_since_speech_end(self):
+        speech_end = self.audio.speech_end_time
+        if speech_end is None:
+            return None
+        return time.monotonic() - speech_end
+
+    async def _capture(self):
+        """按帧时长节拍采集并经静音门上行，流程与 Application._handle_input_audio 相同"""
+        interval = AudioConfig.FRAME_DURATION / 1000
+        next_tick = time.monotonic()
+        while self.state == DeviceState.LISTENING:
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+            pcm = self.audio_codec.read_pcm()
+            if not pcm:
+                continue
+
+            decision, frames = self.silence_gate.process(pcm, allow_endpoint=True)
+            if decision == GateDecision.ENDPOINT:
+                self._result.endpoint_delay = self._elapsed_since_speech_end()
+                self.state = DeviceState.CONNECTING  # 等待服务器回复
+                await self.protocol.send_stop_listening()
+                return
+
+            if decision == GateDecision.KEEPALIVE:
+                encoded_frames = [self.audio_codec.get_silence_frame()]
+            elif decision == GateDecision.SEND:
+                encoded_frames = [self.audio_codec.encode(frame) for frame in frames]
+            else:
+                continue
+            for frame in encoded_frames:
+                if frame:
+                    await self.protocol.send_audio(frame)
+
+    def _on_incoming_json(self, json_data):
+        if not json_data or not self._result:
+            return
+        data = json.loads(json_data) if isinstance(json_data, str) else json_data
+        msg_type = data.get("type", "")
+        if msg_type == "stt":
+            self._result.stt_delay = self._elapsed_since_speech_end()
+        elif msg_type == "tts":
+            state = data.get("state")
+            if state == "start":
+                self._result.tts_start_delay = self._elapsed_since_speech_end()
+                self.state = DeviceState.SPEAKING
+            elif state == "stop":
+                self._finish_turn()
+        elif msg_type == "iot":
+            for command in data.get("commands", []):
+                try:
+                    self.thing_manager.invoke(command)
+                except Exception as e:
+                    logger.error(f"[{self.name}] 执行物联网命令失败: {e}")
+
+    def _finish_turn(self):
+        first_output = self.audio.first_output_time
+        speech_end = self.audio.speech_end_time
+        if first_output is not None and speech_end is not None:
+            self._result.turn_latency = first_output - speech_end
+        if self._turn_done:
+            self._turn_done.set()
+
+    def _on_incoming_audio(self, data):
+        if self.state != DeviceState.SPEAKING:
+            return
+        if self._result.first_audio_delay is None:
+            self._result.first_audio_delay = self._elapsed_since_speech_end()
+        # 非实时输出流写入不阻塞，直接在事件循环上解码播放
+        self.audio_codec.write_audio(data)
+        self.audio_codec.play_audio()
+
+    async def _on_audio_channel_opened(self):
+        logger.debug(f"[{self.name}] 音频通道已打开")
+        await self.protocol.send_iot_descriptors(self.thing_manager.get_descriptors_json(),
+                                                 self.thing_manager.get_descriptors_hash())
+        await self.protocol.send_iot_states(self.thing_manager.get_states_json_str())
+
+    async def _on_audio_channel_closed(self):
+        logger.debug(f"[{self.name}] 音频通道已关闭")
+
+    def _on_network_error(self, message=None):
+        logger.error(f"[{self.name}] 网络错误: {message}")
+        if self._result and self._turn_done and not self._turn_done.is_set():
+            self._result.error = str(message)
+            self._turn_done.set()
+
+    async def _on_network_error_async(self, message=None):
+        self._on_network_error(message)
@@ -0,0 +1,103 @@
+"""虚拟设备会话的测量工具
+
+无界面多会话模式和离线基准测试共用：单轮结果字段、延迟汇总，
+以及回放发言并记录输出时刻的虚拟音频设备。
+"""
+import threading
+import time
+
+from src.audio_backends.file_backend import SAMPLE_WIDTH, FileBackend, WavSink
+from src.utils.latency_tracer import LatencyStats
+
+# 报告中汇总的延迟字段（与 TurnResult 的属性同名）
+METRICS = ["wake_to_listen", "endpoint_delay", "stt_delay", "tts_start_delay",
+           "first_audio_delay", "turn_latency"]
+
+
+class TurnResult:
+    """一轮对话的测量结果（秒，均相对于用户说完话的时刻，wake_to_listen 除外）"""
+
+    def __init__(self):
+        self.wake_to_listen = None    # 唤醒 -> listen start 发出
+        self.endpoint_delay = None    # 语音结束 -> listen stop 发出
+        self.stt_delay = None         # 语音结束 -> 收到 stt
+        self.tts_start_delay = None   # 语音结束 -> 收到 tts start
+        self.first_audio_delay = None  # 语音结束 -> 收到首个下行音频包
+        self.turn_latency = None      # 语音结束 -> 首个TTS音频写入播放设备
+        self.error = None
+        self.ok = False
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def summarize(results):
+    """汇总多轮结果（TurnResult.as_dict() 列表）中各项延迟（毫秒）"""
+    stats = {key: LatencyStats() for key in METRICS}
+    for result in results:
+        for key in METRICS:
+            value = result.get(key)
+            if value is not None:
+                stats[key].add(value * 1000)
+    return {key: item.summary() for key, item in stats.items()}
+
+
+class SessionAudio:
+    """会话的虚拟音频设备：输入回放一段发言，输出记录首个非静音块的写入时刻
+
+    发言PCM由所有会话共享，不做拷贝。record 为 True 时保留收到的全部输出，
+    可用 save_output() 保存为WAV。
+    """
+
+    def __init__(self, speech_pcm, sample_rate, lead_silence=0.3, record=False):
+        self.sample_rate = sample_rate
+        self.lead_bytes = int(lead_silence * sample_rate) * SAMPLE_WIDTH
+        self.speech_pcm = speech_pcm
+        self.speech_end_offset = self.lead_bytes + len(speech_pcm)
+        self._lock = threading.Lock()
+        self._cursor = None
+        self.speech_end_time = None
+        self.first_output_time = None
+        self.recorded = bytearray() if record else None
+
+    def start_turn(self):
+        """开始新一轮：从头回放发言并清除输出记录点"""
+        with self._lock:
+            self._cursor = 0
+            self.speech_end_time = None
+            self.first_output_time = None
+
+    def take(self, size, chunk_end_time=None):
+        # 采集由会话按帧时长调度，以读取时刻作为该块的采集时刻
+        now = time.monotonic()
+        with self._lock:
+            if self._cursor is None or self._cursor >= self.speech_end_offset:
+                return bytes(size)
+
+            start = self._cursor
+            self._cursor += size
+            chunk = bytearray()
+            if start < self.lead_bytes:
+                chunk.extend(bytes(min(size, self.lead_bytes - start)))
+            speech_start = max(0, start + len(chunk) - self.lead_bytes)
+            chunk.extend(self.speech_pcm[speech_start:speech_start + size - len(chunk)])
+            if self._cursor >= self.speech_end_offset:
+                tail = (self._cursor - self.speech_end_offset) // SAMPLE_WIDTH
+                self.speech_end_time = now - tail / self.sample_rate
+            return bytes(chunk) + bytes(size - len(chunk))
+
+    def on_output(self, data):
+        if self.first_output_time is None and any(data):
+            self.first_output_time = time.monotonic()
+        if self.recorded is not None:
+            self.recorded.extend(data)
+
+    def create_backend(self):
+        """创建以本设备为音源和接收端的非实时 file 音频后端"""
+        return FileBackend(input_source=self, output_sink=self, realtime=False)
+
+    def save_output(self, path, sample_rate):
+        """把记录的输出保存为WAV（需以 record=True 创建）"""
+        sink = WavSink(path, sample_rate)
+        sink.on_output(bytes(self.recorded or b""))
+        sink.close()
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+# 字段: (最小值, 最大值)
+_FIELDS = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 6),  # 0 = 星期日，7 也表示星期日
+]
+
+_NAMES = {
+    "month": {name: i for i, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun",
+         "jul", "aug", "sep", "oct", "nov", "dec"], start=1)},
+    "weekday": {name: i for i, name in enumerate(
+        ["sun", "mon", "tue", "wed", "thu", "fri", "sat"])},
+}
+
+# 查找下一次触发时间时最多向后搜索的年数
+_MAX_YEARS = 5
+
+
+class CronSchedule:
+    """标准5段 cron 表达式：分 时 日 月 周
+
+    支持 *、数字、范围 a-b、步长 */n 或 a-b/n、逗号列表，以及月份/星期英文缩写。
+    日和周都被限定时按 cron 惯例取“或”。时间按本地时间计算。
+
+    例如 "0 7 * * 1-5" 表示每个工作日 7:00。
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        parts = self.expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 表达式需要5个字段: {expression}")
+
+        self.fields = {}
+        self.restricted = {}
+        for part, (name, low, high) in zip(parts, _FIELDS):
+            self.fields[name] = self._parse_field(part, name, low, high)
+            self.restricted[name] = part != "*"
+
+    @staticmethod
+    def _parse_value(text, name):
+        text = text.lower()
+        if text in _NAMES.get(name, {}):
+            return _NAMES[name][text]
+        return int(text)
+
+    def _parse_field(self, text, name, low, high):
+        values = set()
+        for item in text.split(","):
+            step = 1
+            if "/" in item:
+                item, step_text = item.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"步长必须为正数: {text}")
+
+            if item in ("*", ""):
+                start, end = low, high
+            elif "-" in item:
+                start_text, end_text = item.split("-", 1)
+                start = self._parse_value(start_text, name)
+                end = self._parse_value(end_text, name)
+            else:
+                start = self._parse_value(item, name)
+                end = high if step > 1 else start
+
+            if name == "weekday":
+                # 7 和 0 都表示星期日
+                start, end = min(start, 7), min(end, 7)
+            else:
+                if not (low <= start <= high and low <= end <= high):
+                    raise ValueError(f"{name} 字段超出范围 {low}-{high}: {text}")
+            if start > end:
+                raise ValueError(f"无效的范围: {text}")
+
+            for value in range(start, end + 1, step):
+                values.add(0 if name == "weekday" and value == 7 else value)
+        return frozenset(values)
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.fields["day"]
+        # datetime.weekday(): 0 = 星期一，转换为 cron 的 0 = 星期日
+        weekday_ok = (moment.weekday() + 1) % 7 in self.fields["weekday"]
+        if self.restricted["day"] and self.restricted["weekday"]:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """返回严格晚于 after 的下一个触发时间（精确到分钟）"""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after.year + _MAX_YEARS
+        while moment.year <= limit:
+            if moment.month not in self.fields["month"]:
+                # 跳到下个月1日 0:00
+                year = moment.year + moment.month // 12
+                month = moment.month % 12 + 1
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if moment.hour not in self.fields["hour"]:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+                continue
+            if moment.minute not in self.fields["minute"]:
+                moment += timedelta(minutes=1)
+                continue
+            return moment
+        raise ValueError(f"cron 表达式在 {_MAX_YEARS} 年内没有触发时间: {self.expression}")
+
+    def next_timestamp(self, after_ts: float) -> float:
+        """以时间戳表示的 next_after"""
+        return self.next_after(datetime.fromtimestamp(after_ts)).timestamp()
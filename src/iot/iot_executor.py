@@ -0,0 +1,229 @@
+import collections
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class IotCommandTimeout(TimeoutError):
+    """物联网命令在超时时间内未完成"""
+
+
+class IotExecutor:
+    """物联网命令执行器 - 单例模式
+
+    不同设备的命令在共享线程池中并发执行，同一设备的命令按到达顺序串行执行
+    （每个设备一条队列，同一时刻最多占用一个工作线程）。提交后立即返回 Future，
+    调用方不会被智能家居请求阻塞。
+
+    超时只影响结果：到期后 Future 以 IotCommandTimeout 结束，已经开始的调用
+    无法被中断，会在后台执行完毕后丢弃结果；排队期间就已过期的命令不再执行。
+    所有命令的截止时间放在一个最小堆里，由一个监视线程统一处理，
+    命令完成时从堆中移除，不会为每条命令单独创建定时器线程。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """获取单例实例"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_workers=None, default_timeout=None):
+        config = ConfigManager.get_instance()
+        self.max_workers = max_workers or config.get_config("IOT_EXECUTOR.MAX_WORKERS", 8)
+        self.default_timeout = default_timeout or config.get_config(
+            "IOT_EXECUTOR.DEFAULT_TIMEOUT", 10.0)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix="iot")
+        self._lanes: Dict[tuple, collections.deque] = {}
+        self._lanes_lock = threading.Lock()
+        self._closed = False
+
+        # 超时监视：截止时间最小堆 + 一个监视线程
+        self._watch_cond = threading.Condition()
+        self._watched: Dict[int, tuple] = {}  # seq -> (future, command, timeout)
+        self._deadlines: List[tuple] = []  # (deadline, seq)
+        self._seq = itertools.count()
+        self._watchdog = None
+
+    def submit(self, command: Dict, thing_manager=None, timeout: Optional[float] = None,
+               callback: Optional[Callable[[Dict, Future], None]] = None) -> Future:
+        """
+        提交一条物联网命令
+
+        Args:
+            command: 包含name、method、parameters的命令字典
+            thing_manager: 执行命令的设备管理器，默认使用 ThingManager 单例
+            timeout: 超时时间（秒），默认读取 IOT_EXECUTOR.DEFAULT_TIMEOUT，0 表示不超时
+            callback: 完成回调 callback(command, future)，在工作线程或超时监视线程中调用
+
+        Returns:
+            Future: 结果为 thing_manager.invoke 的返回值
+        """
+        if thing_manager is None:
+            from src.iot.thing_manager import ThingManager
+            thing_manager = ThingManager.get_instance()
+        if timeout is None:
+            timeout = self.default_timeout
+
+        future = Future()
+        if callback:
+            future.add_done_callback(lambda f: self._run_callback(callback, command, f))
+
+        if self._closed:
+            future.set_exception(RuntimeError("物联网命令执行器已关闭"))
+            return future
+
+        deadline = None
+        if timeout and timeout > 0:
+            deadline = time.monotonic() + timeout
+            self._watch(deadline, future, command, timeout)
+
+        # 同一个设备管理器中的同名设备共用一条串行队列
+        lane_key = (id(thing_manager), command.get("name"))
+        with self._lanes_lock:
+            lane = self._lanes.get(lane_key)
+            if lane is None:
+                lane = self._lanes[lane_key] = collections.deque()
+                start_worker = True
+            else:
+                start_worker = False
+            lane.append((command, future, deadline, thing_manager))
+
+        if start_worker:
+            self._pool.submit(self._drain, lane_key)
+        return future
+
+    def submit_all(self, commands: List[Dict], thing_manager=None,
+                   timeout: Optional[float] = None,
+                   callback: Optional[Callable[[Dict, Future], None]] = None) -> List[Future]:
+        """批量提交命令，返回与命令顺序一致的 Future 列表"""
+        return [self.submit(command, thing_manager, timeout, callback) for command in commands]
+
+    def _drain(self, lane_key):
+        """依次执行某个设备队列中的命令，队列为空时释放该队列"""
+        while True:
+            with self._lanes_lock:
+                lane = self._lanes.get(lane_key)
+                if not lane:
+                    self._lanes.pop(lane_key, None)
+                    return
+                command, future, deadline, thing_manager = lane.popleft()
+
+            if deadline is not None and time.monotonic() >= deadline:
+                # 排队期间已超时，不再执行
+                continue
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+            except RuntimeError:
+                # 已被超时监视线程结束
+                continue
+
+            try:
+                result = thing_manager.invoke(command)
+            except Exception as e:
+                self._set_exception(future, e)
+            else:
+                if not self._set_result(future, result):
+                    logger.warning(f"物联网命令超时后才完成，结果已丢弃: "
+                                   f"{command.get('name')}.{command.get('method')}")
+
+    def _watch(self, deadline, future, command, timeout):
+        """登记截止时间，命令完成后自动注销"""
+        with self._watch_cond:
+            seq = next(self._seq)
+            self._watched[seq] = (future, command, timeout)
+            heapq.heappush(self._deadlines, (deadline, seq))
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch_loop, daemon=True,
+                                                  name="iot-timeout")
+                self._watchdog.start()
+            # 新的截止时间可能比当前等待的更早
+            self._watch_cond.notify()
+        future.add_done_callback(lambda f: self._unwatch(seq))
+
+    def _unwatch(self, seq):
+        with self._watch_cond:
+            if self._watched.pop(seq, None) is None:
+                return
+            # 已完成的条目超过一半时重建堆，避免大批命令完成后堆无限增长
+            if len(self._deadlines) > 2 * len(self._watched) + 16:
+                self._deadlines = [entry for entry in self._deadlines if entry[1] in self._watched]
+                heapq.heapify(self._deadlines)
+
+    def _watch_loop(self):
+        while True:
+            with self._watch_cond:
+                if self._closed:
+                    self._watchdog = None
+                    return
+                now = time.monotonic()
+                expired = []
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, seq = heapq.heappop(self._deadlines)
+                    entry = self._watched.pop(seq, None)
+                    if entry is not None:
+                        expired.append(entry)
+                if not expired:
+                    timeout = self._deadlines[0][0] - now if self._deadlines else None
+                    self._watch_cond.wait(timeout)
+                    continue
+
+            for future, command, timeout in expired:
+                self._expire(future, command, timeout)
+
+    def _expire(self, future, command, timeout):
+        if self._set_exception(future, IotCommandTimeout(
+                f"物联网命令超时({timeout}s): {command.get('name')}.{command.get('method')}")):
+            logger.warning(f"物联网命令超时: {command.get('name')}.{command.get('method')}")
+
+    @staticmethod
+    def _set_result(future, result):
+        try:
+            future.set_result(result)
+            return True
+        except Exception:
+            # 已被超时或取消
+            return False
+
+    @staticmethod
+    def _set_exception(future, exc):
+        try:
+            future.set_exception(exc)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _run_callback(callback, command, future):
+        try:
+            callback(command, future)
+        except Exception as e:
+            logger.error(f"物联网命令回调出错: {e}")
+
+    def shutdown(self, wait=False):
+        """关闭执行器，未开始的命令不再执行"""
+        self._closed = True
+        with self._watch_cond:
+            self._watch_cond.notify()
+        with self._lanes_lock:
+            pending = [item for lane in self._lanes.values() for item in lane]
+            for lane in self._lanes.values():
+                lane.clear()
+        for _, future, _, _ in pending:
+            future.cancel()
+        self._pool.shutdown(wait=wait)
@@ -2,6 +2,9 @@ import json
 from typing import Dict, List, Callable, Any, Optional, Union
 
 
+_UNSET = object()
+
+
 class ValueType:
     BOOLEAN = "boolean"
     NUMBER = "number"
@@ -9,21 +12,35 @@ class ValueType:
 
 
 class Property:
-    def __init__(self, name: str, description: str, getter: Callable):
+    def __init__(self, name: str, description: str, getter: Callable,
+                 type_: Optional[str] = None):
+        """
+        Args:
+            type_: 属性类型（ValueType），不指定时在第一次需要类型时调用 getter 推断，
+                   注册时不会调用 getter
+        """
         self.name = name
         self.description = description
         self.getter = getter
+        self.value = _UNSET  # 由 Thing.update_property 推送的最新值
+        self._type = type_
+
+    @property
+    def type(self) -> str:
+        if self._type is None:
+            self._type = self._infer_type()
+        return self._type
 
+    def _infer_type(self) -> str:
         # 根据 getter 返回值类型确定属性类型
-        test_value = getter()
+        test_value = self.get_state_value()
         if isinstance(test_value, bool):
-            self.type = ValueType.BOOLEAN
+            return ValueType.BOOLEAN
         elif isinstance(test_value, (int, float)):
-            self.type = ValueType.NUMBER
+            return ValueType.NUMBER
         elif isinstance(test_value, str):
-            self.type = ValueType.STRING
-        else:
-            raise TypeError(f"不支持的属性类型: {type(test_value)}")
+            return ValueType.STRING
+        raise TypeError(f"不支持的属性类型: {self.name} {type(test_value)}")
 
     def get_descriptor_json(self) -> Dict:
         return {
@@ -32,6 +49,9 @@ class Property:
         }
 
     def get_state_value(self):
+        """优先返回推送的值，从未推送过时才调用 getter"""
+        if self.value is not _UNSET:
+            return self.value
         return self.getter()
 
 
@@ -52,6 +72,12 @@ class Parameter:
     def set_value(self, value: Any):
         self.value = value
 
+    def bind(self, value: Any) -> "Parameter":
+        """返回绑定了取值的新参数对象，不修改方法上共享的参数定义"""
+        bound = Parameter(self.name, self.description, self.type, self.required)
+        bound.value = value
+        return bound
+
     def get_value(self) -> Any:
         return self.value
 
@@ -71,32 +97,59 @@ class Method:
         }
 
     def invoke(self, params: Dict[str, Any]) -> Any:
-        # 设置参数值
-        for name, value in params.items():
-            if name in self.parameters:
-                self.parameters[name].set_value(value)
+        # 每次调用单独绑定参数值，同一方法被并发调用时互不影响
+        bound = {name: param.bind(params.get(name))
+                 for name, param in self.parameters.items()}
 
         # 检查必需参数
-        for name, param in self.parameters.items():
+        for name, param in bound.items():
             if param.required and param.get_value() is None:
                 raise ValueError(f"缺少必需参数: {name}")
 
         # 调用回调函数
-        return self.callback(self.parameters)
+        return self.callback(bound)
 
 
 class Thing:
+    # 为 True 表示该设备的每次属性变化都会通过 update_property 推送，
+    # ThingManager 计算增量状态时不再调用它的 getter
+    push_states = False
+
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
         self.properties = {}
         self.methods = {}
-
-    def add_property(self, name: str, description: str, getter: Callable) -> None:
-        self.properties[name] = Property(name, description, getter)
+        self.on_property_changed = None  # 由 ThingManager 设置
+        self.on_descriptor_changed = None  # 由 ThingManager 设置
+
+    def add_property(self, name: str, description: str, getter: Callable,
+                     type_: Optional[str] = None) -> None:
+        self.properties[name] = Property(name, description, getter, type_)
+        if self.on_descriptor_changed:
+            self.on_descriptor_changed()
+
+    def update_property(self, name: str, value: Any) -> bool:
+        """
+        推送属性的新值
+
+        Returns:
+            bool: 值是否发生变化（变化时通知 ThingManager）
+        """
+        prop = self.properties.get(name)
+        if prop is None:
+            raise ValueError(f"属性不存在: {name}")
+        if prop.value is not _UNSET and prop.value == value:
+            return False
+        prop.value = value
+        if self.on_property_changed:
+            self.on_property_changed(self, name)
+        return True
 
     def add_method(self, name: str, description: str, parameters: List[Parameter], callback: Callable) -> None:
         self.methods[name] = Method(name, description, parameters, callback)
+        if self.on_descriptor_changed:
+            self.on_descriptor_changed()
 
     def get_descriptor_json(self) -> Dict:
         return {
@@ -1,6 +1,9 @@
+import hashlib
 import json
 import logging
-from typing import Any, Dict, Tuple, Optional
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple, Optional
 
 from src.iot.thing import Thing
 
@@ -16,14 +19,42 @@ class ThingManager:
 
     def __init__(self):
         self.things = []
+        self._things_by_name = {}  # 设备名 -> 设备
         self.last_states = {}  # 添加状态缓存字典，存储上一次的状态
+        self._dirty = set()  # 推送过变化、尚未上报的设备名
+        self._dirty_lock = threading.Lock()
+        self._descriptors = None  # (JSON字符串, 内容哈希)，设备变化时失效
 
     def add_thing(self, thing: Thing) -> None:
+        thing.on_property_changed = self._on_property_changed
+        thing.on_descriptor_changed = self._invalidate_descriptors
         self.things.append(thing)
+        self._things_by_name[thing.name] = thing
+        self._invalidate_descriptors()
+
+    def _invalidate_descriptors(self) -> None:
+        self._descriptors = None
+
+    def _on_property_changed(self, thing: Thing, name: str) -> None:
+        with self._dirty_lock:
+            self._dirty.add(thing.name)
+
+    def _get_descriptors(self) -> Tuple[str, str]:
+        descriptors = self._descriptors
+        if descriptors is None:
+            descriptors_json = json.dumps(
+                [thing.get_descriptor_json() for thing in self.things])
+            descriptors_hash = hashlib.sha256(descriptors_json.encode("utf-8")).hexdigest()
+            descriptors = self._descriptors = (descriptors_json, descriptors_hash)
+        return descriptors
 
     def get_descriptors_json(self) -> str:
-        descriptors = [thing.get_descriptor_json() for thing in self.things]
-        return json.dumps(descriptors)
+        """所有设备的描述JSON（缓存，设备或其属性/方法变化时重新生成）"""
+        return self._get_descriptors()[0]
+
+    def get_descriptors_hash(self) -> str:
+        """描述JSON的内容哈希，用于判断是否需要重新发送"""
+        return self._get_descriptors()[1]
 
     def get_states_json(self, delta=False) -> Tuple[bool, str]:
         """
@@ -34,14 +65,32 @@ class ThingManager:
             
         Returns:
             Tuple[str, bool]: 返回JSON字符串和是否有状态变化的布尔值
+
+        push_states 为 True 的设备在增量模式下只看推送标记，不调用 getter；
+        其余设备仍然逐个读取并与上次的状态比较。
         """
         if not delta:
             self.last_states.clear()
-        
+
+        with self._dirty_lock:
+            dirty = self._dirty
+            self._dirty = set()
+
         changed = False
         states = []
         
         for thing in self.things:
+            if delta and thing.push_states:
+                if thing.name not in dirty:
+                    continue
+                state_json = thing.get_state_json()
+                if self.last_states.get(thing.name) == state_json:
+                    continue
+                changed = True
+                self.last_states[thing.name] = state_json
+                states.append(state_json)
+                continue
+
             state_json = thing.get_state_json()
             
             if delta:
@@ -79,10 +128,62 @@ class ThingManager:
             Optional[Any]: 如果找到设备并调用成功，返回调用结果；否则抛出异常
         """
         thing_name = command.get("name")
-        for thing in self.things:
-            if thing.name == thing_name:
-                return thing.invoke(command)
+        thing = self._things_by_name.get(thing_name)
+        if thing is not None:
+            return thing.invoke(command)
         
         # 记录错误日志
         logging.error(f"设备不存在: {thing_name}")
-        raise ValueError(f"设备不存在: {thing_name}")
\ No newline at end of file
+        raise ValueError(f"设备不存在: {thing_name}")
+
+    def invoke_batch(self, commands: List[Dict], timeout: Optional[float] = None) -> Future:
+        """
+        批量调用设备方法：同一设备的命令按顺序串行，不同设备并行执行，不阻塞调用方
+
+        Args:
+            commands: 命令字典列表
+            timeout: 单条命令超时（秒），默认使用 IotExecutor 的配置
+
+        Returns:
+            Future: 全部命令结束后完成，结果为与 commands 顺序一致的列表，每项包含
+                    name、method、success，以及 result 或 error，可直接放进一条 iot 消息回传
+        """
+        from src.iot.iot_executor import IotExecutor
+
+        batch = Future()
+        futures = IotExecutor.get_instance().submit_all(commands, self, timeout)
+        if not futures:
+            batch.set_result([])
+            return batch
+
+        remaining = [len(futures)]
+        remaining_lock = threading.Lock()
+
+        def on_done(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            batch.set_result([self._batch_item(command, future)
+                              for command, future in zip(commands, futures)])
+
+        for future in futures:
+            future.add_done_callback(on_done)
+        return batch
+
+    @staticmethod
+    def _batch_item(command: Dict, future: Future) -> Dict:
+        """把单条命令的执行结果转换为回传条目"""
+        item = {"name": command.get("name"), "method": command.get("method")}
+        if future.cancelled():
+            item["error"] = "cancelled"
+            item["success"] = False
+            return item
+        error = future.exception()
+        if error is not None:
+            item["error"] = str(error) or type(error).__name__
+            item["success"] = False
+        else:
+            item["result"] = future.result()
+            item["success"] = True
+        return item
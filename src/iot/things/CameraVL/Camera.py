@@ -1,14 +1,14 @@
 import asyncio
 
-import cv2
-import base64
 import logging
-import threading
+import time
 
 from src.application import Application
 from src.constants.constants import DeviceState
 from src.iot.thing import Thing
 from src.iot.things.CameraVL import VL
+from src.iot.things.CameraVL.capture_service import CaptureService
+from src.iot.things.CameraVL.preprocess import FrameEncoder, SceneCache, dhash
 
 logger = logging.getLogger("Camera")
 
@@ -22,12 +22,31 @@ class Camera(Thing):
             return
         self._initialized = True
         # 加载配置
-        self.cap = None
-        self.is_running = False
-        self.camera_thread = None
         self.result=""
         from src.utils.config_manager import ConfigManager
         self.config = ConfigManager.get_instance()
+        # 采集服务：独占摄像头，识别时直接取最新一帧
+        self.capture = CaptureService(
+            camera_index=self.config.get_config('CAMERA.camera_index', 0),
+            width=self.config.get_config('CAMERA.frame_width', 640),
+            height=self.config.get_config('CAMERA.frame_height', 480),
+            fps=self.config.get_config('CAMERA.fps', 30),
+            idle_fps=self.config.get_config('CAMERA.idle_fps', 2),
+            idle_width=self.config.get_config('CAMERA.idle_frame_width', 0),
+            idle_height=self.config.get_config('CAMERA.idle_frame_height', 0),
+            idle_after=self.config.get_config('CAMERA.idle_after', 10),
+            preview=self.config.get_config('CAMERA.preview', False),
+        )
+        # 上传前缩放压缩；相近的画面复用上次的识别结果
+        self.encoder = FrameEncoder(
+            max_side=self.config.get_config('CAMERA.vl_max_side', 1024),
+            fmt=self.config.get_config('CAMERA.vl_format', 'jpeg'),
+            quality=self.config.get_config('CAMERA.vl_quality', 80),
+        )
+        self.scene_cache = SceneCache(
+            max_distance=self.config.get_config('CAMERA.vl_cache_distance', 6),
+            ttl=self.config.get_config('CAMERA.vl_cache_ttl', 300),
+        )
         # 摄像头控制器
         VL.ImageAnalyzer.get_instance().init(self.config.get_config('CAMERA.VLapi_key'), self.config.get_config('CAMERA.Loacl_VL_url'),self.config.get_config('CAMERA.models'))
         self.VL= VL.ImageAnalyzer.get_instance()
@@ -37,7 +56,7 @@ class Camera(Thing):
 
     def add_property_and_method(self):
         # 定义属性
-        self.add_property("power", "摄像头是否打开", lambda: self.is_running )
+        self.add_property("power", "摄像头是否打开", lambda: self.capture.is_running )
         self.add_property("result", "识别画面的内容", lambda: self.result )
         # 定义方法
         self.add_method("start_camera", "打开摄像头", [],
@@ -50,67 +69,43 @@ class Camera(Thing):
                         lambda params: self.capture_frame_to_base64())
 
 
-    def _camera_loop(self):
-        """摄像头线程的主循环"""
-        camera_index = self.config.get_config('CAMERA.camera_index')
-        self.cap = cv2.VideoCapture(camera_index)
-
-        if not self.cap.isOpened():
-            logger.error("无法打开摄像头")
-            return
-
-        # 设置摄像头参数
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.config.get_config('CAMERA.frame_width'))
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config.get_config('CAMERA.frame_height'))
-        self.cap.set(cv2.CAP_PROP_FPS, self.config.get_config('CAMERA.fps'))
-
-        self.is_running = True
-        while self.is_running:
-            ret, frame = self.cap.read()
-            if not ret:
-                logger.error("无法读取画面")
-                break
-
-            # 显示画面
-            cv2.imshow('Camera', frame)
-
-            # 按下 'q' 键退出
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                self.is_running = False
-
-        # 释放摄像头并关闭窗口
-        self.cap.release()
-        cv2.destroyAllWindows()
-
     def start_camera(self):
-        """启动摄像头线程"""
-        if self.camera_thread is not None and self.camera_thread.is_alive():
-            logger.warning("摄像头线程已在运行")
-            return
-
-        self.camera_thread = threading.Thread(target=self._camera_loop, daemon=True)
-        self.camera_thread.start()
-        logger.info("摄像头线程已启动")
+        """启动摄像头采集"""
+        if self.capture.is_running:
+            logger.warning("摄像头已在运行")
+            return {"status": "success", "message": "摄像头已打开"}
+
+        if not self.capture.start():
+            return {"status": "error", "message": "无法打开摄像头"}
+        logger.info("摄像头采集已启动")
         print(f"[虚拟设备] 摄像头线程已启动")
         return {"status": "success", "message": "摄像头线程已打开"}
 
     def capture_frame_to_base64(self):
         """截取当前画面并转换为 Base64 编码"""
-        if not self.cap or not self.cap.isOpened():
+        if not self.capture.is_running:
             logger.error("摄像头未打开")
             return None
 
-        ret, frame = self.cap.read()
-        if not ret:
+        # 直接取采集线程的最新一帧，不在当前线程读取摄像头
+        frame = self.capture.snapshot()
+        if frame is None:
             logger.error("无法读取画面")
             return None
 
-        # 将帧转换为 JPEG 格式
-        _, buffer = cv2.imencode('.jpg', frame)
-
-        # 将 JPEG 图像转换为 Base64 编码
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-        self.result=str(self.VL.analyze_image(frame_base64))
+        frame_hash = dhash(frame)
+        cached = self.scene_cache.get(frame_hash, VL.DEFAULT_PROMPT)
+        if cached is not None:
+            logger.info("画面与之前识别过的场景相近，复用识别结果")
+            self.result = cached
+        else:
+            # 缩放到模型够用的分辨率并压缩后再上传
+            start = time.monotonic()
+            image = self.encoder.encode(frame)
+            self.result = str(self.VL.analyze_image(image.to_base64(), VL.DEFAULT_PROMPT, image.mime))
+            logger.info(f"画面识别完成: {image.width}x{image.height} {image.mime}, "
+                        f"{len(image.data)} 字节, 耗时 {time.monotonic() - start:.2f}s")
+            self.scene_cache.put(frame_hash, VL.DEFAULT_PROMPT, self.result)
         print(self.result)
         # 获取应用程序实例
         self.app = Application.get_instance()
@@ -120,13 +115,10 @@ class Camera(Thing):
         asyncio.create_task(self.app.protocol.send_wake_word_detected("播报识别结果"))
         return {"status": 'success', "message": "识别成功","result":self.result}
     def stop_camera(self):
-        """停止摄像头线程"""
-        self.is_running = False
-        if self.camera_thread is not None:
-            self.camera_thread.join()  # 等待线程结束
-            self.camera_thread = None
-            logger.info("摄像头线程已停止")
-            print(f"[虚拟设备] 摄像头线程已停止")
-            return {"status": "success", "message": "摄像头线程已停止"}
+        """停止摄像头采集"""
+        self.capture.stop()
+        logger.info("摄像头线程已停止")
+        print(f"[虚拟设备] 摄像头线程已停止")
+        return {"status": "success", "message": "摄像头线程已停止"}
 
 
@@ -2,6 +2,10 @@ import os
 import base64
 from openai import OpenAI
 import threading
+
+DEFAULT_PROMPT = "图中描绘的是什么景象,请详细描述，因为用户可能是盲人"
+
+
 class ImageAnalyzer:
     _instance = None
     _lock = threading.Lock()
@@ -29,8 +33,8 @@ class ImageAnalyzer:
             if cls._instance is None:
                 cls._instance = cls()
         return cls._instance
-    def analyze_image(self, base64_image, prompt="图中描绘的是什么景象,请详细描述，因为用户可能是盲人")->str:
-        """分析图片并返回结果"""
+    def analyze_image(self, base64_image, prompt=DEFAULT_PROMPT, mime="image/jpeg")->str:
+        """分析图片并返回结果（mime 需与图片实际编码一致）"""
         completion = self.client.chat.completions.create(
             model=self.models,
             messages=[
@@ -43,7 +47,7 @@ class ImageAnalyzer:
                     "content": [
                         {
                             "type": "image_url",
-                            "image_url": {"url": f"data:image/png;base64,{base64_image}"},
+                            "image_url": {"url": f"data:{mime};base64,{base64_image}"},
                         },
                         {"type": "text", "text": prompt},
                     ],
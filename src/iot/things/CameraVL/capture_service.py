@@ -0,0 +1,171 @@
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 连续读取失败多少次后放弃
+MAX_READ_FAILURES = 30
+PREVIEW_WINDOW = "Camera"
+
+
+class CaptureService:
+    """摄像头采集服务
+
+    只有采集线程访问 VideoCapture，最新一帧放在加锁的槽位里，快照直接取这一帧，
+    不会在其他线程再次 read()。预览窗口可选，关闭时采集循环中没有任何 GUI 调用。
+    超过 idle_after 秒没有人取帧时切换到空闲档位（降低帧率，可选降低分辨率），
+    取帧时恢复正常档位。
+    """
+
+    def __init__(self, camera_index: int = 0, width: int = 640, height: int = 480, fps: int = 30,
+                 idle_fps: float = 2, idle_width: int = 0, idle_height: int = 0,
+                 idle_after: float = 10.0, preview: bool = False):
+        """
+        参数:
+            camera_index: 摄像头索引
+            width, height, fps: 正常档位的分辨率和帧率
+            idle_fps: 空闲档位的帧率
+            idle_width, idle_height: 空闲档位的分辨率，0 表示不改变分辨率
+            idle_after: 多少秒没有取帧后进入空闲档位
+            preview: 是否显示预览窗口
+        """
+        self.camera_index = camera_index
+        self.active_profile = (width, height, fps)
+        self.idle_profile = (idle_width or width, idle_height or height, idle_fps)
+        self.idle_after = idle_after
+        self.preview = preview
+
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_time = 0.0
+        self._frame_profile = None
+        self._last_request = time.monotonic()
+        self._stop = threading.Event()
+        self._opened = threading.Event()
+        self._thread = None
+        self.is_running = False
+
+    def start(self, timeout: float = 5.0) -> bool:
+        """启动采集线程，等待摄像头打开，返回是否成功"""
+        if self._thread and self._thread.is_alive():
+            return self.is_running
+        self._stop.clear()
+        self._opened.clear()
+        self._last_request = time.monotonic()
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True, name="camera-capture")
+        self._thread.start()
+        self._opened.wait(timeout)
+        return self.is_running
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def latest(self) -> Tuple[Optional[np.ndarray], float]:
+        """返回最新一帧及其采集时间（time.monotonic），调用方不要原地修改帧"""
+        with self._cond:
+            self._last_request = time.monotonic()
+            return self._frame, self._frame_time
+
+    def snapshot(self, timeout: float = 1.0) -> Optional[np.ndarray]:
+        """
+        获取快照：正常档位下立即返回最新一帧；空闲档位降低了分辨率时，
+        先切回正常档位并最多等待 timeout 秒取得一帧全分辨率画面
+        """
+        with self._cond:
+            self._last_request = time.monotonic()
+            if self._frame_profile != self.active_profile and self.idle_profile[:2] != self.active_profile[:2]:
+                self._cond.notify_all()
+                self._cond.wait_for(
+                    lambda: self._frame_profile == self.active_profile or not self.is_running, timeout)
+            return self._frame
+
+    def _is_idle(self) -> bool:
+        with self._cond:
+            return time.monotonic() - self._last_request > self.idle_after
+
+    @staticmethod
+    def _apply_profile(cap, profile, previous):
+        width, height, fps = profile
+        # 改分辨率会让驱动重新协商视频流，只在确实变化时设置
+        if previous is None or previous[:2] != (width, height):
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        logger.info(f"摄像头切换到 {width}x{height}@{fps}fps")
+
+    def _capture_loop(self):
+        cap = cv2.VideoCapture(self.camera_index)
+        if not cap.isOpened():
+            logger.error("无法打开摄像头")
+            self._opened.set()
+            return
+
+        # 只保留一帧驱动缓冲，空闲降帧时取到的也是当前画面
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.is_running = True
+        self._opened.set()
+
+        profile = None
+        failures = 0
+        try:
+            while not self._stop.is_set():
+                idle = self._is_idle()
+                wanted = self.idle_profile if idle else self.active_profile
+                if wanted != profile:
+                    self._apply_profile(cap, wanted, profile)
+                    profile = wanted
+
+                started = time.monotonic()
+                ret, frame = cap.read()
+                if not ret:
+                    failures += 1
+                    if failures >= MAX_READ_FAILURES:
+                        logger.error("无法读取画面")
+                        break
+                    self._stop.wait(0.05)
+                    continue
+                failures = 0
+
+                with self._cond:
+                    self._frame = frame
+                    self._frame_time = time.monotonic()
+                    self._frame_profile = profile
+                    self._cond.notify_all()
+
+                if self.preview:
+                    cv2.imshow(PREVIEW_WINDOW, frame)
+                    # 按下 'q' 键关闭摄像头
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+
+                # 驱动不支持设置帧率时，空闲档位靠等待限速
+                if idle:
+                    self._wait_idle(1.0 / max(profile[2], 0.1) - (time.monotonic() - started))
+        finally:
+            self.is_running = False
+            with self._cond:
+                self._cond.notify_all()
+            cap.release()
+            if self.preview:
+                cv2.destroyWindow(PREVIEW_WINDOW)
+            logger.info("摄像头采集已停止")
+
+    def _wait_idle(self, delay: float):
+        """空闲档位的帧间等待，有人取帧或停止时提前结束"""
+        if delay <= 0:
+            return
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._stop.is_set()
+                or time.monotonic() - self._last_request <= self.idle_after, delay)
@@ -0,0 +1,124 @@
+import base64
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# 编码格式 -> (扩展名, MIME 类型, 质量参数)
+FORMATS = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+
+class EncodedImage:
+    """编码后的图片"""
+
+    def __init__(self, data: bytes, mime: str, width: int, height: int):
+        self.data = data
+        self.mime = mime
+        self.width = width
+        self.height = height
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self.data).decode("ascii")
+
+    def to_data_url(self) -> str:
+        return f"data:{self.mime};base64,{self.to_base64()}"
+
+
+class FrameEncoder:
+    """把摄像头画面缩放到模型够用的分辨率再压缩编码
+
+    视觉模型内部会把图片缩到固定尺寸，上传全分辨率只增加流量和延迟。
+    缩放结果写入复用的缓冲区，分辨率不变时不重新分配内存。
+    """
+
+    def __init__(self, max_side: int = 1024, fmt: str = "jpeg", quality: int = 80):
+        if fmt not in FORMATS:
+            raise ValueError(f"不支持的图片格式: {fmt}")
+        self.max_side = max_side
+        self.ext, self.mime, quality_flag = FORMATS[fmt]
+        self.params = [quality_flag, int(quality)]
+        if fmt == "jpeg":
+            self.params += [cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+        self._resized: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def encode(self, frame: np.ndarray) -> EncodedImage:
+        with self._lock:
+            image = self._resize(frame)
+            ok, buffer = cv2.imencode(self.ext, image, self.params)
+            if not ok:
+                raise ValueError("图片编码失败")
+            height, width = image.shape[:2]
+            return EncodedImage(buffer.tobytes(), self.mime, width, height)
+
+    def _resize(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        scale = self.max_side / max(height, width)
+        if scale >= 1:
+            return frame
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        shape = (size[1], size[0]) + frame.shape[2:]
+        if self._resized is None or self._resized.shape != shape or self._resized.dtype != frame.dtype:
+            self._resized = np.empty(shape, dtype=frame.dtype)
+        # INTER_AREA 缩小时不产生摩尔纹，细节保留最好
+        cv2.resize(frame, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        return self._resized
+
+
+def dhash(frame: np.ndarray, hash_size: int = 8) -> int:
+    """差值感知哈希：缩到 (hash_size+1) x hash_size 的灰度图，比较相邻像素的明暗"""
+    small = cv2.resize(frame, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SceneCache:
+    """按感知哈希缓存画面描述
+
+    新画面与缓存中某个画面的 dHash 汉明距离不超过 max_distance，且提示词相同、
+    未超过 ttl 秒时，视为同一场景，直接复用之前的描述。
+    """
+
+    def __init__(self, max_distance: int = 6, ttl: float = 300, max_entries: int = 32):
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # (hash, prompt) -> (time, text)
+        self._lock = threading.Lock()
+
+    def get(self, frame_hash: int, prompt: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            best_key, best_distance = None, self.max_distance + 1
+            for key, (stored_at, _) in list(self._entries.items()):
+                if now - stored_at > self.ttl:
+                    del self._entries[key]
+                    continue
+                if key[1] != prompt:
+                    continue
+                distance = hamming(key[0], frame_hash)
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][1]
+
+    def put(self, frame_hash: int, prompt: str, text: str):
+        with self._lock:
+            self._entries[(frame_hash, prompt)] = (time.monotonic(), text)
+            self._entries.move_to_end((frame_hash, prompt))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
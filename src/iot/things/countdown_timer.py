@@ -1,28 +1,35 @@
-import threading
-import time
 import logging
 import json
-from src.iot.thing import Thing, Parameter
-from src.iot.thing_manager import ThingManager
+from datetime import datetime
+from src.iot.cron import CronSchedule
+from src.iot.thing import Thing, Parameter, ValueType
+from src.iot.timer_scheduler import TimerScheduler
 
 logger = logging.getLogger(__name__)
 
 class CountdownTimer(Thing):
     """
-    一个用于延迟执行命令的倒计时器设备。
+    一个用于延迟执行命令的倒计时器设备，也支持按 cron 表达式周期执行命令。
+
+    计时由进程内共享的 TimerScheduler 完成（单线程 + 最小堆 + SQLite 存储），
+    未到期的倒计时和周期任务会持久化，重启后继续生效。
+    未执行任务数在任务增删和到期时由调度器回调推送。
     """
     DEFAULT_DELAY = 5 # seconds
+    push_states = True
 
     def __init__(self):
         super().__init__("CountdownTimer", "一个用于延迟执行命令的倒计时器")
-        # 使用字典存储活动的计时器，键是 timer_id，值是 threading.Timer 对象
-        self._timers = {}
-        self._next_timer_id = 0
-        # 使用锁来保护对 _timers 和 _next_timer_id 的访问，确保线程安全
-        self._lock = threading.Lock()
+        # 共享调度器，启动时恢复上次未执行的倒计时
+        self._scheduler = TimerScheduler.get_instance()
+        self._scheduler.on_jobs_changed = self._on_jobs_changed
 
         print(f"[虚拟设备] 倒计时器设备初始化完成")
 
+        # 定义属性
+        self.add_property("active_timers", "未执行的倒计时和周期任务数",
+                          lambda: self._scheduler.count(), ValueType.NUMBER)
+
         # 定义方法 - 使用 Parameter 对象
         self.add_method(
             "StartCountdown",
@@ -33,38 +40,25 @@ class CountdownTimer(Thing):
             ],
             lambda params: self._start_countdown(params)
         )
+        self.add_method(
+            "StartSchedule",
+            "创建周期任务，按 cron 表达式（分 时 日 月 周）重复执行指定命令，如每个工作日7点为 \"0 7 * * 1-5\"",
+            [
+                Parameter("command", "要执行的IoT命令 (JSON格式字符串)", "string", required=True),
+                Parameter("cron", "5段 cron 表达式：分 时 日 月 周（0或7为星期日）", "string", required=True)
+            ],
+            lambda params: self._start_schedule(params)
+        )
         self.add_method(
             "CancelCountdown",
-            "取消指定的倒计时",
+            "取消指定的倒计时或周期任务",
             [Parameter("timer_id", "要取消的计时器ID", "integer", required=True)],
             lambda params: self._cancel_countdown(params)
         )
 
-    def _execute_command(self, timer_id, command_str):
-        """计时器到期时执行的回调函数。"""
-        # 首先从活动计时器列表中移除自己
-        with self._lock:
-            if timer_id not in self._timers:
-                # 可能已经被取消
-                logger.info(f"倒计时 {timer_id} 在执行前已被取消或不存在。")
-                return
-            del self._timers[timer_id]
-
-        logger.info(f"倒计时 {timer_id} 结束，准备执行命令: {command_str}")
-
-        try:
-            # 命令应该是 JSON 格式的字符串，代表一个命令字典
-            command_dict = json.loads(command_str)
-            # 获取 ThingManager 单例并执行命令
-            thing_manager = ThingManager.get_instance()
-            result = thing_manager.invoke(command_dict)
-            logger.info(f"倒计时 {timer_id} 执行命令 '{command_str}' 结果: {result}")
-        except json.JSONDecodeError:
-            logger.error(f"倒计时 {timer_id}: 命令 '{command_str}' 格式错误，无法解析JSON。")
-            # 可以选择返回错误状态给调用者，但这在后台线程中较难实现
-        except Exception as e:
-            logger.error(f"倒计时 {timer_id} 执行命令 '{command_str}' 时出错: {e}", exc_info=True)
-            # 同上
+    def _on_jobs_changed(self):
+        """调度器中的任务增删或到期"""
+        self.update_property("active_timers", self._scheduler.count())
 
     def _start_countdown(self, params_dict):
         """处理 StartCountdown 方法调用。注意: params 现在是 Parameter 对象的字典"""
@@ -100,16 +94,42 @@ class CountdownTimer(Thing):
              logger.error(f"启动倒计时失败：命令格式错误，无法解析JSON: {command_str}")
              return {"status": "error", "message": f"命令格式错误，无法解析JSON: {command_str}"}
 
-        with self._lock:
-            timer_id = self._next_timer_id
-            self._next_timer_id += 1
-            timer = threading.Timer(delay, self._execute_command, args=[timer_id, command_str])
-            self._timers[timer_id] = timer
-            timer.start()
+        timer_id = self._scheduler.schedule(delay, command_str)
 
         logger.info(f"启动倒计时 {timer_id}，将在 {delay} 秒后执行命令: {command_str}")
         return {"status": "success", "message": f"倒计时 {timer_id} 已启动，将在 {delay} 秒后执行。", "timer_id": timer_id}
 
+    def _start_schedule(self, params_dict):
+        """处理 StartSchedule 方法调用"""
+        command_param = params_dict.get("command")
+        cron_param = params_dict.get("cron")
+        command_str = command_param.get_value() if command_param else None
+        expression = cron_param.get_value() if cron_param else None
+
+        if not command_str or not expression:
+            logger.error("创建周期任务失败：缺少 'command' 或 'cron' 参数值。")
+            return {"status": "error", "message": "缺少 'command' 或 'cron' 参数值"}
+
+        try:
+            json.loads(command_str)
+        except json.JSONDecodeError:
+            logger.error(f"创建周期任务失败：命令格式错误，无法解析JSON: {command_str}")
+            return {"status": "error", "message": f"命令格式错误，无法解析JSON: {command_str}"}
+
+        try:
+            next_fire = CronSchedule(expression).next_after(datetime.now())
+            timer_id = self._scheduler.schedule_cron(expression, command_str)
+        except ValueError as e:
+            logger.error(f"创建周期任务失败：无效的 cron 表达式 '{expression}': {e}")
+            return {"status": "error", "message": f"无效的 cron 表达式: {e}"}
+
+        next_text = next_fire.strftime("%Y-%m-%d %H:%M")
+        logger.info(f"创建周期任务 {timer_id}，cron '{expression}'，下次执行 {next_text}，命令: {command_str}")
+        return {"status": "success",
+                "message": f"周期任务 {timer_id} 已创建，下次执行时间 {next_text}。",
+                "timer_id": timer_id,
+                "next_run": next_text}
+
     def _cancel_countdown(self, params_dict):
         """处理 CancelCountdown 方法调用。注意: params 现在是 Parameter 对象的字典"""
         timer_id_param = params_dict.get("timer_id")
@@ -127,27 +147,18 @@ class CountdownTimer(Thing):
             logger.error(f"取消倒计时失败：无效的 'timer_id' {timer_id}。")
             return {"status": "error", "message": f"无效的 'timer_id': {timer_id}"}
 
-        with self._lock:
-            if timer_id in self._timers:
-                timer = self._timers.pop(timer_id)
-                timer.cancel()
-                logger.info(f"倒计时 {timer_id} 已成功取消。")
-                return {"status": "success", "message": f"倒计时 {timer_id} 已取消"}
-            else:
-                logger.warning(f"尝试取消不存在或已完成的倒计时 {timer_id}。")
-                return {"status": "error", "message": f"找不到ID为 {timer_id} 的活动倒计时"}
+        if self._scheduler.cancel(timer_id):
+            logger.info(f"定时任务 {timer_id} 已成功取消。")
+            return {"status": "success", "message": f"定时任务 {timer_id} 已取消"}
+        else:
+            logger.warning(f"尝试取消不存在或已完成的定时任务 {timer_id}。")
+            return {"status": "error", "message": f"找不到ID为 {timer_id} 的活动定时任务"}
 
     def cleanup(self):
-        """在应用程序关闭时清理所有活动的计时器。"""
-        logger.info("正在清理倒计时器...")
-        with self._lock:
-            active_timer_ids = list(self._timers.keys()) # 创建键的副本以安全迭代
-            for timer_id in active_timer_ids:
-                if timer_id in self._timers:
-                    timer = self._timers.pop(timer_id)
-                    timer.cancel()
-                    logger.info(f"已取消后台计时器 {timer_id}")
+        """在应用程序关闭时停止调度线程，未到期的倒计时和周期任务保留到下次启动。"""
+        logger.info("正在停止倒计时调度器...")
+        self._scheduler.stop()
         logger.info("倒计时器清理完成。")
 
 # 注意：这个 cleanup 方法需要在应用程序关闭时被显式调用。
-# ThingManager 或 Application 类可以负责在 shutdown 过程中调用其管理的 Things 的 cleanup 方法。 
\ No newline at end of file
+# ThingManager 或 Application 类可以负责在 shutdown 过程中调用其管理的 Things 的 cleanup 方法。
@@ -1,9 +1,7 @@
-import json
 import time
-import requests
 from src.iot.thing import Thing, Parameter, ValueType
+from src.network.ha_client import HomeAssistantClient
 from src.utils.logging_config import get_logger
-from src.utils.config_manager import ConfigManager
 
 logger = get_logger(__name__)
 
@@ -11,8 +9,14 @@ class HomeAssistantDevice(Thing):
     """
     Home Assistant设备基类
     
-    提供所有Home Assistant设备的通用功能
+    提供所有Home Assistant设备的通用功能。属性名与实例属性同名，
+    本地状态每次变化后通过 _publish_states 推送给 ThingManager。
+
+    构造完成后需调用 finish_init()：此时属性和方法都已注册，
+    才开始接收状态推送并读取初始状态。
     """
+
+    push_states = True
     
     def __init__(self, entity_id, friendly_name=None, device_type="设备"):
         """
@@ -31,22 +35,13 @@ class HomeAssistantDevice(Thing):
         self.state = "off"  # 默认关闭状态
         self.last_update = int(time.time())  # 当前时间戳
         
-        # HA API配置
-        config = ConfigManager.get_instance()
-        self.ha_config = {
-            "url": config.get_config("HOME_ASSISTANT.URL", "http://123.60.32.150:8123"),
-            "token": config.get_config("HOME_ASSISTANT.TOKEN", ""),
-        }
-        
-        # HA API请求头
-        self.headers = {
-            "Authorization": f"Bearer {self.ha_config['token']}",
-            "Content-Type": "application/json",
-        }
+        # 共享的HA客户端（连接池 + 批量状态缓存 + WebSocket 推送）
+        self.client = HomeAssistantClient.get_instance()
         
         # 注册基本属性
-        self.add_property("state", "设备状态 (on/off)", lambda: self.state)
-        self.add_property("last_update", "最后更新时间戳", lambda: self.last_update)
+        self.add_property("state", "设备状态 (on/off)", lambda: self.state, ValueType.STRING)
+        self.add_property("last_update", "最后更新时间戳", lambda: self.last_update,
+                          ValueType.NUMBER)
         
         # 注册基本方法
         self.add_method(
@@ -63,28 +58,52 @@ class HomeAssistantDevice(Thing):
             lambda params: self._turn_off()
         )
     
-    def _update_state(self):
-        """获取设备当前状态"""
+    def finish_init(self):
+        """注册状态推送回调并读取初始状态（子类构造完成后调用）"""
+        self.client.add_listener(self.entity_id, self._on_state_changed)
         try:
-            url = f"{self.ha_config['url']}/api/states/{self.entity_id}"
-            response = requests.get(url, headers=self.headers, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.state = data.get("state", "off")
-                self.last_update = int(time.time())
-                
-                # 子类可以覆盖此方法以处理额外的属性
-                self._process_attributes(data.get("attributes", {}))
-                
-                logger.info(f"设备 {self.entity_id} 状态已更新: state={self.state}")
-                return True
-            else:
-                logger.error(f"获取设备状态失败, 状态码: {response.status_code}, 响应: {response.text}")
+            self._update_state()
+        except Exception as e:
+            logger.error(f"初始化时更新设备状态失败: {e}")
+        return self
+
+    def _update_state(self, max_age=None):
+        """获取设备当前状态（来自共享客户端的批量状态缓存）"""
+        try:
+            data = self.client.get_state(self.entity_id, max_age)
+            if data is None:
+                logger.error(f"获取设备状态失败: HA中没有实体 {self.entity_id}")
                 return False
+            self._apply_state(data)
+            logger.info(f"设备 {self.entity_id} 状态已更新: state={self.state}")
+            return True
         except Exception as e:
             logger.error(f"获取设备状态出错: {e}")
             return False
+
+    def _on_state_changed(self, data):
+        """HA推送或批量刷新发现状态变化"""
+        if data is None:
+            self.state = "unavailable"
+            self.last_update = int(time.time())
+            self._publish_states()
+            return
+        self._apply_state(data)
+
+    def _publish_states(self):
+        """把本地状态推送给 ThingManager（只读实例属性，不访问网络）"""
+        for name in list(self.properties):
+            if hasattr(self, name):
+                self.update_property(name, getattr(self, name))
+
+    def _apply_state(self, data):
+        """应用HA返回的状态对象"""
+        self.state = data.get("state", "off")
+        self.last_update = int(time.time())
+
+        # 子类可以覆盖此方法以处理额外的属性
+        self._process_attributes(data.get("attributes", {}))
+        self._publish_states()
     
     def _process_attributes(self, attributes):
         """处理设备属性，由子类覆盖以处理特定属性"""
@@ -100,27 +119,24 @@ class HomeAssistantDevice(Thing):
             payload: 请求参数
         """
         try:
-            url = f"{self.ha_config['url']}/api/services/{service_domain}/{service_action}"
-            response = requests.post(url, headers=self.headers, json=payload, timeout=5)
-            
-            if response.status_code in [200, 201]:
-                # 更新本地状态
-                if service_action == "turn_on":
-                    self.state = "on"
-                elif service_action == "turn_off":
-                    self.state = "off"
-                    
-                self.last_update = int(time.time())
+            success, error, changed = self.client.call_service(
+                service_domain, service_action, payload)
+            if success:
+                # 服务接口返回的变化状态已通过 _on_state_changed 应用，
+                # 没有返回本实体时先乐观更新，之后的变化由推送同步
+                if self.entity_id not in changed:
+                    if service_action == "turn_on":
+                        self.state = "on"
+                    elif service_action == "turn_off":
+                        self.state = "off"
+                    self.last_update = int(time.time())
+                    self._publish_states()
+
                 logger.info(f"发送命令: {service_action} 到 {self.entity_id}")
-                
-                # 延迟更新状态以获取设备最新状态
-                time.sleep(1)
-                self._update_state()
-                
                 return {"status": "success", "message": f"已发送{service_action}命令到 {self.entity_id}"}
             else:
-                logger.error(f"发送{service_action}命令失败, 状态码: {response.status_code}, 响应: {response.text}")
-                return {"status": "error", "message": f"发送命令失败, HTTP状态码: {response.status_code}"}
+                logger.error(f"发送{service_action}命令失败: {error}")
+                return {"status": "error", "message": f"发送命令失败, {error}"}
         except Exception as e:
             logger.error(f"发送{service_action}命令出错: {e}")
             return {"status": "error", "message": f"发送命令失败: {e}"}
@@ -155,7 +171,8 @@ class HomeAssistantLight(HomeAssistantDevice):
         self.brightness = 0  # 默认亮度值为0
         
         # 注册灯特有属性
-        self.add_property("brightness", "灯的亮度 (0-100)", lambda: self.brightness)
+        self.add_property("brightness", "灯的亮度 (0-100)", lambda: self.brightness,
+                          ValueType.NUMBER)
         
         # 注册灯特有方法
         self.add_method(
@@ -165,12 +182,6 @@ class HomeAssistantLight(HomeAssistantDevice):
             lambda params: self._set_brightness(params["brightness"].get_value())
         )
         
-        # 初始化时更新状态
-        try:
-            self._update_state()
-        except Exception as e:
-            logger.error(f"初始化时更新设备状态失败: {e}")
-        
         logger.info(f"Home Assistant灯设备初始化完成: {self.entity_id}")
     
     def _process_attributes(self, attributes):
@@ -214,6 +225,7 @@ class HomeAssistantLight(HomeAssistantDevice):
             
             if result["status"] == "success":
                 self.brightness = brightness_percent
+                self._publish_states()
                 return {
                     "status": "success", 
                     "message": f"已将 {self.entity_id} 亮度设置为 {brightness_percent}%"
@@ -243,12 +255,6 @@ class HomeAssistantSwitch(HomeAssistantDevice):
         """
         super().__init__(entity_id, friendly_name, device_type="开关设备")
         
-        # 初始化时更新状态
-        try:
-            self._update_state()
-        except Exception as e:
-            logger.error(f"初始化时更新设备状态失败: {e}")
-        
         logger.info(f"Home Assistant开关设备初始化完成: {self.entity_id}")
     
     def _turn_on(self):
@@ -273,7 +279,7 @@ class HomeAssistantNumber(HomeAssistantDevice):
         self.step = 1
         
         # 注册特有属性
-        self.add_property("value", "当前值", lambda: self.value)
+        self.add_property("value", "当前值", lambda: self.value, ValueType.NUMBER)
         
         # 注册特有方法
         self.add_method(
@@ -283,11 +289,6 @@ class HomeAssistantNumber(HomeAssistantDevice):
             lambda params: self._set_value(params["value"].get_value())
         )
         
-        try:
-            self._update_state()
-        except Exception as e:
-            logger.error(f"初始化时更新设备状态失败: {e}")
-        
         logger.info(f"Home Assistant数值设备初始化完成: {self.entity_id}")
     
     def _process_attributes(self, attributes):
@@ -325,6 +326,7 @@ class HomeAssistantNumber(HomeAssistantDevice):
             
             if result["status"] == "success":
                 self.value = value
+                self._publish_states()
                 return {
                     "status": "success", 
                     "message": f"已将 {self.entity_id} 的值设置为 {value}"
@@ -347,7 +349,8 @@ class HomeAssistantButton(HomeAssistantDevice):
         self.last_pressed = 0  # 上次按下的时间戳
         
         # 注册按钮特有属性
-        self.add_property("last_pressed", "上次按下时间", lambda: self.last_pressed)
+        self.add_property("last_pressed", "上次按下时间", lambda: self.last_pressed,
+                          ValueType.NUMBER)
         
         # 注册按钮特有方法
         self.add_method(
@@ -357,11 +360,6 @@ class HomeAssistantButton(HomeAssistantDevice):
             lambda params: self._press()
         )
         
-        try:
-            self._update_state()
-        except Exception as e:
-            logger.error(f"初始化时更新设备状态失败: {e}")
-        
         logger.info(f"Home Assistant按钮设备初始化完成: {self.entity_id}")
     
     def _turn_on(self):
@@ -385,6 +383,7 @@ class HomeAssistantButton(HomeAssistantDevice):
             
             if result["status"] == "success":
                 self.last_pressed = int(time.time())
+                self._publish_states()
                 return {
                     "status": "success", 
                     "message": f"已按下 {self.entity_id} 按钮"
@@ -1,7 +1,9 @@
-from src.iot.thing import Thing
+from src.iot.thing import Thing, ValueType
 
 
 class Lamp(Thing):
+    push_states = True
+
     def __init__(self):
         super().__init__("Lamp", "一个测试用的灯")
         self.power = False
@@ -9,7 +11,7 @@ class Lamp(Thing):
         print(f"[虚拟设备] 灯设备初始化完成")
 
         # 定义属性
-        self.add_property("power", "灯是否打开", lambda: self.power)
+        self.add_property("power", "灯是否打开", lambda: self.power, ValueType.BOOLEAN)
 
         # 定义方法
         self.add_method("TurnOn", "打开灯", [],
@@ -20,10 +22,12 @@ class Lamp(Thing):
 
     def _turn_on(self):
         self.power = True
+        self.update_property("power", True)
         print(f"[虚拟设备] 灯已打开")
         return {"status": "success", "message": "灯已打开"}
 
     def _turn_off(self):
         self.power = False
+        self.update_property("power", False)
         print(f"[虚拟设备] 灯已关闭")
         return {"status": "success", "message": "灯已关闭"}
\ No newline at end of file
@@ -1,25 +1,50 @@
 from src.application import Application
-from src.constants.constants import DeviceState, AudioConfig
+from src.constants.constants import DeviceState
 from src.iot.thing import Thing, Parameter, ValueType
+from src.music.lyrics import Lyrics
+from src.music.music_cache import MusicCache
+from src.music.pcm_decoder import PcmDecoder
+from src.music.play_queue import PlayQueue
+from src.music.playback_clock import PlaybackClock
+from src.music.search_parser import normalize, rank_candidates, split_artists
+from src.music.stream_download import StreamingDownload
+from src.music.ttl_cache import TtlCache
+from src.utils.config_manager import ConfigManager
 import os
+import queue
+import re
 import requests
-import pygame
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Tuple, List, Optional
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# 播放器事件
+EVENT_STATE = "state"  # 开始播放、继续、跳转：重新安排歌词定时
+EVENT_LYRIC = "lyric"  # 到达下一行歌词的时间
+EVENT_TTS = "tts"      # TTS 播放状态变化
+EVENT_END = "end"      # 解码器已解码到末尾且混音器已播完
+
 
 class MusicPlayer(Thing):
     """
     音乐播放器组件
 
     提供在线音乐搜索、播放、暂停等功能，支持歌词显示和播放进度跟踪。
-    使用pygame播放引擎实现音频播放功能。
+    音乐由 ffmpeg 解码为 PCM 后送入 AudioCodec 的统一输出混音器，与 TTS 共用
+    一个输出设备；TTS 播放时混音器平滑压低音乐音量，不再暂停音乐。
+    播放进度由事件驱动：歌词按下一行的时间点定时刷新，TTS 状态和播放结束
+    以回调通知，空闲和暂停时不占用 CPU。
+    切歌、跳转、暂停等改变播放状态的操作和事件处理持有同一把锁，依次执行。
+    状态变化都会投递事件，由事件线程通过 update_property 推送属性；
+    播放位置随歌词刷新和状态事件更新。
     """
 
+    push_states = True
+
     def __init__(self):
         """初始化音乐播放器组件"""
         super().__init__(
@@ -27,57 +52,82 @@ class MusicPlayer(Thing):
             "在线音乐播放器,播放音乐时优先使用iot的音乐播放器，支持本地缓存、暂停、进度跳转"
         )
 
-        # 初始化pygame mixer
-        pygame.mixer.init(frequency=AudioConfig.OUTPUT_SAMPLE_RATE,
-                          channels=AudioConfig.CHANNELS)
-
         # 搜索结果相关属性
         self.current_song = ""  # 当前歌曲名称
         self.current_url = ""   # 当前歌曲播放链接
         self.song_id = ""       # 当前歌曲ID
+        self.current_artist = ""  # 当前歌曲的歌手
         self.total_duration = 0  # 歌曲总时长（秒）
 
         # 播放控制相关属性
         self.is_playing = False      # 是否正在播放
         self.paused = False          # 是否暂停
         self.current_position = 0    # 当前播放位置（秒）
-        self.start_play_time = 0     # 开始播放的时间点
-        
-        # TTS相关属性
-        self.paused_for_tts = False  # 是否因为TTS而暂停
-        self.pause_start_time = 0    # 暂停开始时间
-        self.total_pause_time = 0    # 总暂停时间
-        self._last_tts_playing = None
+        # 播放位置取自混音器已输出的采样数，暂停期间自然停止
+        self.clock = PlaybackClock(self._output_position_ms)
+        # 混音器中的音乐音源，首次播放时获取
+        self.output = None
+        self.decoder = None
 
         # 歌词相关
-        self.lyrics = []  # 歌词列表，格式为 [(时间, 文本), ...]
+        self.lyrics = Lyrics()  # 按时间排序的歌词
         self.current_lyric_index = -1  # 当前歌词索引
 
-        # 线程控制
-        self.progress_thread = None   # 进度更新线程
-        self.stop_progress = threading.Event()  # 用于停止进度更新线程
+        # 改变播放状态的操作（IoT 命令线程）与事件线程的处理互斥，
+        # 避免自动切歌与“下一首”等命令交错导致重复切歌或两个解码器同时写入
+        self._player_lock = threading.RLock()
+
+        # 事件线程：处理播放器事件，播放中只在歌词换行时定时唤醒
+        self._events = queue.Queue()
+        self.event_thread = threading.Thread(
+            target=self._event_loop, daemon=True, name="music-player-events")
+        self.event_thread.start()
 
         # 缓存相关
         cache_root = os.path.dirname(os.path.dirname(os.path.dirname(
                      os.path.dirname(__file__))))
         self.cache_dir = os.path.join(cache_root, "cache", "music")
-        self._ensure_cache_dir()
-
-        # 当前正在使用的临时文件
-        self.current_temp_file = None
+        config = ConfigManager.get_instance()
+        # 启动时与磁盘对账并清理临时文件，超出容量按 LRU 淘汰
+        self.music_cache = MusicCache(
+            self.cache_dir, config.get_config("MUSIC_PLAYER.CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+        # 搜索结果、播放链接、歌词缓存（内存 + cache/music/meta 下的文件）
+        meta_dir = os.path.join(self.cache_dir, "meta")
+        self.search_cache = TtlCache(os.path.join(meta_dir, "search.json"))
+        self.play_url_cache = TtlCache(os.path.join(meta_dir, "play_urls.json"))
+        self.lyrics_cache = TtlCache(os.path.join(meta_dir, "lyrics.json"), max_entries=200)
+        self.search_ttl = config.get_config("MUSIC_PLAYER.SEARCH_TTL", 86400)
+        self.play_url_ttl = config.get_config("MUSIC_PLAYER.PLAY_URL_TTL", 1200)
+        self.lyrics_ttl = config.get_config("MUSIC_PLAYER.LYRICS_TTL", 604800)
+        self.search_candidates = config.get_config("MUSIC_PLAYER.SEARCH_CANDIDATES", 10)
+        # 复用连接的 HTTP 会话和并发查询线程池
+        self.http = requests.Session()
+        self.lookup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="music-lookup")
+
+        # 播放队列，播放当前歌曲时在后台预取接下来的几首
+        self.queue = PlayQueue()
+        self.prefetch_count = config.get_config("MUSIC_PLAYER.PREFETCH_COUNT", 2)
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="music-prefetch")
+        self._prefetching = set()
+        self._prefetch_lock = threading.Lock()
+        # 正在进行的预取下载（song_id -> StreamingDownload），开始播放该歌曲时直接接管
+        self._prefetch_downloads = {}
+
+        # 边下边播：当前的后台下载和交给解码器的读端
+        self.stream = None
+        self.stream_reader = None
+        self.stream_prebuffer = config.get_config("MUSIC_PLAYER.STREAM_PREBUFFER", 262144)
+        self.stream_start_timeout = config.get_config("MUSIC_PLAYER.STREAM_START_TIMEOUT", 10)
 
         # 获取应用程序实例
         self.app = Application.get_instance()
+        if self.app:
+            self.app.on_tts_playing_changed(lambda playing: self._post(EVENT_TTS, playing))
 
         # 加载配置文件
         self.config = self._load_config()
 
-        # 清空临时缓存
-        self._clear_temp_cache()
-
-        # 清理遗留的临时文件
-        self._cleanup_temp_files()
-
         logger.info("音乐播放器初始化完成")
 
         # 注册属性和方法
@@ -86,15 +136,19 @@ class MusicPlayer(Thing):
 
     def _register_properties(self):
         """注册播放器属性"""
-        self.add_property("current_song", "当前歌曲", lambda: self.current_song)
-        self.add_property("is_playing", "是否正在播放", lambda: self.is_playing)
-        self.add_property("paused", "是否暂停", lambda: self.paused)
+        self.add_property("current_song", "当前歌曲", lambda: self.current_song,
+                          ValueType.STRING)
+        self.add_property("is_playing", "是否正在播放", lambda: self.is_playing,
+                          ValueType.BOOLEAN)
+        self.add_property("paused", "是否暂停", lambda: self.paused, ValueType.BOOLEAN)
         self.add_property("total_duration", "歌曲总时长（秒）",
-                          lambda: self.total_duration)
+                          lambda: self.total_duration, ValueType.NUMBER)
         self.add_property("current_position", "当前播放位置（秒）",
-                          lambda: self._get_current_position())
+                          lambda: self._get_current_position(), ValueType.NUMBER)
         self.add_property("progress", "播放进度（百分比）",
-                          lambda: self._get_progress())
+                          lambda: self._get_progress(), ValueType.NUMBER)
+        self.add_property("queue_length", "播放队列中的歌曲数",
+                          lambda: len(self.queue), ValueType.NUMBER)
 
     def _register_methods(self):
         """注册播放器方法"""
@@ -154,6 +208,48 @@ class MusicPlayer(Thing):
             lambda params: self._get_lyrics_text()
         )
 
+        self.add_method(
+            "PlayList",
+            "依次播放多首歌曲（替换播放队列）",
+            [Parameter("song_names", "歌曲名称列表，用逗号分隔", ValueType.STRING, True)],
+            lambda params: self.play_list(params["song_names"].get_value())
+        )
+
+        self.add_method(
+            "AddToQueue",
+            "把歌曲加入播放队列",
+            [Parameter("song_name", "输入歌曲名称", ValueType.STRING, True)],
+            lambda params: self.add_to_queue(params["song_name"].get_value())
+        )
+
+        self.add_method(
+            "Next",
+            "播放下一首",
+            [],
+            lambda params: self.next_track()
+        )
+
+        self.add_method(
+            "Previous",
+            "播放上一首",
+            [],
+            lambda params: self.previous_track()
+        )
+
+        self.add_method(
+            "MoreLikeThis",
+            "把当前歌手的其他热门歌曲加入播放队列",
+            [],
+            lambda params: self.more_like_this()
+        )
+
+        self.add_method(
+            "GetQueue",
+            "获取播放队列",
+            [],
+            lambda params: self._get_queue()
+        )
+
     def _load_config(self) -> Dict[str, Any]:
         """
         加载配置文件
@@ -181,7 +277,7 @@ class MusicPlayer(Thing):
 
     def _search_song(self, song_name: str) -> Dict[str, Any]:
         """
-        搜索指定歌曲
+        搜索指定歌曲，找到后设为当前歌曲（不播放）
 
         参数:
             song_name: 歌曲名称
@@ -189,61 +285,108 @@ class MusicPlayer(Thing):
         返回:
             Dict[str, Any]: 搜索结果
         """
-        # 重置搜索状态
-        self.current_song = song_name
-        self.current_url = ""
-        self.song_id = ""
-        self.total_duration = 0
-        self.lyrics = []
+        song = self._lookup_song(song_name)
+        if not song:
+            return {
+                "status": "error",
+                "message": f"未找到歌曲 '{song_name}' 或无法获取播放链接"
+            }
 
-        # 通过API搜索获取歌曲信息
-        try:
-            # 获取歌曲ID和播放URL
-            song_id, url = self._get_song_info(song_name)
-            if not song_id or not url:
-                return {
-                    "status": "error",
-                    "message": f"未找到歌曲 '{song_name}' 或无法获取播放链接"
-                }
+        with self._player_lock:
+            self._set_current_song(song)
+            self._post(EVENT_STATE)
+
+        # 返回搜索结果
+        return {
+            "status": "success",
+            "message": f"已找到歌曲: {song['display_name']}",
+            "song_id": song["song_id"],
+            "url": song["url"],
+            "duration": song["duration"],
+            "lyrics_count": len(song["lyrics"])
+        }
 
-            # 保存歌曲信息
-            self.current_url = url
-            self.song_id = song_id
+    def _lookup_song(self, song_name: str) -> Optional[Dict[str, Any]]:
+        """
+        搜索歌曲并获取播放链接和歌词，不修改播放器状态，调用时无需持有播放器锁
 
-            logger.info(f"搜索成功: {song_name}, URL: {url}")
+        搜索结果、播放链接和歌词分别缓存，命中时不发请求；
+        搜索得到歌曲ID后，播放链接和歌词并发获取。
 
-            # 返回搜索结果
-            return {
-                "status": "success",
-                "message": f"已找到歌曲: {self.current_song}",
-                "song_id": song_id,
-                "url": url,
-                "duration": self.total_duration,
-                "lyrics_count": len(self.lyrics)
-            }
+        参数:
+            song_name: 歌曲名称
 
+        返回:
+            Optional[Dict[str, Any]]: 歌曲元数据加 url 和 lyrics，未找到或没有播放链接时返回 None
+        """
+        try:
+            # 1. 搜索歌曲获取ID
+            meta = self._search_song_meta(song_name)
+            if not meta:
+                return None
+            song_id = meta["song_id"]
+            logger.info(
+                f"获取到歌曲: {meta['display_name']}, ID: {song_id}, 时长: {meta['duration']}秒")
+
+            # 2. 并发获取播放链接和歌词
+            url_future = self.lookup_executor.submit(self._fetch_play_url, song_id)
+            lyrics_future = self.lookup_executor.submit(self._fetch_lyrics, song_id)
+            url = url_future.result()
+            if not url:
+                return None
+            logger.info(f"搜索成功: {song_name}, URL: {url}")
+            return dict(meta, url=url, lyrics=Lyrics(lyrics_future.result()))
         except Exception as e:
             logger.error(f"搜索歌曲失败: {str(e)}")
-            return {"status": "error", "message": f"搜索歌曲失败: {str(e)}"}
+            return None
+
+    def _set_current_song(self, song: Dict[str, Any]):
+        """把 _lookup_song 的结果设为当前歌曲（调用方需持有播放器锁）"""
+        self.song_id = song["song_id"]
+        self.current_url = song["url"]
+        self.current_song = song["display_name"]
+        self.current_artist = song["artist"]
+        self.total_duration = song["duration"]
+        self.lyrics = song["lyrics"]
+
+    def _search_song_meta(self, song_name: str) -> Optional[Dict[str, Any]]:
+        """
+        搜索歌曲元数据，返回匹配得分最高的一首
+
+        参数:
+            song_name: 歌曲名称
 
-    def _get_song_info(self, song_name: str) -> Tuple[str, str]:
+        返回:
+            Optional[Dict[str, Any]]: 歌曲ID、名称、时长等，未找到返回 None
         """
-        获取歌曲信息（ID和播放URL）
+        candidates = self._search_candidates(song_name)
+        if not candidates:
+            logger.warning(f"未找到歌曲 '{song_name}' 的ID")
+            return None
+        return candidates[0]
+
+    def _search_candidates(self, song_name: str) -> List[Dict[str, Any]]:
+        """
+        搜索歌曲，返回按歌名、歌手、时长匹配度排序的候选列表，按查询词缓存 SEARCH_TTL 秒
 
         参数:
             song_name: 歌曲名称
 
         返回:
-            Tuple[str, str]: (歌曲ID, 播放URL)
+            List[Dict[str, Any]]: 候选歌曲元数据（带 score 字段），失败返回空列表
         """
+        cache_key = " ".join(song_name.lower().split())
+        candidates = self.search_cache.get(cache_key)
+        # 旧版本缓存的是单个结果，视为未命中
+        if isinstance(candidates, list) and candidates:
+            logger.info(f"搜索命中缓存: {song_name} -> {candidates[0]['song_id']}")
+            return candidates
+
         # 从配置中获取请求头和API URL
         headers = self.config.get("HEADERS", {})
         search_url = self.config.get("API", {}).get(
             "SEARCH_URL", "http://search.kuwo.cn/r.s")
-        play_url = self.config.get("API", {}).get(
-            "PLAY_URL", "http://api.xiaodaokg.com/kuwo.php")
 
-        # 1. 搜索歌曲获取ID
         search_params = {
             "all": song_name,
             "ft": "music",
@@ -253,7 +396,7 @@ class MusicPlayer(Thing):
             "client": "kt",
             "cluster": "0",
             "pn": "0",
-            "rn": "1",
+            "rn": str(self.search_candidates),
             "vermerge": "1",
             "rformat": "json",
             "encoding": "utf8",
@@ -268,133 +411,90 @@ class MusicPlayer(Thing):
         logger.info(f"搜索歌曲: {song_name}")
 
         try:
-            response = requests.get(
+            response = self.http.get(
                 search_url, params=search_params, headers=headers, timeout=10)
             response.raise_for_status()
 
             # 记录响应内容到日志（调试用）
             logger.debug(f"搜索API响应内容: {response.text[:200]}...")
 
-            # 处理响应文本
-            response_text = response.text.replace("'", '"')  # 替换单引号为双引号
-
-            # 提取歌曲ID
-            song_id = ""
-            dc_targetid_pos = response_text.find('"DC_TARGETID":"')
-            if dc_targetid_pos != -1:
-                start_pos = dc_targetid_pos + len('"DC_TARGETID":"')
-                end_pos = response_text.find('"', start_pos)
-                if end_pos != -1:
-                    song_id = response_text[start_pos:end_pos]
-                    logger.info(f"提取到歌曲ID: {song_id}")
-
-            # 如果没有找到歌曲ID，返回失败
-            if not song_id:
-                logger.warning(f"未找到歌曲 '{song_name}' 的ID")
-                return "", ""
-
-            # 提取歌曲时长
-            duration = 0
-            duration_pos = response_text.find('"DURATION":"')
-            if duration_pos != -1:
-                start_pos = duration_pos + len('"DURATION":"')
-                end_pos = response_text.find('"', start_pos)
-                if end_pos != -1:
-                    try:
-                        duration = int(response_text[start_pos:end_pos])
-                        self.total_duration = duration
-                        logger.info(f"提取到歌曲时长: {duration}秒")
-                    except ValueError:
-                        logger.warning(
-                            f"歌曲时长解析失败: {response_text[start_pos:end_pos]}")
-
-            # 提取艺术家
-            artist = ""
-            artist_pos = response_text.find('"ARTIST":"')
-            if artist_pos != -1:
-                start_pos = artist_pos + len('"ARTIST":"')
-                end_pos = response_text.find('"', start_pos)
-                if end_pos != -1:
-                    artist = response_text[start_pos:end_pos]
-
-            # 提取歌曲名
-            title = song_name
-            name_pos = response_text.find('"NAME":"')
-            if name_pos != -1:
-                start_pos = name_pos + len('"NAME":"')
-                end_pos = response_text.find('"', start_pos)
-                if end_pos != -1:
-                    title = response_text[start_pos:end_pos]
-
-            # 提取专辑名
-            album = ""
-            album_pos = response_text.find('"ALBUM":"')
-            if album_pos != -1:
-                start_pos = album_pos + len('"ALBUM":"')
-                end_pos = response_text.find('"', start_pos)
-                if end_pos != -1:
-                    album = response_text[start_pos:end_pos]
-
-            # 更新当前歌曲信息
-            display_name = title
-            if artist:
-                display_name = f"{title} - {artist}"
-                if album:
-                    display_name += f" ({album})"
-            self.current_song = display_name
-
-            logger.info(
-                f"获取到歌曲: {self.current_song}, ID: {song_id}, 时长: {duration}秒")
+            # 一次解析出全部候选并按匹配度排序
+            candidates = rank_candidates(response.text, song_name, self.search_candidates)
+            if not candidates:
+                return []
+
+            for candidate in candidates[:3]:
+                logger.info(f"候选: {candidate['display_name']} "
+                            f"(ID: {candidate['song_id']}, 时长: {candidate['duration']}秒, "
+                            f"得分: {candidate['score']})")
+            self.search_cache.set(cache_key, candidates, self.search_ttl)
+            return candidates
+        except Exception as e:
+            logger.error(f"获取歌曲信息失败: {str(e)}")
+            return []
 
-            # 2. 获取歌曲播放链接
-            play_api_url = f"{play_url}?ID={song_id}"
-            logger.info(f"获取歌曲播放链接: {play_api_url}")
+    def _fetch_play_url(self, song_id: str) -> str:
+        """
+        获取歌曲播放链接，有效链接缓存 PLAY_URL_TTL 秒
 
-            for attempt in range(3):
-                try:
-                    url_response = requests.get(
-                        play_api_url, headers=headers, timeout=10)
-                    url_response.raise_for_status()
+        参数:
+            song_id: 歌曲ID
 
-                    # 获取播放链接（直接返回的文本）
-                    play_url_text = url_response.text.strip()
+        返回:
+            str: 播放链接，失败返回空字符串
+        """
+        cached_url = self.play_url_cache.get(song_id)
+        if cached_url:
+            logger.info(f"播放链接命中缓存: {song_id}")
+            return cached_url
 
-                    # 检查URL是否有效
-                    if play_url_text and play_url_text.startswith("http"):
-                        logger.info(f"获取到有效的歌曲URL: {play_url_text[:60]}...")
+        headers = self.config.get("HEADERS", {})
+        play_url = self.config.get("API", {}).get(
+            "PLAY_URL", "http://api.xiaodaokg.com/kuwo.php")
+        play_api_url = f"{play_url}?ID={song_id}"
+        logger.info(f"获取歌曲播放链接: {play_api_url}")
 
-                        # 3. 获取歌词
-                        self._fetch_lyrics(song_id)
+        for attempt in range(3):
+            try:
+                url_response = self.http.get(
+                    play_api_url, headers=headers, timeout=10)
+                url_response.raise_for_status()
+
+                # 获取播放链接（直接返回的文本）
+                play_url_text = url_response.text.strip()
+
+                # 检查URL是否有效
+                if play_url_text and play_url_text.startswith("http"):
+                    logger.info(f"获取到有效的歌曲URL: {play_url_text[:60]}...")
+                    self.play_url_cache.set(song_id, play_url_text, self.play_url_ttl)
+                    return play_url_text
+                logger.warning(
+                    f"返回的播放链接格式不正确: {play_url_text[:100]}")
+            except Exception as e:
+                logger.error(f"获取播放链接时出错: {str(e)}")
 
-                        return song_id, play_url_text
-                    else:
-                        logger.warning(
-                            f"返回的播放链接格式不正确: {play_url_text[:100]}")
-                        if attempt < 2:
-                            logger.info(f"尝试重新获取播放链接 ({attempt+1}/3)")
-                            time.sleep(1)
-                        else:
-                            return song_id, ""
-                except Exception as e:
-                    logger.error(f"获取播放链接时出错: {str(e)}")
-                    if attempt < 2:
-                        logger.info(f"尝试重新获取播放链接 ({attempt+1}/3)")
-                        time.sleep(1)
-                    else:
-                        return song_id, ""
+            if attempt < 2:
+                logger.info(f"尝试重新获取播放链接 ({attempt+1}/3)")
+                time.sleep(1)
 
-            return song_id, ""
-        except Exception as e:
-            logger.error(f"获取歌曲信息失败: {str(e)}")
-            return "", ""
+        return ""
 
-    def _fetch_lyrics(self, song_id: str):
+    def _fetch_lyrics(self, song_id: str) -> List[Tuple[float, str]]:
         """
-        获取歌词
+        获取歌词，解析结果缓存 LYRICS_TTL 秒
 
         参数:
             song_id: 歌曲ID
+
+        返回:
+            List[Tuple[float, str]]: [(时间, 文本), ...]
         """
+        cached_lyrics = self.lyrics_cache.get(song_id)
+        if cached_lyrics is not None:
+            logger.info(f"歌词命中缓存: {song_id}，共 {len(cached_lyrics)} 行")
+            return [tuple(line) for line in cached_lyrics]
+
+        lyrics = []
         try:
             # 从配置中获取请求头和API URL
             headers = self.config.get("HEADERS", {})
@@ -405,7 +505,7 @@ class MusicPlayer(Thing):
             lyric_api_url = f"{lyric_url}?musicId={song_id}"
             logger.info(f"获取歌词URL: {lyric_api_url}")
 
-            response = requests.get(lyric_api_url, headers=headers, timeout=10)
+            response = self.http.get(lyric_api_url, headers=headers, timeout=10)
             response.raise_for_status()
 
             # 添加错误处理
@@ -417,7 +517,6 @@ class MusicPlayer(Thing):
                 if (data.get("status") == 200 and data.get("data") and
                         data["data"].get("lrclist")):
                     lrc_list = data["data"]["lrclist"]
-                    self.lyrics = []
 
                     for lrc in lrc_list:
                         time_sec = float(lrc.get("time", "0"))
@@ -427,9 +526,10 @@ class MusicPlayer(Thing):
                         if (text and not text.startswith("作词") and
                                 not text.startswith("作曲") and
                                 not text.startswith("编曲")):
-                            self.lyrics.append((time_sec, text))
+                            lyrics.append((time_sec, text))
 
-                    logger.info(f"成功获取歌词，共 {len(self.lyrics)} 行")
+                    logger.info(f"成功获取歌词，共 {len(lyrics)} 行")
+                    self.lyrics_cache.set(song_id, lyrics, self.lyrics_ttl)
                 else:
                     logger.warning(
                         f"未获取到歌词或歌词格式错误: {data.get('msg', '')}")
@@ -442,6 +542,7 @@ class MusicPlayer(Thing):
                     logger.warning(f"歌词API响应内容: {sample}")
         except Exception as e:
             logger.error(f"获取歌词失败: {str(e)}")
+        return lyrics
 
     def _update_lyrics(self):
         """
@@ -451,44 +552,13 @@ class MusicPlayer(Thing):
         if not self.lyrics or self.app.get_is_tts_playing():
             return
 
-        current_time = self.current_position
-
-        # 查找当前时间对应的歌词
-        current_index = self._find_current_lyric_index(current_time)
+        # 二分查找当前时间对应的歌词
+        current_index = self.lyrics.index_at(self.current_position)
 
         # 如果歌词索引变化了，更新显示
         if current_index != self.current_lyric_index:
             self._display_current_lyric(current_index)
 
-    def _find_current_lyric_index(self, current_time: float) -> int:
-        """
-        查找当前时间对应的歌词索引
-
-        参数:
-            current_time: 当前播放时间（秒）
-
-        返回:
-            int: 当前歌词索引
-        """
-        # 查找下一句歌词
-        next_lyric_index = None
-        for i, (time_sec, _) in enumerate(self.lyrics):
-            # 添加一个小的偏移量(0.5秒)，使歌词显示更准确
-            if time_sec > current_time - 0.5:
-                next_lyric_index = i
-                break
-
-        # 确定当前歌词索引
-        if next_lyric_index is not None and next_lyric_index > 0:
-            # 如果找到下一句歌词，当前歌词就是它的前一句
-            return next_lyric_index - 1
-        elif next_lyric_index is None and self.lyrics:
-            # 如果没找到下一句，说明已经到最后一句
-            return len(self.lyrics) - 1
-        else:
-            # 其他情况（如播放刚开始）
-            return 0
-
     def _display_current_lyric(self, current_index: int):
         """
         显示当前歌词
@@ -538,181 +608,102 @@ class MusicPlayer(Thing):
             "lyrics": lyrics_text
         }
 
-    def _download_file(self, url: str, file_path: str) -> bool:
+    def _download_headers(self) -> Dict[str, str]:
+        """下载音乐文件使用的请求头"""
+        headers = self.config.get("HEADERS", {}).copy()
+        headers.update({
+            'Accept-Encoding': 'identity',
+            'Referer': 'https://music.163.com/'
+        })
+        return headers
+
+    def _start_stream(self, url: str) -> bool:
         """
-        下载音乐文件到指定路径（同步方法）
+        开始边下边播：后台下载到 part 文件，缓冲到 STREAM_PREBUFFER 字节后交给解码器
 
         参数:
             url: 音乐URL
-            file_path: 保存路径
 
         返回:
-            bool: 是否下载成功
+            bool: 是否已可以开始播放
         """
-        try:
-            # 使用配置中的请求头
-            headers = self.config.get("HEADERS", {}).copy()
-            headers.update({
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Referer': 'https://music.163.com/'
-            })
-
-            # 创建唯一的临时文件路径，避免冲突
-            temp_path = f"{file_path}.{int(time.time())}.tmp"
-
-            # 下载文件
-            with requests.get(url, stream=True, headers=headers,
-                              timeout=30) as response:
-                response.raise_for_status()
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
-
-                with open(temp_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=32768):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            # 每下载25%更新一次日志
-                            if (total_size > 0 and
-                                    downloaded % (total_size // 4) < 32768):
-                                progress = downloaded * 100 // total_size
-                                logger.info(f"下载进度: {progress}%")
-
-                # 下载完成后，将临时文件重命名为正式文件
-                if downloaded == total_size:
-                    # 如果目标文件已存在，先尝试删除
-                    if os.path.exists(file_path):
-                        try:
-                            os.remove(file_path)
-                        except Exception as e:
-                            logger.warning(f"删除已存在的文件失败: {str(e)}")
-                            # 如果无法删除，使用新名称
-                            file_path = f"{file_path}.new"
-
-                    try:
-                        os.replace(temp_path, file_path)
-                        logger.info(f"音乐文件下载完成: {file_path}")
-                        return True
-                    except Exception as e:
-                        logger.error(f"重命名临时文件失败: {str(e)}")
-                        return False
-                else:
-                    # 如果下载不完整，删除临时文件
-                    if os.path.exists(temp_path):
-                        try:
-                            os.remove(temp_path)
-                        except Exception:
-                            pass
-                    logger.warning("音乐文件下载不完整")
-                    return False
-
-        except Exception as e:
-            logger.error(f"下载音乐文件失败: {str(e)}")
-            # 清理临时文件
-            try:
-                if 'temp_path' in locals() and os.path.exists(temp_path):
-                    os.remove(temp_path)
-            except Exception:
-                pass
+        song_id, duration = self.song_id, self.total_duration
+        stream = StreamingDownload(
+            url, self.music_cache.part_path(song_id), headers=self._download_headers(),
+            on_complete=lambda path, ok: self._commit_download(path, song_id, duration, ok)
+        ).start()
+        # 先打开读端：下载很快完成时 part 文件会被提交到缓存而改名
+        reader = stream.open_reader()
+
+        start_time = time.time()
+        if not stream.wait_ready(self.stream_prebuffer, self.stream_start_timeout):
+            logger.error("音乐缓冲失败，无法开始播放")
+            reader.close()
+            stream.cancel()
+            # 缓存的播放链接可能已经失效
+            self.play_url_cache.delete(song_id)
             return False
 
-    def _download_mp3(self, url: str, cache_path: str):
-        """
-        下载完整的MP3文件到缓存目录
-
-        参数:
-            url: 音频URL
-            cache_path: 缓存文件路径
-        """
-        try:
-            # 使用配置中的请求头
-            headers = self.config.get("HEADERS", {}).copy()
-            headers.update({
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Referer': 'https://music.163.com/'
-            })
-
-            # 创建唯一的临时文件路径，避免冲突
-            temp_path = f"{cache_path}.{int(time.time())}.temp"
-
-            with requests.get(url, stream=True, headers=headers, timeout=30) as response:
-                response.raise_for_status()
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
-
-                with open(temp_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=32768):
-                        if not self.is_playing:
-                            logger.info("缓存下载被中止")
-                            break
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            # 每下载10%更新一次日志
-                            if total_size > 0 and downloaded % (total_size // 10) < 32768:
-                                progress = downloaded * 100 // total_size
-                                logger.info(f"缓存下载进度: {progress}%")
-
-                # 下载完成后，将临时文件重命名为正式文件
-                if downloaded == total_size and self.is_playing:
-                    # 如果目标文件已存在且正在使用，不覆盖
-                    if os.path.exists(cache_path):
-                        try:
-                            # 尝试删除已存在的文件
-                            os.remove(cache_path)
-                            os.replace(temp_path, cache_path)
-                            logger.info("MP3文件已缓存到本地")
-                        except Exception as e:
-                            logger.warning(f"替换缓存文件失败，可能正在使用中: {str(e)}")
-                            # 保留临时文件，不删除
-                            logger.info(f"保留临时缓存文件: {temp_path}")
-                    else:
-                        try:
-                            os.replace(temp_path, cache_path)
-                            logger.info("MP3文件已缓存到本地")
-                        except Exception as e:
-                            logger.error(f"缓存MP3文件失败: {str(e)}")
-                            if os.path.exists(temp_path):
-                                try:
-                                    os.remove(temp_path)
-                                except Exception:
-                                    pass
-                else:
-                    # 如果下载不完整或播放已停止，删除临时文件
-                    if os.path.exists(temp_path):
-                        try:
-                            os.remove(temp_path)
-                            logger.info("已清理临时文件")
-                        except Exception as e:
-                            logger.error(f"清理临时文件失败: {str(e)}")
-
-        except Exception as e:
-            logger.error(f"下载MP3文件失败: {str(e)}")
-            # 清理临时文件
-            try:
-                if 'temp_path' in locals() and os.path.exists(temp_path):
-                    os.remove(temp_path)
-                    logger.info("已清理临时文件")
-            except Exception as e:
-                logger.error(f"清理临时文件失败: {str(e)}")
+        self.stream = stream
+        self.stream_reader = reader
+        logger.info(f"已缓冲 {stream.downloaded} 字节，"
+                    f"{(time.time() - start_time) * 1000:.0f}ms 后开始播放")
+        return True
 
-    def _ensure_cache_dir(self):
-        """确保缓存目录存在"""
-        try:
-            if not os.path.exists(self.cache_dir):
-                os.makedirs(self.cache_dir)
-                logger.info(f"创建音乐缓存目录: {self.cache_dir}")
-        except Exception as e:
-            logger.error(f"创建缓存目录失败: {str(e)}")
-
-    def _get_cache_path(self, song_id: str) -> str:
-        """获取歌曲缓存文件路径"""
-        return os.path.join(self.cache_dir, f"{song_id}.mp3")
-
-    def _is_song_cached(self, song_id: str) -> bool:
-        """检查歌曲是否已缓存"""
-        cache_path = self._get_cache_path(song_id)
-        return os.path.exists(cache_path)
+    def _commit_download(self, part_path: str, song_id: str, duration: float, ok: bool):
+        """下载结束后把完整文件原子地提交到缓存，不完整的文件直接删除"""
+        if ok and song_id:
+            self.music_cache.commit(song_id, part_path, duration)
+        else:
+            self.music_cache.discard(part_path)
+
+    def _close_stream(self):
+        """停止解码，中止后台下载并关闭读端"""
+        self._stop_decoder()
+        if self.stream:
+            self.stream.cancel()
+            self.stream = None
+        if self.stream_reader:
+            self.stream_reader.close()
+            self.stream_reader = None
+
+    def _flush_caches(self):
+        """把音乐缓存索引和搜索/链接/歌词缓存的变更写入磁盘"""
+        self.music_cache.flush()
+        for cache in (self.search_cache, self.play_url_cache, self.lyrics_cache):
+            cache.flush()
+
+    def _music_output(self):
+        """混音器中的音乐音源"""
+        if self.output is None:
+            codec = self.app.audio_codec if self.app else None
+            if not codec or not codec.mixer:
+                raise RuntimeError("音频输出尚未初始化")
+            self.output = codec.mixer.source("music")
+            self.output.on_drained = lambda: self._post(EVENT_END)
+        return self.output
+
+    def _output_position_ms(self) -> int:
+        return self.output.position_ms() if self.output else -1
+
+    def _start_decoder(self, source, position: float = 0.0):
+        """从 position 秒开始解码 source（缓存文件路径或下载读端）"""
+        self._stop_decoder()
+        on_error = None
+        if isinstance(source, str):
+            # 缓存文件无法打开或解码时淘汰，下次播放重新下载
+            song_id = self.song_id
+            on_error = lambda: self.music_cache.remove(song_id)
+        self.decoder = PcmDecoder(source, self._music_output(), start=position,
+                                  on_error=on_error).start()
+
+    def _stop_decoder(self):
+        """停止解码并丢弃混音器中尚未播放的音乐"""
+        if self.decoder:
+            self.decoder.cancel()
+            self.decoder = None
+        if self.output:
+            self.output.clear()
 
     def _get_current_position(self) -> float:
         """
@@ -727,9 +718,9 @@ class MusicPlayer(Thing):
         if self.paused:
             return self.current_position
 
-        # 如果正在播放，计算当前位置
-        current_pos = time.time() - self.start_play_time
-        return min(self.total_duration, current_pos)
+        # 如果正在播放，读取混音器时钟
+        current_pos = self.clock.position()
+        return min(self.total_duration, current_pos) if self.total_duration else current_pos
 
     def _get_progress(self) -> float:
         """
@@ -752,11 +743,19 @@ class MusicPlayer(Thing):
         返回:
             Dict[str, Any]: 播放结果
         """
-        # 先搜索歌曲
-        result = self._search_song(song_name)
+        # 搜索和获取播放链接期间不持有播放器锁，暂停、切歌等操作不会被阻塞
+        song = self._lookup_song(song_name)
+        if not song:
+            return {
+                "status": "error",
+                "message": f"未找到歌曲 '{song_name}' 或无法获取播放链接"
+            }
 
-        # 如果搜索成功且有URL，则播放
-        if result.get("status") == "success" and self.current_url:
+        with self._player_lock:
+            # 单曲播放替换播放队列
+            self._cancel_prefetch()
+            self._set_current_song(song)
+            self.queue.replace([self._current_track(song_name)])
             self._play_url(self.current_url)
             return {
                 "status": "success",
@@ -764,116 +763,250 @@ class MusicPlayer(Thing):
                 "duration": self.total_duration
             }
 
-        # 搜索失败直接返回搜索结果
-        return result
-
-    def _cleanup_temp_files(self, max_keep=1):
+    def play_list(self, song_names: str) -> Dict[str, Any]:
         """
-        清理临时文件夹中的旧文件，只保留最新的几个
+        用多首歌曲替换播放队列并从第一首开始播放
 
         参数:
-            max_keep: 保留的最新文件数量
+            song_names: 歌曲名称，用逗号、顿号或分号分隔
+
+        返回:
+            Dict[str, Any]: 播放结果
         """
-        try:
-            temp_dir = os.path.join(self.cache_dir, "temp")
-            if not os.path.exists(temp_dir):
-                return
+        names = [name.strip() for name in re.split(r"[,，、;；\n]", song_names) if name.strip()]
+        if not names:
+            return {"status": "error", "message": "歌曲列表为空"}
+
+        # 新条目尚未加入队列，先在锁外搜索第一首
+        tracks = [{"query": name} for name in names]
+        self._resolve_track(tracks[0])
+
+        with self._player_lock:
+            self._cancel_prefetch()
+            self.queue.replace(tracks)
+            result = self._play_from(self.queue.current())
+            result["queue_length"] = len(self.queue)
+            return result
+
+    def add_to_queue(self, song_name: str) -> Dict[str, Any]:
+        """把歌曲加入播放队列末尾，空闲时直接开始播放"""
+        with self._player_lock:
+            self.queue.extend([{"query": song_name}])
+            # 空闲且游标处有未播放的条目（新队列或已播完的队列）时直接开始
+            if not self.is_playing and self.queue.current() is not None:
+                return self._play_from(self.queue.current())
+            self._schedule_prefetch()
+            self._post(EVENT_STATE)
+            return {
+                "status": "success",
+                "message": f"已加入播放队列: {song_name}",
+                "queue_length": len(self.queue)
+            }
 
-            # 获取所有临时文件
-            files = []
-            for f in os.listdir(temp_dir):
-                if f.startswith("playing_") and f.endswith(".mp3"):
-                    file_path = os.path.join(temp_dir, f)
-                    files.append((file_path, os.path.getmtime(file_path)))
-
-            # 按修改时间排序
-            files.sort(key=lambda x: x[1], reverse=True)
-
-            # 保留最新的几个，删除其余的
-            for file_path, _ in files[max_keep:]:
-                try:
-                    if file_path != self.current_temp_file:
-                        os.remove(file_path)
-                        logger.info(f"已清理旧的临时文件: {file_path}")
-                except Exception as e:
-                    logger.warning(f"清理临时文件失败: {str(e)}")
+    def next_track(self) -> Dict[str, Any]:
+        """播放队列中的下一首"""
+        with self._player_lock:
+            track = self.queue.advance()
+            if track is None:
+                return {"status": "info", "message": "播放队列中没有下一首"}
+            return self._play_from(track)
+
+    def previous_track(self) -> Dict[str, Any]:
+        """播放队列中的上一首"""
+        with self._player_lock:
+            track = self.queue.back()
+            if track is None:
+                return {"status": "info", "message": "已经是播放队列中的第一首"}
+            return self._play_track(track)
+
+    def more_like_this(self, count: int = 5) -> Dict[str, Any]:
+        """
+        按当前歌曲的歌手搜索，把其他歌曲加入播放队列末尾
 
-        except Exception as e:
-            logger.warning(f"清理临时文件操作失败: {str(e)}")
+        参数:
+            count: 最多加入的歌曲数
 
-    def _clear_temp_cache(self):
-        """
-        清空临时缓存目录
+        返回:
+            Dict[str, Any]: 操作结果
         """
-        try:
-            temp_dir = os.path.join(self.cache_dir, "temp")
-            if not os.path.exists(temp_dir):
-                return
+        artists = split_artists(self.current_artist)
+        if not self.song_id or not artists:
+            return {"status": "info", "message": "当前没有可参考的歌曲"}
+
+        # 已在队列中的歌曲（按歌名去重，同一首歌的不同版本只保留一个）
+        seen = {normalize(item.get("title") or item.get("display_name") or item["query"],
+                          strip_brackets=True) for item in self.queue.snapshot()}
+        seen.add(normalize(self.current_song.split(" - ")[0], strip_brackets=True))
+
+        tracks = []
+        for candidate in self._search_candidates(self.current_artist):
+            title = normalize(candidate["title"], strip_brackets=True)
+            if (candidate["song_id"] == self.song_id or title in seen
+                    or artists[0] not in split_artists(candidate["artist"])):
+                continue
+            seen.add(title)
+            tracks.append(dict(candidate, query=candidate["display_name"]))
+            if len(tracks) >= count:
+                break
 
-            cleared = 0
-            for f in os.listdir(temp_dir):
-                if f.endswith(".mp3") or f.endswith(".tmp") or f.endswith(".temp"):
-                    try:
-                        os.remove(os.path.join(temp_dir, f))
-                        cleared += 1
-                    except Exception as e:
-                        logger.warning(f"删除临时文件失败: {str(e)}")
+        if not tracks:
+            return {"status": "info", "message": f"没有找到 {self.current_artist} 的其他歌曲"}
 
-            if cleared > 0:
-                logger.info(f"启动时清理了 {cleared} 个临时缓存文件")
+        self.queue.extend(tracks)
+        self._schedule_prefetch()
+        self._post(EVENT_STATE)
+        return {
+            "status": "success",
+            "message": f"已加入 {len(tracks)} 首 {self.current_artist} 的歌曲",
+            "songs": [track["display_name"] for track in tracks],
+            "queue_length": len(self.queue)
+        }
 
-        except Exception as e:
-            logger.warning(f"清理临时缓存失败: {str(e)}")
+    def _get_queue(self) -> Dict[str, Any]:
+        """获取播放队列"""
+        items = self.queue.snapshot()
+        lines = []
+        for i, item in enumerate(items, start=1):
+            name = item.get("display_name") or item["query"]
+            lines.append(f"{'▶ ' if item['current'] else ''}{i}. {name}")
+        return {
+            "status": "success",
+            "message": f"播放队列共 {len(items)} 首",
+            "queue": lines
+        }
 
-    def _handle_tts_priority(self):
-        """处理TTS优先级逻辑"""
-        current_time = time.time()
+    def _current_track(self, query: str) -> Dict[str, Any]:
+        """把当前搜索到的歌曲包装成队列条目"""
+        return {
+            "query": query,
+            "song_id": self.song_id,
+            "display_name": self.current_song,
+            "artist": self.current_artist,
+            "duration": self.total_duration,
+        }
 
-        if not self.app:
-            return
+    def _resolve_track(self, track: Dict[str, Any]) -> bool:
+        """为只有搜索词的队列条目补充歌曲元数据"""
+        if track.get("song_id"):
+            return True
+        meta = self._search_song_meta(track["query"])
+        if not meta:
+            return False
+        track.update(meta)
+        return True
+
+    def _play_from(self, track: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """从指定条目开始播放，无法播放的条目自动跳过"""
+        while track is not None:
+            result = self._play_track(track)
+            if result["status"] == "success":
+                return result
+            logger.warning(f"跳过无法播放的歌曲: {track['query']}")
+            track = self.queue.advance()
+        return {"status": "error", "message": "播放队列中没有可播放的歌曲"}
+
+    def _play_track(self, track: Dict[str, Any]) -> Dict[str, Any]:
+        """播放队列条目：已预取的歌曲直接从缓存播放，不再请求播放链接"""
+        if not self._resolve_track(track):
+            return {"status": "error", "message": f"未找到歌曲 '{track['query']}'"}
+
+        self.song_id = track["song_id"]
+        self.current_song = track["display_name"]
+        self.current_artist = track.get("artist", "")
+        self.total_duration = track["duration"]
+        self.current_url = ""
+        self.lyrics = Lyrics(self._fetch_lyrics(self.song_id))
 
-        tts_playing = self.app.get_is_tts_playing()
+        if not self._play_url(""):
+            return {"status": "error", "message": f"播放失败: {self.current_song}"}
 
-        # 检查是否有打断请求
-        if hasattr(self.app, 'aborted') and self.app.aborted:
-            if not self.paused:
-                logger.info("检测到打断请求，暂停音乐播放")
-                pygame.mixer.music.pause()
-                self.paused = True
-                self.current_position = time.time() - self.start_play_time
-            return
+        self._schedule_prefetch()
+        return {
+            "status": "success",
+            "message": f"正在播放: {self.current_song}",
+            "duration": self.total_duration
+        }
 
-        # 捕获 TTS状态变化（从True到False）
-        if self._last_tts_playing is None:
-            # 初始化
-            self._last_tts_playing = tts_playing
-
-        if tts_playing != self._last_tts_playing:
-            # 状态变化了！
-            if self._last_tts_playing and not tts_playing:
-                # 从 正在播放 -> 播放结束
-                if self.paused_for_tts and self.paused:
-                    # 只有在明确因为TTS而暂停时才自动恢复播放
-                    logger.info("TTS播放结束，恢复音乐播放")
-                    pygame.mixer.music.unpause()
-                    self.paused = False
-                    self.paused_for_tts = False
-                    self.total_pause_time += (current_time - self.pause_start_time)
-                    self.start_play_time = time.time() - self.current_position
-
-            elif not self._last_tts_playing and tts_playing:
-                # 从 不播放 -> 开始播放
-                if not self.paused and self.is_playing:
-                    # 只有在音乐正在播放且未暂停时才因TTS而暂停
-                    logger.info("TTS正在播放，暂停音乐播放")
-                    pygame.mixer.music.pause()
-                    self.paused = True
-                    self.paused_for_tts = True
-                    self.pause_start_time = current_time
-                    self.current_position = time.time() - self.start_play_time
-
-        # 更新上一次的状态
-        self._last_tts_playing = tts_playing
+    def _schedule_prefetch(self):
+        """在后台把接下来的 PREFETCH_COUNT 首歌曲下载到缓存"""
+        generation = self.queue.generation
+        for track in self.queue.upcoming(self.prefetch_count):
+            key = id(track)
+            with self._prefetch_lock:
+                if key in self._prefetching:
+                    continue
+                self._prefetching.add(key)
+            self.prefetch_executor.submit(self._prefetch_track, track, generation)
+
+    def _prefetch_track(self, track: Dict[str, Any], generation: int):
+        """解析并完整下载一首歌曲，同时预热歌词和播放链接缓存"""
+        song_id, download = None, None
+        try:
+            if generation != self.queue.generation or not self._resolve_track(track):
+                return
+            song_id = track["song_id"]
+            self._fetch_lyrics(song_id)
+            # 已缓存，或正是当前边下边播的歌曲
+            if self.music_cache.contains(song_id) or (self.stream and song_id == self.song_id):
+                return
+
+            url = self._fetch_play_url(song_id)
+            if not url or generation != self.queue.generation:
+                return
+
+            download = StreamingDownload(
+                url, self.music_cache.part_path(song_id), headers=self._download_headers(),
+                on_complete=lambda path, ok: self._commit_download(
+                    path, song_id, track["duration"], ok)
+            ).start()
+            with self._prefetch_lock:
+                self._prefetch_downloads[song_id] = download
+            download.wait_for(float("inf"))
+            if download.ok:
+                logger.info(f"已预取: {track['display_name']}")
+        except Exception as e:
+            logger.warning(f"预取歌曲失败: {str(e)}")
+        finally:
+            with self._prefetch_lock:
+                # 被播放接管的下载已从表中移除
+                if download and self._prefetch_downloads.get(song_id) is download:
+                    del self._prefetch_downloads[song_id]
+                self._prefetching.discard(id(track))
+
+    def _cancel_prefetch(self):
+        """中止正在进行的预取下载（队列被替换时）"""
+        with self._prefetch_lock:
+            downloads = list(self._prefetch_downloads.values())
+            self._prefetch_downloads.clear()
+        for download in downloads:
+            download.cancel()
+
+    def _attach_prefetch(self, song_id: str) -> bool:
+        """
+        接管该歌曲正在进行的预取下载作为边下边播的数据源，避免重复下载
+
+        返回:
+            bool: 是否已可以开始播放
+        """
+        with self._prefetch_lock:
+            download = self._prefetch_downloads.pop(song_id, None)
+        if download is None:
+            return False
+
+        try:
+            reader = download.open_reader()
+        except OSError:
+            # 预取刚好下载完成，part 文件已提交到缓存
+            return False
+        if not download.wait_ready(self.stream_prebuffer, self.stream_start_timeout):
+            reader.close()
+            download.cancel()
+            return False
+
+        self.stream = download
+        self.stream_reader = reader
+        logger.info(f"接管预取下载，已缓冲 {download.downloaded} 字节")
+        return True
 
     def _play_url(self, url: str) -> bool:
         """
@@ -888,115 +1021,56 @@ class MusicPlayer(Thing):
         # 如果当前有歌曲在播放，先停止
         if self.is_playing:
             self.stop()
+        # 上一首自然播放结束后仍持有读端
+        self._close_stream()
+        # 歌曲信息已切换，播放失败时也需要推送
+        self._post(EVENT_STATE)
 
         try:
-            # 创建临时文件路径
-            temp_dir = os.path.join(self.cache_dir, "temp")
-            if not os.path.exists(temp_dir):
-                os.makedirs(temp_dir)
-
-            temp_file = os.path.join(temp_dir, "current_playing.mp3")
-
             # 检查是否有缓存
-            cache_path = None
-            use_cache = False
-
-            if self.song_id:
-                cache_path = self._get_cache_path(self.song_id)
-                # 检查缓存是否存在且可用
-                if os.path.exists(cache_path):
-                    try:
-                        # 尝试直接使用缓存文件播放
-                        pygame.mixer.music.load(cache_path)
-                        use_cache = True
-                        logger.info(f"使用缓存播放: {cache_path}")
-                    except Exception as e:
-                        # 如果加载缓存失败，回退到下载
-                        logger.warning(f"加载缓存文件失败: {str(e)}，将重新下载")
-                        use_cache = False
-
-            if not use_cache:
-                # 需要下载文件
-                if os.path.exists(temp_file):
-                    try:
-                        # 尝试清理已存在的临时文件
-                        os.remove(temp_file)
-                        logger.info("已清理临时播放文件")
-                    except Exception as e:
-                        logger.warning(f"清理临时播放文件失败: {str(e)}")
-                        # 使用唯一文件名代替
-                        temp_file = os.path.join(temp_dir, f"playing_{int(time.time())}.mp3")
-
-                # 记录当前使用的临时文件
-                self.current_temp_file = temp_file
-
-                # 清理过多的旧临时文件
-                self._cleanup_temp_files(max_keep=3)
-
-                # 如果有缓存路径但缓存不存在，直接下载到缓存位置并创建符号链接或副本到临时位置
-                if cache_path and not os.path.exists(cache_path):
-                    logger.info(f"下载音乐到缓存: {cache_path}")
-                    if self._download_file(url, cache_path):
-                        try:
-                            # 创建从缓存到临时文件的副本
-                            import shutil
-                            shutil.copy2(cache_path, temp_file)
-                            logger.info(f"从缓存创建临时播放文件: {temp_file}")
-                            pygame.mixer.music.load(temp_file)
-                        except Exception as e:
-                            logger.error(f"创建临时播放文件失败: {str(e)}，尝试直接使用缓存")
-                            try:
-                                pygame.mixer.music.load(cache_path)
-                            except Exception as e2:
-                                logger.error(f"加载缓存文件失败: {str(e2)}")
-                                return False
-                    else:
-                        logger.error("下载到缓存失败")
-                        return False
-                else:
-                    # 没有缓存路径或无法使用缓存，直接下载到临时文件
-                    logger.info(f"下载音乐到临时文件: {temp_file}")
-                    if not self._download_file(url, temp_file):
-                        logger.error("下载音乐文件失败")
-                        return False
-
-                    pygame.mixer.music.load(temp_file)
-
-                    # 如果有缓存路径但缓存不存在，异步创建缓存（非必须，仅作为备份）
-                    if cache_path and not os.path.exists(cache_path) and os.path.exists(temp_file):
-                        def copy_to_cache():
-                            try:
-                                import shutil
-                                shutil.copy2(temp_file, cache_path)
-                                logger.info(f"临时文件已复制到缓存: {cache_path}")
-                            except Exception as e:
-                                logger.warning(f"复制到缓存失败: {str(e)}")
-
-                        threading.Thread(
-                            target=copy_to_cache,
-                            daemon=True
-                        ).start()
+            source = self.music_cache.get(self.song_id) if self.song_id else None
+            if source:
+                logger.info(f"使用缓存播放: {source}")
+            # 正在播放的歌曲不会被淘汰
+            self.music_cache.protect(self.song_id)
+
+            # 下一首仍在预取时直接接管该下载
+            if not source and self.song_id and self._attach_prefetch(self.song_id):
+                source = self.stream_reader
+
+            # 没有缓存时边下边播，缓存在后台写完
+            if not source:
+                if not url and self.song_id:
+                    url = self._fetch_play_url(self.song_id)
+                    self.current_url = url
+                if not url or not self._start_stream(url):
+                    self._close_stream()
+                    return False
+                source = self.stream_reader
 
             # 开始播放
-            pygame.mixer.music.play()
+            self._start_decoder(source)
+            self.output.resume()
             self.is_playing = True
             self.paused = False
             self.current_position = 0
-            self.start_play_time = time.time()
+            self.current_lyric_index = -1
+            self.clock.seek(0)
 
             # 更新UI显示
             if self.app:
                 self.app.schedule(lambda: self.app.set_chat_message(
                     "assistant", f"正在播放: {self.current_song}"))
 
-            # 启动进度更新线程
-            self._start_progress_thread()
+            # 安排歌词定时
+            self._post(EVENT_STATE)
 
             return True
 
         except Exception as e:
             logger.error(f"播放歌曲失败: {str(e)}")
             self.is_playing = False
+            self._close_stream()
             return False
 
     def play_pause(self) -> Dict[str, Any]:
@@ -1006,57 +1080,57 @@ class MusicPlayer(Thing):
         返回:
             Dict[str, Any]: 操作结果
         """
-        if not self.is_playing:
-            # 如果没有正在播放的歌曲但有URL，尝试播放
-            if self.current_url:
-                if self._play_url(self.current_url):
-                    return {
-                        "status": "success",
-                        "message": f"开始播放: {self.current_song}"
-                    }
+        with self._player_lock:
+            if not self.is_playing:
+                # 如果没有正在播放的歌曲但有URL，尝试播放
+                if self.current_url or self.song_id:
+                    if self._play_url(self.current_url):
+                        return {
+                            "status": "success",
+                            "message": f"开始播放: {self.current_song}"
+                        }
+                    else:
+                        return {
+                            "status": "error",
+                            "message": "播放失败"
+                        }
                 else:
                     return {
                         "status": "error",
-                        "message": "播放失败"
+                        "message": "没有可播放的歌曲"
                     }
-            else:
-                return {
-                    "status": "error",
-                    "message": "没有可播放的歌曲"
-                }
-        elif self.paused:
-            # 恢复播放
-            pygame.mixer.music.unpause()
-            self.paused = False
-            # 更新开始时间，考虑已经暂停的时间
-            self.start_play_time = time.time() - self.current_position
+            elif self.paused:
+                # 恢复播放
+                self.output.resume()
+                self.paused = False
+                self._post(EVENT_STATE)
 
-            if self.app:
-                self.app.schedule(lambda: self.app.set_chat_message(
-                    "assistant", f"继续播放: {self.current_song}"))
+                if self.app:
+                    self.app.schedule(lambda: self.app.set_chat_message(
+                        "assistant", f"继续播放: {self.current_song}"))
 
-            return {
-                "status": "success",
-                "message": f"继续播放: {self.current_song}"
-            }
-        else:
-            # 暂停播放
-            pygame.mixer.music.pause()
-            self.paused = True
-            self.paused_for_tts = False  # 重要：确保这不是因为TTS而暂停的，避免TTS结束后音乐自动恢复
-            self.current_position = time.time() - self.start_play_time
+                return {
+                    "status": "success",
+                    "message": f"继续播放: {self.current_song}"
+                }
+            else:
+                # 暂停播放
+                self.output.pause()
+                self.paused = True
+                self.current_position = self.clock.position()
+                self._post(EVENT_STATE)
 
-            if self.app:
-                pos_str = self._format_time(self.current_position)
-                dur_str = self._format_time(self.total_duration)
-                self.app.schedule(lambda: self.app.set_chat_message(
-                    "assistant", f"已暂停: {self.current_song} [{pos_str}/{dur_str}]"))
+                if self.app:
+                    pos_str = self._format_time(self.current_position)
+                    dur_str = self._format_time(self.total_duration)
+                    self.app.schedule(lambda: self.app.set_chat_message(
+                        "assistant", f"已暂停: {self.current_song} [{pos_str}/{dur_str}]"))
 
-            return {
-                "status": "success",
-                "message": f"已暂停: {self.current_song}",
-                "position": self.current_position
-            }
+                return {
+                    "status": "success",
+                    "message": f"已暂停: {self.current_song}",
+                    "position": self.current_position
+                }
 
     def stop(self) -> Dict[str, Any]:
         """
@@ -1065,58 +1139,33 @@ class MusicPlayer(Thing):
         返回:
             Dict[str, Any]: 操作结果
         """
-        if not self.is_playing:
-            return {
-                "status": "info",
-                "message": "没有正在播放的歌曲"
-            }
-
-        # 停止进度更新线程
-        self.stop_progress.set()
-        if self.progress_thread and self.progress_thread.is_alive():
-            self.progress_thread.join(timeout=1.0)
-        self.stop_progress.clear()
-
-        # 停止音乐播放
-        pygame.mixer.music.stop()
-
-        # 更改播放状态
-        current_song = self.current_song
-        self.is_playing = False
-        self.paused = False
-        self.paused_for_tts = False  # 明确重置TTS暂停状态
-        self._last_tts_playing = None  # 重置TTS状态跟踪
-
-        # 清理临时文件
-        temp_dir = os.path.join(self.cache_dir, "temp")
-        if os.path.exists(temp_dir):
-            try:
-                temp_file = os.path.join(temp_dir, "current_playing.mp3")
-                if os.path.exists(temp_file):
-                    try:
-                        # 尝试删除临时播放文件
-                        os.remove(temp_file)
-                        logger.info("已清理临时播放文件")
-                    except Exception as e:
-                        logger.warning(f"清理临时播放文件失败: {str(e)}")
-            except Exception as e:
-                logger.warning(f"清理临时文件时出错: {str(e)}")
+        with self._player_lock:
+            if not self.is_playing:
+                return {
+                    "status": "info",
+                    "message": "没有正在播放的歌曲"
+                }
 
-        # 清理旧的临时文件
-        self._cleanup_temp_files(max_keep=1)
+            # 更改播放状态
+            current_song = self.current_song
+            self.is_playing = False
+            self.paused = False
 
-        # 重置当前临时文件
-        self.current_temp_file = None
+            # 停止解码，中止未完成的下载并释放读端
+            self._close_stream()
+            # 写回缓存索引中的最后访问时间和延迟保存的元数据缓存
+            self._flush_caches()
+            self._post(EVENT_STATE)
 
-        # 返回结果
-        msg = f"已停止播放: {current_song}"
-        if self.app:
-            self.app.schedule(lambda: self.app.set_chat_message("assistant", msg))
+            # 返回结果
+            msg = f"已停止播放: {current_song}"
+            if self.app:
+                self.app.schedule(lambda: self.app.set_chat_message("assistant", msg))
 
-        return {
-            "status": "success",
-            "message": msg
-        }
+            return {
+                "status": "success",
+                "message": msg
+            }
 
     def seek(self, position: float) -> Dict[str, Any]:
         """
@@ -1128,115 +1177,159 @@ class MusicPlayer(Thing):
         返回:
             Dict[str, Any]: 操作结果
         """
-        if not self.is_playing:
-            return {
-                "status": "error",
-                "message": "没有正在播放的歌曲"
-            }
+        with self._player_lock:
+            if not self.is_playing:
+                return {
+                    "status": "error",
+                    "message": "没有正在播放的歌曲"
+                }
 
-        # 确保位置在有效范围内
-        position = max(0, min(position, self.total_duration))
+            # 确保位置在有效范围内
+            position = max(0, min(position, self.total_duration))
 
-        # 记录当前位置
-        self.current_position = position
+            # 记录当前位置
+            self.current_position = position
 
-        # 更新开始时间
-        self.start_play_time = time.time() - position
+            # 从目标位置重新解码：已缓存时由 ffmpeg 直接定位，边下边播时从头读取下载数据
+            source = self.music_cache.get(self.song_id) if self.song_id else None
+            if not source:
+                if not self.stream:
+                    return {
+                        "status": "error",
+                        "message": "当前歌曲不支持跳转"
+                    }
+                if self.stream_reader:
+                    self.stream_reader.close()
+                self.stream_reader = source = self.stream.open_reader()
+            try:
+                self._start_decoder(source, position)
+            except Exception as e:
+                logger.error(f"跳转失败: {str(e)}")
+                return {
+                    "status": "error",
+                    "message": "跳转失败"
+                }
+            # 混音器时钟以跳转点为新的基准；暂停状态由音源保持
+            self.clock.seek(position)
+            self.current_lyric_index = -1
+            self._post(EVENT_STATE)
 
-        # 使用pygame跳转
-        pygame.mixer.music.rewind()
-        pygame.mixer.music.set_pos(position)
+            # 更新UI
+            pos_str = self._format_time(position)
+            dur_str = self._format_time(self.total_duration)
+            msg = f"已跳转到: {pos_str}/{dur_str}"
 
-        # 如果处于暂停状态，保持暂停
-        if self.paused:
-            pygame.mixer.music.pause()
+            if self.app:
+                self.app.schedule(lambda: self.app.set_chat_message("assistant", msg))
 
-        # 更新UI
-        pos_str = self._format_time(position)
-        dur_str = self._format_time(self.total_duration)
-        msg = f"已跳转到: {pos_str}/{dur_str}"
+            return {
+                "status": "success",
+                "message": msg,
+                "position": position
+            }
 
-        if self.app:
-            self.app.schedule(lambda: self.app.set_chat_message("assistant", msg))
+    def _post(self, event: str, value: Any = None):
+        """投递播放器事件"""
+        self._events.put((event, value))
 
-        return {
-            "status": "success",
-            "message": msg,
-            "position": position
-        }
+    def _event_loop(self):
+        """事件线程：没有事件时阻塞到下一行歌词的时间，暂停、空闲或没有歌词时一直阻塞"""
+        while True:
+            try:
+                event, value = self._events.get(timeout=self._next_lyric_delay())
+            except queue.Empty:
+                event, value = EVENT_LYRIC, None
 
-    def _start_progress_thread(self):
-        """启动进度更新线程"""
-        # 确保之前的线程已经停止
-        if self.progress_thread and self.progress_thread.is_alive():
-            self.stop_progress.set()
-            self.progress_thread.join(timeout=1.0)
-            self.stop_progress.clear()
-
-        # 创建新线程
-        self.progress_thread = threading.Thread(
-            target=self._update_progress_thread,
-            daemon=True
-        )
-        self.progress_thread.start()
-
-    def _update_progress_thread(self):
-        """进度更新线程"""
-        last_lyric_update = 0
-        last_tts_check = 0
-
-        while not self.stop_progress.is_set() and self.is_playing:
-            current_time = time.time()
-            
-            # 如果暂停了，等待恢复
-            if self.paused and not self.paused_for_tts:
-                time.sleep(0.2)
-                continue
-                
-            # 每200ms检查一次TTS状态
-            if current_time - last_tts_check > 0.2:
-                self._handle_tts_priority()
-                last_tts_check = current_time
-                
-                # 如果因为TTS而暂停，继续等待
-                if self.paused_for_tts:
-                    time.sleep(0.1)
-                    continue
+            try:
+                with self._player_lock:
+                    if event == EVENT_END:
+                        self._on_playback_end()
+                    elif event == EVENT_TTS:
+                        self._on_tts_changed(value)
+                    else:
+                        self._refresh_lyrics()
+                    self._push_state()
+            except Exception as e:
+                logger.error(f"处理播放器事件 {event} 失败: {str(e)}")
+
+    def _push_state(self):
+        """把当前状态推送给 ThingManager（值未变化的属性不会标记为变化）"""
+        self.update_property("current_song", self.current_song)
+        self.update_property("is_playing", self.is_playing)
+        self.update_property("paused", self.paused)
+        self.update_property("total_duration", self.total_duration)
+        self.update_property("current_position", self._get_current_position())
+        self.update_property("progress", self._get_progress())
+        self.update_property("queue_length", len(self.queue))
+
+    def _next_lyric_delay(self) -> Optional[float]:
+        """距下一行歌词的秒数，不需要定时刷新时返回 None"""
+        if not self.is_playing or self.paused or not self.lyrics:
+            return None
+        # TTS 播放期间不显示歌词，结束时由 TTS 事件刷新
+        if self.app and self.app.get_is_tts_playing():
+            return None
+        position = self.clock.position()
+        boundary = self.lyrics.next_boundary(position)
+        if boundary is None:
+            return None
+        return max(boundary - position, 0.01)
+
+    def _refresh_lyrics(self):
+        """读取混音器时钟并更新歌词显示"""
+        if not self.is_playing or self.paused:
+            return
+        self.current_position = self.clock.position()
+        self._update_lyrics()
 
-            # 计算当前位置
-            self.current_position = time.time() - self.start_play_time
+    def _on_tts_changed(self, playing: bool):
+        """TTS 播放期间混音器会压低音乐，这里只处理打断和歌词刷新"""
+        if playing or not self.is_playing:
+            return
 
-            # 检查是否到达歌曲末尾
-            if self.current_position >= self.total_duration:
-                # 已播放完成
-                self.current_position = self.total_duration
-                logger.info(f"歌曲 '{self.current_song}' 播放完成")
+        # 检查是否有打断请求
+        if self.app and getattr(self.app, 'aborted', False):
+            if not self.paused:
+                logger.info("检测到打断请求，暂停音乐播放")
+                self.output.pause()
+                self.paused = True
+                self.current_position = self.clock.position()
+            return
 
-                # 停止播放并重置状态
-                pygame.mixer.music.stop()
-                self.is_playing = False
-                self.paused_for_tts = False  # 重置TTS暂停状态
+        self._refresh_lyrics()
 
-                # 更新UI显示完成状态
-                if self.app:
-                    dur_str = self._format_time(self.total_duration)
-                    self.app.schedule(lambda: self.app.set_chat_message(
-                        "assistant", f"播放完成: {self.current_song} [{dur_str}]"))
+    def _on_playback_end(self):
+        """解码器播放到末尾"""
+        # 换歌或跳转后清空了音源，迟到的结束事件直接忽略
+        if not self.is_playing or not self.output.drained:
+            return
 
-                # 根据自动模式设置应用状态
-                if self.app:
-                    self.app.schedule(lambda: self.app.set_device_state(DeviceState.IDLE))
-                break
+        if self.total_duration:
+            self.current_position = self.total_duration
+        logger.info(f"歌曲 '{self.current_song}' 播放完成")
+
+        # 停止解码并重置状态
+        self._stop_decoder()
+        self.is_playing = False
+        self._flush_caches()
+
+        # 播放队列中还有下一首时自动切换
+        if self.queue.upcoming(1):
+            self.next_track()
+            return
 
-            # 更新歌词显示（每0.5秒检查一次）
-            if time.time() - last_lyric_update > 0.5:
-                self._update_lyrics()
-                last_lyric_update = time.time()
+        # 队列已播完，之后加入的歌曲从新条目开始播放
+        self.queue.finish()
 
-            # 短暂休眠再继续
-            time.sleep(0.1)
+        # 更新UI显示完成状态
+        if self.app:
+            dur_str = self._format_time(self.total_duration)
+            self.app.schedule(lambda: self.app.set_chat_message(
+                "assistant", f"播放完成: {self.current_song} [{dur_str}]"))
 
-        logger.debug("进度更新线程已退出")
+        # 根据自动模式设置应用状态
+        if self.app:
+            self.app.schedule(lambda: self.app.set_device_state(DeviceState.IDLE))
 
     def _format_time(self, seconds: float) -> str:
         """
@@ -1259,47 +1352,46 @@ class MusicPlayer(Thing):
         返回:
             Dict[str, Any]: 操作结果
         """
-        # 如果没有正在播放的歌曲但有URL，尝试播放
-        if not self.is_playing:
-            if self.current_url:
-                if self._play_url(self.current_url):
-                    return {
-                        "status": "success",
-                        "message": f"开始播放: {self.current_song}"
-                    }
+        with self._player_lock:
+            # 如果没有正在播放的歌曲但有URL，尝试播放
+            if not self.is_playing:
+                if self.current_url or self.song_id:
+                    if self._play_url(self.current_url):
+                        return {
+                            "status": "success",
+                            "message": f"开始播放: {self.current_song}"
+                        }
+                    else:
+                        return {
+                            "status": "error",
+                            "message": "播放失败"
+                        }
                 else:
                     return {
                         "status": "error",
-                        "message": "播放失败"
+                        "message": "没有可播放的歌曲"
                     }
+            # 如果已经在播放，检查是否暂停
+            elif self.paused:
+                # 恢复播放
+                self.output.resume()
+                self.paused = False
+                self._post(EVENT_STATE)
+
+                if self.app:
+                    self.app.schedule(lambda: self.app.set_chat_message(
+                        "assistant", f"继续播放: {self.current_song}"))
+
+                return {
+                    "status": "success",
+                    "message": f"继续播放: {self.current_song}"
+                }
             else:
+                # 已经在播放了
                 return {
-                    "status": "error",
-                    "message": "没有可播放的歌曲"
+                    "status": "info",
+                    "message": f"音乐已经在播放中: {self.current_song}"
                 }
-        # 如果已经在播放，检查是否暂停
-        elif self.paused:
-            # 恢复播放
-            pygame.mixer.music.unpause()
-            self.paused = False
-            self.paused_for_tts = False  # 确保重置TTS暂停标志
-            # 更新开始时间，考虑已经暂停的时间
-            self.start_play_time = time.time() - self.current_position
-
-            if self.app:
-                self.app.schedule(lambda: self.app.set_chat_message(
-                    "assistant", f"继续播放: {self.current_song}"))
-
-            return {
-                "status": "success",
-                "message": f"继续播放: {self.current_song}"
-            }
-        else:
-            # 已经在播放了
-            return {
-                "status": "info",
-                "message": f"音乐已经在播放中: {self.current_song}"
-            }
 
     def pause(self) -> Dict[str, Any]:
         """
@@ -1308,36 +1400,34 @@ class MusicPlayer(Thing):
         返回:
             Dict[str, Any]: 操作结果
         """
-        # 如果没有正在播放的歌曲
-        if not self.is_playing:
-            return {
-                "status": "info",
-                "message": "没有正在播放的歌曲"
-            }
-        # 如果已经暂停
-        elif self.paused:
-            # 即使已经暂停，也确保重置TTS暂停标志，防止TTS结束后自动恢复
-            self.paused_for_tts = False
-            logger.info("音乐已经暂停，确保不会自动恢复")
-            return {
-                "status": "success",  # 改为success以确保用户收到正确反馈
-                "message": f"音乐已暂停: {self.current_song}"
-            }
-        else:
-            # 暂停播放
-            pygame.mixer.music.pause()
-            self.paused = True
-            self.paused_for_tts = False  # 明确设置：这不是因为TTS而暂停的
-            self.current_position = time.time() - self.start_play_time
+        with self._player_lock:
+            # 如果没有正在播放的歌曲
+            if not self.is_playing:
+                return {
+                    "status": "info",
+                    "message": "没有正在播放的歌曲"
+                }
+            # 如果已经暂停
+            elif self.paused:
+                return {
+                    "status": "success",  # 改为success以确保用户收到正确反馈
+                    "message": f"音乐已暂停: {self.current_song}"
+                }
+            else:
+                # 暂停播放
+                self.output.pause()
+                self.paused = True
+                self.current_position = self.clock.position()
+                self._post(EVENT_STATE)
 
-            if self.app:
-                pos_str = self._format_time(self.current_position)
-                dur_str = self._format_time(self.total_duration)
-                self.app.schedule(lambda: self.app.set_chat_message(
-                    "assistant", f"已暂停: {self.current_song} [{pos_str}/{dur_str}]"))
+                if self.app:
+                    pos_str = self._format_time(self.current_position)
+                    dur_str = self._format_time(self.total_duration)
+                    self.app.schedule(lambda: self.app.set_chat_message(
+                        "assistant", f"已暂停: {self.current_song} [{pos_str}/{dur_str}]"))
 
-            return {
-                "status": "success",
-                "message": f"已暂停: {self.current_song}",
-                "position": self.current_position
-            }
\ No newline at end of file
+                return {
+                    "status": "success",
+                    "message": f"已暂停: {self.current_song}",
+                    "position": self.current_position
+                }
\ No newline at end of file
@@ -3,6 +3,8 @@ from src.iot.thing import Thing, Parameter, ValueType
 
 
 class Speaker(Thing):
+    push_states = True
+
     def __init__(self):
         super().__init__("Speaker", "当前 AI 机器人的扬声器")
         
@@ -15,7 +17,7 @@ class Speaker(Thing):
             self.volume = 100  # 默认音量
 
         # 定义属性
-        self.add_property("volume", "当前音量值", lambda: self.volume)
+        self.add_property("volume", "当前音量值", lambda: self.volume, ValueType.NUMBER)
 
         # 定义方法
         self.add_method(
@@ -28,6 +30,7 @@ class Speaker(Thing):
     def _set_volume(self, volume):
         if 0 <= volume <= 100:
             self.volume = volume
+            self.update_property("volume", volume)
             try:
                 app = Application.get_instance()
                 app.display.update_volume(volume)
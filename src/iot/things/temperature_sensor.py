@@ -8,29 +8,33 @@ from datetime import datetime
 from src.application import Application
 from src.constants.constants import DeviceState
 from src.iot.thing import Thing, Parameter, ValueType
-from src.network.mqtt_client import MqttClient
+from src.network.mqtt_hub import MqttHub
 
 
 
 class TemperatureSensor(Thing):
+    push_states = True
+
     def __init__(self):
         super().__init__("TemperatureSensor", "温度传感器设备")
         self.temperature = 0.0  # 初始温度值为0摄氏度
         self.humidity = 0.0  # 初始湿度值为0%
         self.last_update_time = 0  # 最后一次更新时间
         self.is_running = False
-        self.mqtt_client = None
+        self.mqtt_client = None  # 共享的 MqttConnection
+        self.subscribe_topic = None
+        self.publish_topic = None
         self.app = None  # 初始化app属性为None
 
         print("[IoT设备] 温度传感器接收端初始化完成")
 
         # 定义属性
         self.add_property("temperature", "当前温度(摄氏度)", 
-                          lambda: self.temperature)
+                          lambda: self.temperature, ValueType.NUMBER)
         self.add_property("humidity", "当前湿度(%)", 
-                          lambda: self.humidity)
+                          lambda: self.humidity, ValueType.NUMBER)
         self.add_property("last_update_time", "最后更新时间", 
-                          lambda: self.last_update_time)
+                          lambda: self.last_update_time, ValueType.NUMBER)
 
         # self.add_method("getTemperature", "获取温度传感器数据",
         #                 [],
@@ -40,30 +44,25 @@ class TemperatureSensor(Thing):
         self._init_mqtt()
 
     def _init_mqtt(self):
-        """初始化MQTT客户端"""
+        """通过 MqttHub 获取共享连接并订阅传感器主题"""
         from src.utils.config_manager import ConfigManager
         config = ConfigManager.get_instance()
         try:
-            self.mqtt_client = MqttClient(
+            self.subscribe_topic = config.get_config("TEMPERATURE_SENSOR_MQTT_INFO.subscribe_topic")
+            self.publish_topic = config.get_config("TEMPERATURE_SENSOR_MQTT_INFO.publish_topic")
+            # 同一 broker 上的传感器共用一个连接和网络线程
+            self.mqtt_client = MqttHub.get_instance().connection(
                 server=config.get_config("TEMPERATURE_SENSOR_MQTT_INFO.endpoint"),
                 port=config.get_config("TEMPERATURE_SENSOR_MQTT_INFO.port"),
                 username=config.get_config("TEMPERATURE_SENSOR_MQTT_INFO.username"),
                 password=config.get_config("TEMPERATURE_SENSOR_MQTT_INFO.password"),
-                # 订阅传感器数据发送的主题
-                subscribe_topic=config.get_config("TEMPERATURE_SENSOR_MQTT_INFO.subscribe_topic"),
             )
-            
-            # 设置自定义消息处理回调
-            self.mqtt_client.client.on_message = self._on_mqtt_message
-            
-            # 连接MQTT服务器
-            self.mqtt_client.connect()
-            self.mqtt_client.start()
-            print("[温度传感器] MQTT客户端已连接")
+            self.mqtt_client.subscribe(self.subscribe_topic, self._on_mqtt_message)
+            print("[温度传感器] 已订阅共享MQTT连接")
         except Exception as e:
             print(f"[温度传感器] MQTT连接失败: {e}")
 
-    def _on_mqtt_message(self, client, userdata, msg):
+    def _on_mqtt_message(self, msg):
         """处理MQTT消息"""
         try:
             topic = msg.topic
@@ -108,6 +107,9 @@ class TemperatureSensor(Thing):
 
                     print(f"[温度传感器] 更新数据: 温度={self.temperature}°C, "
                           f"湿度={self.humidity}%, 时间={update_time}")
+                    self.update_property("temperature", self.temperature)
+                    self.update_property("humidity", self.humidity)
+                    self.update_property("last_update_time", self.last_update_time)
                     # 设置设备状态并发送消息
                     self.handle_temperature_update()
             except json.JSONDecodeError:
@@ -181,7 +183,8 @@ class TemperatureSensor(Thing):
                 "action": "get_data",  # 增加action字段支持
                 "timestamp": int(time.time())
             }
-            self.mqtt_client.publish(json.dumps(command))
+            # 同一批次内的多次数据请求只发送一次
+            self.mqtt_client.publish(self.publish_topic, json.dumps(command), key=f"{self.publish_topic}:get_data")
             print("[温度传感器] 已发送数据请求命令")
             
     def send_command(self, action_name, **kwargs):
@@ -195,7 +198,7 @@ class TemperatureSensor(Thing):
             # 添加任何额外参数
             command.update(kwargs)
             
-            self.mqtt_client.publish(json.dumps(command))
+            self.mqtt_client.publish(self.publish_topic, json.dumps(command))
             print(f"[温度传感器] 已发送命令: {action_name}")
             return True
         return False
@@ -205,10 +208,10 @@ class TemperatureSensor(Thing):
                           f"湿度={self.humidity}%, 时间={self.last_update_time}"}
 
     def __del__(self):
-        """析构函数，确保资源被正确释放"""
+        """析构函数，取消订阅（共享连接由 MqttHub 管理）"""
         if self.mqtt_client:
             try:
-                self.mqtt_client.stop()
+                self.mqtt_client.unsubscribe(self.subscribe_topic, self._on_mqtt_message)
             except Exception:
                 pass
 
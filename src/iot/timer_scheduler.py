@@ -0,0 +1,282 @@
+import heapq
+import itertools
+import json
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.iot.cron import CronSchedule
+from src.iot.timer_store import TimerStore
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=256)
+def _compile_cron(expression: str) -> CronSchedule:
+    return CronSchedule(expression)
+
+
+class TimerScheduler:
+    """定时执行IoT命令的调度器 - 单例模式
+
+    任务保存在 SQLite（TIMER_SCHEDULER.STORE_FILE，按 fire_at 建索引）中，
+    内存里只保留未来 LOOKAHEAD 秒内到期的任务，放在按到期时间排序的最小堆里，
+    由一个后台线程等待最早的到期时间，窗口快用完时再从存储中取下一段。
+    因此上千个周期任务既不拖慢启动，也不常驻内存。到期的命令交给
+    IotExecutor 执行，调度线程本身从不阻塞在设备调用上。
+
+    支持一次性倒计时和 cron 周期任务；周期任务触发后计算下一次时间写回存储。
+    停机期间错过的一次性任务在 MISSED_GRACE 秒内补执行，超过则丢弃；
+    错过的周期任务超过宽限时间则直接顺延到下一次。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """获取单例实例"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+                    cls._instance.start()
+        return cls._instance
+
+    def __init__(self, store_file=None, missed_grace=None, lookahead=None):
+        config = ConfigManager.get_instance()
+        self.store_file = Path(store_file or config.get_config(
+            "TIMER_SCHEDULER.STORE_FILE", "cache/timers.db"))
+        # 旧版本使用 JSON 快照，迁移到同名 .db
+        self._legacy_file = self.store_file.with_suffix(".json")
+        if self.store_file.suffix == ".json":
+            self.store_file = self.store_file.with_suffix(".db")
+        self.missed_grace = missed_grace if missed_grace is not None else config.get_config(
+            "TIMER_SCHEDULER.MISSED_GRACE", 300)
+        self.lookahead = lookahead if lookahead is not None else config.get_config(
+            "TIMER_SCHEDULER.LOOKAHEAD", 3600)
+
+        self._store: Optional[TimerStore] = None
+        self._jobs: Dict[int, Dict] = {}  # 已载入窗口的任务 timer_id -> 任务
+        self._heap: List[tuple] = []  # (fire_at, seq, timer_id)
+        self._seq = itertools.count()
+        self._horizon = 0.0  # 已载入到的时间点
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        # 任务增删后调用（不持有调度器锁），用于推送未执行任务数
+        self.on_jobs_changed: Optional[Callable[[], None]] = None
+
+    def start(self):
+        """打开存储、载入到期和即将到期的任务并启动调度线程"""
+        if self._running:
+            return
+        with self._cond:
+            self._ensure_store()
+            self._load_window(time.time(), initial=True)
+        total = self._store.count()
+        if total:
+            logger.info(f"定时任务共 {total} 个，已载入 {len(self._jobs)} 个即将到期的任务")
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="timer-scheduler")
+        self._thread.start()
+
+    def stop(self):
+        """停止调度线程（未到期的任务保留在存储中）"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def schedule(self, delay: float, command: str) -> int:
+        """
+        在 delay 秒后执行 IoT 命令
+
+        Args:
+            delay: 延迟秒数
+            command: JSON 格式的命令字符串
+
+        Returns:
+            int: timer_id
+        """
+        return self._add(time.time() + delay, command, None)
+
+    def schedule_cron(self, expression: str, command: str) -> int:
+        """
+        按 cron 表达式周期执行 IoT 命令
+
+        Args:
+            expression: 5段 cron 表达式，如 "0 7 * * 1-5"
+            command: JSON 格式的命令字符串
+
+        Returns:
+            int: timer_id
+
+        Raises:
+            ValueError: cron 表达式无效
+        """
+        fire_at = _compile_cron(expression).next_timestamp(time.time())
+        return self._add(fire_at, command, expression)
+
+    def cancel(self, timer_id: int) -> bool:
+        """取消任务，返回是否存在该任务"""
+        with self._cond:
+            self._ensure_store()
+            if not self._store.remove(timer_id):
+                return False
+            if self._jobs.pop(timer_id, None) is not None:
+                self._compact()
+                self._cond.notify()
+        self._jobs_changed()
+        return True
+
+    def pending(self) -> List[Dict]:
+        """按到期时间排列的未执行任务"""
+        with self._cond:
+            self._ensure_store()
+            return self._store.all()
+
+    def count(self) -> int:
+        """未执行的任务数（含周期任务）"""
+        with self._cond:
+            self._ensure_store()
+            return self._store.count()
+
+    def _jobs_changed(self):
+        if self.on_jobs_changed:
+            try:
+                self.on_jobs_changed()
+            except Exception as e:
+                logger.error(f"处理定时任务变化回调失败: {e}")
+
+    def _ensure_store(self):
+        if self._store is None:
+            self._store = TimerStore(self.store_file)
+            self._import_legacy()
+
+    def _add(self, fire_at, command, cron):
+        with self._cond:
+            self._ensure_store()
+            timer_id = self._store.add(fire_at, command, cron)
+            # 落在已载入窗口内的任务直接入堆，其余的等窗口推进时从存储载入
+            if fire_at <= self._horizon:
+                self._push({"id": timer_id, "fire_at": fire_at, "command": command, "cron": cron})
+                # 新任务可能比当前等待的更早到期
+                self._cond.notify()
+        self._jobs_changed()
+        return timer_id
+
+    def _push(self, job):
+        self._jobs[job["id"]] = job
+        heapq.heappush(self._heap, (job["fire_at"], next(self._seq), job["id"]))
+
+    def _compact(self):
+        # 已取消的条目超过一半时重建堆，避免大量取消后堆无限增长
+        if len(self._heap) > 2 * len(self._jobs) + 16:
+            self._heap = [entry for entry in self._heap if entry[2] in self._jobs]
+            heapq.heapify(self._heap)
+
+    def _load_window(self, now, initial=False):
+        """从存储载入 (horizon, now + lookahead] 内的任务（调用方需持有 _cond）"""
+        end = now + self.lookahead
+        rows = self._store.window(None if initial else self._horizon, end)
+        self._horizon = end
+        for job in rows:
+            late = now - job["fire_at"]
+            if late > self.missed_grace:
+                if not job["cron"]:
+                    logger.warning(f"倒计时 {job['id']} 已过期 {late:.0f} 秒，不再执行")
+                    self._store.remove(job["id"])
+                    continue
+                if not self._advance(job, now):
+                    continue
+                if job["fire_at"] > end:
+                    continue
+            self._push(job)
+
+    def _advance(self, job, now) -> bool:
+        """计算周期任务的下一次触发时间并写回存储，表达式无效时删除任务"""
+        try:
+            job["fire_at"] = _compile_cron(job["cron"]).next_timestamp(max(now, job["fire_at"]))
+        except ValueError as e:
+            logger.error(f"定时任务 {job['id']} 的 cron 表达式无效，已删除: {e}")
+            self._store.remove(job["id"])
+            return False
+        self._store.reschedule(job["id"], job["fire_at"])
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                now = time.time()
+                # 窗口过半时载入下一段
+                if now + self.lookahead / 2 >= self._horizon:
+                    self._load_window(now)
+
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, timer_id = heapq.heappop(self._heap)
+                    job = self._jobs.pop(timer_id, None)
+                    if job is None:
+                        continue
+                    due.append(dict(job))
+                    if job["cron"]:
+                        if self._advance(job, now) and job["fire_at"] <= self._horizon:
+                            self._push(job)
+                    else:
+                        self._store.remove(timer_id)
+
+                if not due:
+                    # 最多等待60秒再检查，容忍系统时间调整
+                    timeout = min(60.0, self._horizon - self.lookahead / 2 - now)
+                    if self._heap:
+                        timeout = min(timeout, self._heap[0][0] - now)
+                    self._cond.wait(max(0.0, timeout))
+                    continue
+
+            for job in due:
+                self._fire(job)
+            # 一次性任务到期后已从存储删除
+            self._jobs_changed()
+
+    def _fire(self, job):
+        timer_id = job["id"]
+        logger.info(f"定时任务 {timer_id} 到期，准备执行命令: {job['command']}")
+        try:
+            command = json.loads(job["command"])
+        except json.JSONDecodeError:
+            logger.error(f"定时任务 {timer_id}: 命令 '{job['command']}' 格式错误，无法解析JSON。")
+            return
+
+        from src.iot.iot_executor import IotExecutor
+
+        def on_done(_, future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error:
+                logger.error(f"定时任务 {timer_id} 执行命令 '{job['command']}' 时出错: {error}")
+            else:
+                logger.info(f"定时任务 {timer_id} 执行命令 '{job['command']}' 结果: {future.result()}")
+
+        IotExecutor.get_instance().submit(command, callback=on_done)
+
+    def _import_legacy(self):
+        """导入旧版 JSON 快照中的倒计时（调用方需持有 _cond）"""
+        if not self._legacy_file.exists():
+            return
+        try:
+            data = json.loads(self._legacy_file.read_text(encoding="utf-8"))
+            for job in data.get("jobs", []):
+                self._store.add(job["fire_at"], job["command"])
+            self._legacy_file.unlink()
+            logger.info(f"已从 {self._legacy_file} 迁移 {len(data.get('jobs', []))} 个倒计时")
+        except Exception as e:
+            logger.error(f"迁移旧版定时任务失败: {e}")
@@ -0,0 +1,73 @@
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TimerStore:
+    """定时任务的 SQLite 存储
+
+    每个任务一行，fire_at 上有索引，调度器按时间窗口查询即将到期的任务，
+    不需要把全部任务读进内存。一次性任务的 cron 为空，周期任务保存 cron 表达式，
+    每次触发后原地更新 fire_at。
+
+    本类不做加锁，调用方（TimerScheduler）负责串行访问。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS timers ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " fire_at REAL NOT NULL,"
+            " command TEXT NOT NULL,"
+            " cron TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_timers_fire_at ON timers(fire_at)")
+        self._conn.commit()
+
+    def add(self, fire_at: float, command: str, cron: Optional[str] = None) -> int:
+        """新增任务，返回自增 ID（ID 不会复用）"""
+        cursor = self._conn.execute(
+            "INSERT INTO timers (fire_at, command, cron) VALUES (?, ?, ?)",
+            (fire_at, command, cron))
+        self._conn.commit()
+        return cursor.lastrowid
+
+    def remove(self, timer_id: int) -> bool:
+        cursor = self._conn.execute("DELETE FROM timers WHERE id = ?", (timer_id,))
+        self._conn.commit()
+        return cursor.rowcount > 0
+
+    def reschedule(self, timer_id: int, fire_at: float):
+        """更新周期任务的下一次触发时间"""
+        self._conn.execute(
+            "UPDATE timers SET fire_at = ? WHERE id = ?", (fire_at, timer_id))
+        self._conn.commit()
+
+    def window(self, start: Optional[float], end: float) -> List[Dict]:
+        """查询 start < fire_at <= end 的任务，start 为 None 时包含所有已过期任务"""
+        if start is None:
+            rows = self._conn.execute(
+                "SELECT * FROM timers WHERE fire_at <= ? ORDER BY fire_at", (end,))
+        else:
+            rows = self._conn.execute(
+                "SELECT * FROM timers WHERE fire_at > ? AND fire_at <= ? ORDER BY fire_at",
+                (start, end))
+        return [dict(row) for row in rows]
+
+    def all(self) -> List[Dict]:
+        rows = self._conn.execute("SELECT * FROM timers ORDER BY fire_at")
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM timers").fetchone()[0]
@@ -0,0 +1,43 @@
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# 歌词显示相对时间轴的延迟（秒），与原先的显示效果保持一致
+LYRIC_OFFSET = 0.5
+
+
+class Lyrics:
+    """按时间排序的歌词，时间和文本分别存放在两个并行数组中
+
+    查找当前行用 bisect，O(log n)；next_boundary() 给出下一次换行的时间，
+    播放器据此定时刷新，而不是轮询。
+    """
+
+    def __init__(self, lines: Iterable[Tuple[float, str]] = ()):
+        ordered = sorted(lines, key=lambda line: line[0])
+        self.times: List[float] = [float(line[0]) for line in ordered]
+        self.texts: List[str] = [line[1] for line in ordered]
+
+    def __len__(self):
+        return len(self.times)
+
+    def __bool__(self):
+        return bool(self.times)
+
+    def __iter__(self) -> Iterator[Tuple[float, str]]:
+        return zip(self.times, self.texts)
+
+    def __getitem__(self, index) -> Tuple[float, str]:
+        return self.times[index], self.texts[index]
+
+    def index_at(self, position: float) -> int:
+        """position 秒时应显示的歌词索引，没有歌词时返回 -1"""
+        if not self.times:
+            return -1
+        return max(0, bisect_right(self.times, position - LYRIC_OFFSET) - 1)
+
+    def next_boundary(self, position: float) -> Optional[float]:
+        """position 之后下一次切换歌词的时间，已是最后一行时返回 None"""
+        index = bisect_right(self.times, position - LYRIC_OFFSET)
+        if index >= len(self.times):
+            return None
+        return self.times[index] + LYRIC_OFFSET
@@ -0,0 +1,275 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILE = "index.json"
+TEMP_DIR = "temp"
+# 下载中途留下的临时文件后缀
+TEMP_SUFFIXES = (".part", ".tmp", ".temp", ".new")
+
+
+class MusicCache:
+    """有容量上限的音乐文件缓存
+
+    索引（index.json）记录 歌曲ID -> 文件名、大小、时长、最后访问时间、SHA-256，
+    按最后访问时间排列；命中时只查内存索引，不做任何 stat。写入总量超过
+    max_bytes 时按 LRU 淘汰，正在播放的歌曲不会被淘汰。
+
+    下载完成的 part 文件经 commit() 原子地改名为正式文件后才写入索引；
+    启动时 reconcile() 清理临时文件、删除索引中文件已丢失或大小不符的条目，
+    收编索引外的缓存文件，并在后台线程中核对 SHA-256，淘汰内容损坏的文件。
+    播放时文件无法打开的，由调用方用 remove() 淘汰。
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.temp_dir = os.path.join(cache_dir, TEMP_DIR)
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._total = 0
+        self._protected = set()
+        self._lock = threading.RLock()
+        self._dirty = False
+
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.reconcile()
+
+    def path_of(self, song_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{song_id}.mp3")
+
+    def part_path(self, song_id: str) -> str:
+        """下载中的临时文件路径"""
+        return os.path.join(self.temp_dir, f"{song_id or 'stream'}_{int(time.time() * 1000)}.part")
+
+    def contains(self, song_id: str) -> bool:
+        with self._lock:
+            return song_id in self._entries
+
+    def get(self, song_id: str) -> Optional[str]:
+        """命中时返回文件路径并更新最后访问时间"""
+        with self._lock:
+            entry = self._entries.get(song_id)
+            if entry is None:
+                return None
+            entry["last_access"] = time.time()
+            self._entries.move_to_end(song_id)
+            self._dirty = True
+            return os.path.join(self.cache_dir, entry["file"])
+
+    def protect(self, song_id: Optional[str]):
+        """标记正在播放的歌曲，淘汰时跳过（传 None 清除）"""
+        with self._lock:
+            self._protected = {song_id} if song_id else set()
+
+    def commit(self, song_id: str, part_path: str, duration: float = 0) -> Optional[str]:
+        """
+        把下载完成的 part 文件提交到缓存
+
+        返回:
+            Optional[str]: 缓存文件路径，失败返回 None
+        """
+        try:
+            size, checksum = self._digest(part_path)
+            target = self.path_of(song_id)
+            try:
+                os.replace(part_path, target)
+            except OSError:
+                # Windows 下文件仍被读端打开时无法改名，先复制到临时名再原子替换
+                tmp_target = f"{target}.new"
+                shutil.copyfile(part_path, tmp_target)
+                os.replace(tmp_target, target)
+                self._remove_file(part_path)
+        except Exception as e:
+            logger.warning(f"提交音乐缓存失败: {str(e)}")
+            self._remove_file(part_path)
+            return None
+
+        with self._lock:
+            old = self._entries.pop(song_id, None)
+            if old:
+                self._total -= old["size"]
+            self._entries[song_id] = {
+                "file": os.path.basename(target),
+                "size": size,
+                "duration": duration,
+                "last_access": time.time(),
+                "sha256": checksum,
+            }
+            self._total += size
+            self._evict()
+            self._save()
+        logger.info(f"音乐文件已缓存: {target} ({size} 字节，缓存共 {self._total} 字节)")
+        return target
+
+    def discard(self, part_path: str):
+        """丢弃未完成的下载"""
+        self._remove_file(part_path)
+
+    def remove(self, song_id: str):
+        """删除缓存条目及文件（例如文件损坏无法播放）"""
+        with self._lock:
+            entry = self._entries.get(song_id)
+        if entry is not None:
+            self._drop(song_id, entry)
+
+    def _drop(self, song_id: str, entry: Dict):
+        """删除指定的条目及文件（条目已被替换时不做任何事）"""
+        with self._lock:
+            if self._entries.get(song_id) is not entry:
+                return
+            del self._entries[song_id]
+            self._total -= entry["size"]
+            self._save()
+        self._remove_file(os.path.join(self.cache_dir, entry["file"]))
+
+    def flush(self):
+        """保存最后访问时间等未写入的索引变更"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def reconcile(self):
+        """启动时让索引和磁盘内容保持一致"""
+        with self._lock:
+            entries = self._load_index()
+            self._entries.clear()
+            self._total = 0
+
+            # 清理下载中途留下的临时文件
+            for name in os.listdir(self.temp_dir):
+                if name.endswith(TEMP_SUFFIXES) or name.endswith(".mp3"):
+                    self._remove_file(os.path.join(self.temp_dir, name))
+
+            on_disk = {}
+            for entry in os.scandir(self.cache_dir):
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith(TEMP_SUFFIXES):
+                    self._remove_file(entry.path)
+                elif entry.name.endswith(".mp3"):
+                    on_disk[entry.name] = entry.stat()
+
+            dropped = 0
+            for song_id, entry in sorted(entries.items(), key=lambda item: item[1].get("last_access", 0)):
+                stat = on_disk.pop(entry.get("file"), None)
+                if stat is None or stat.st_size != entry.get("size"):
+                    dropped += 1
+                    continue
+                self._entries[song_id] = entry
+                self._total += entry["size"]
+
+            # 索引外的缓存文件（旧版本写入的）以修改时间作为最后访问时间收编，校验和留空
+            adopted = 0
+            for name, stat in on_disk.items():
+                song_id = name[:-len(".mp3")]
+                self._entries[song_id] = {
+                    "file": name,
+                    "size": stat.st_size,
+                    "duration": 0,
+                    "last_access": stat.st_mtime,
+                    "sha256": None,
+                }
+                self._total += stat.st_size
+                adopted += 1
+
+            # 统一按最后访问时间排列，淘汰从最久未用的开始
+            self._entries = OrderedDict(sorted(
+                self._entries.items(), key=lambda item: item[1].get("last_access", 0)))
+            self._evict()
+            self._save()
+            to_verify = [(song_id, entry) for song_id, entry in self._entries.items()
+                         if entry.get("sha256")]
+
+        # 校验和在后台核对，不拖慢启动，命中时也不再访问磁盘
+        if to_verify:
+            threading.Thread(target=self._verify_entries, args=(to_verify,), daemon=True,
+                             name="music-cache-verify").start()
+
+        logger.info(f"音乐缓存共 {len(self._entries)} 首 / {self._total} 字节"
+                    f"（丢弃 {dropped} 条失效索引，收编 {adopted} 个文件）")
+
+    def _evict(self):
+        """按 LRU 淘汰到容量以内（调用方需持有锁）"""
+        if self._total <= self.max_bytes:
+            return
+        for song_id in list(self._entries):
+            if self._total <= self.max_bytes:
+                break
+            if song_id in self._protected:
+                continue
+            entry = self._entries.pop(song_id)
+            self._total -= entry["size"]
+            self._remove_file(os.path.join(self.cache_dir, entry["file"]))
+            logger.info(f"淘汰音乐缓存: {song_id} ({entry['size']} 字节)")
+        self._dirty = True
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("entries", {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"读取音乐缓存索引失败，将重建: {str(e)}")
+            return {}
+
+    def _save(self):
+        """原子地写入索引（调用方需持有锁）"""
+        try:
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"entries": self._entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"保存音乐缓存索引失败: {str(e)}")
+
+    def _verify_entries(self, entries):
+        """后台核对缓存文件的 SHA-256，内容与索引不符的条目连同文件一起淘汰"""
+        dropped = 0
+        for song_id, entry in entries:
+            with self._lock:
+                # 已被替换、淘汰，或正在播放的歌曲不处理
+                if self._entries.get(song_id) is not entry or song_id in self._protected:
+                    continue
+            try:
+                ok = self._digest(os.path.join(self.cache_dir, entry["file"])) == (
+                    entry["size"], entry["sha256"])
+            except OSError:
+                ok = False
+            if not ok:
+                logger.warning(f"音乐缓存文件已损坏，淘汰: {song_id}")
+                self._drop(song_id, entry)
+                dropped += 1
+        if dropped:
+            logger.info(f"校验音乐缓存完成，淘汰 {dropped} 个损坏的文件")
+
+    @staticmethod
+    def _digest(path):
+        sha = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+                size += len(block)
+        return size, sha.hexdigest()
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"删除缓存文件失败: {path}: {str(e)}")
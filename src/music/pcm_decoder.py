@@ -0,0 +1,143 @@
+import shutil
+import subprocess
+import threading
+from collections import deque
+from typing import BinaryIO, Callable, Optional, Union
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 每次从 ffmpeg 读取的字节数（16位PCM，保持偶数）
+READ_CHUNK = 16384
+
+
+class PcmDecoder:
+    """用 ffmpeg 把 MP3 解码为 PCM，写入混音器的音乐音源
+
+    输入可以是文件路径（缓存命中，跳转时由 ffmpeg 直接定位），也可以是
+    下载中的 StreamReader（由送数线程写入 ffmpeg 的标准输入）。输出按
+    音源的缓冲上限做背压，解码只领先播放几秒。解码到末尾时调用
+    sink.finish()，被取消时不调用；ffmpeg 异常退出（例如文件无法打开）时
+    还会调用 on_error。
+    """
+
+    def __init__(self, source: Union[str, BinaryIO], sink, start: float = 0.0,
+                 on_error: Optional[Callable[[], None]] = None):
+        """
+        参数:
+            source: 文件路径或可读的二进制流
+            sink: 混音器音源（MixerSource）
+            start: 起始位置（秒）
+            on_error: 解码失败回调（在解码线程中调用）
+        """
+        self.source = source
+        self.sink = sink
+        self.start_position = start
+        self.on_error = on_error
+        self._process: Optional[subprocess.Popen] = None
+        self._cancelled = threading.Event()
+        self._errors = deque(maxlen=5)
+        # cancel() 返回后保证不会再写入音源（跳转时旧数据不会混进来）
+        self._write_lock = threading.Lock()
+
+    def start(self):
+        ffmpeg = shutil.which("ffmpeg")
+        if not ffmpeg:
+            raise FileNotFoundError("未找到 ffmpeg，无法解码音乐")
+
+        from_file = isinstance(self.source, str)
+        command = [ffmpeg, "-hide_banner", "-loglevel", "error"]
+        if from_file:
+            command.append("-nostdin")
+        if self.start_position > 0:
+            command += ["-ss", f"{self.start_position:.3f}"]
+        command += [
+            "-i", self.source if from_file else "pipe:0",
+            "-f", "s16le", "-acodec", "pcm_s16le",
+            "-ac", str(self.sink.channels), "-ar", str(self.sink.sample_rate),
+            "pipe:1"
+        ]
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL if from_file else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        if not from_file:
+            threading.Thread(target=self._feed, daemon=True, name="music-decode-feed").start()
+        threading.Thread(target=self._drain_errors, daemon=True, name="music-decode-err").start()
+        threading.Thread(target=self._pump, daemon=True, name="music-decode").start()
+        return self
+
+    def cancel(self):
+        with self._write_lock:
+            self._cancelled.set()
+        if self._process and self._process.poll() is None:
+            try:
+                self._process.kill()
+            except OSError:
+                pass
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _feed(self):
+        """把下载中的数据送入 ffmpeg"""
+        stdin = self._process.stdin
+        try:
+            while not self._cancelled.is_set():
+                data = self.source.read(READ_CHUNK * 4)
+                if not data:
+                    break
+                stdin.write(data)
+        except (OSError, ValueError):
+            # ffmpeg 已退出或读端已关闭
+            pass
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+    def _drain_errors(self):
+        """持续读取 ffmpeg 的错误输出，避免管道写满阻塞解码"""
+        with self._process.stderr as stderr:
+            for line in stderr:
+                self._errors.append(line.decode("utf-8", "replace").strip())
+
+    def _pump(self):
+        """读取 ffmpeg 输出的 PCM 写入音源"""
+        stdout = self._process.stdout
+        try:
+            while not self._cancelled.is_set():
+                data = stdout.read(READ_CHUNK)
+                if not data:
+                    break
+                while not self.sink.wait_writable(0.5):
+                    if self._cancelled.is_set():
+                        return
+                with self._write_lock:
+                    if self._cancelled.is_set():
+                        return
+                    self.sink.write(data)
+        except (OSError, ValueError) as e:
+            if not self._cancelled.is_set():
+                logger.error(f"读取解码输出失败: {e}")
+        finally:
+            returncode = self._process.wait()
+            failed = False
+            with self._write_lock:
+                if not self._cancelled.is_set():
+                    if returncode != 0:
+                        logger.error(f"音乐解码失败 ({returncode}): {' | '.join(self._errors)}")
+                        failed = True
+                    self.sink.finish()
+            stdout.close()
+            if failed and self.on_error:
+                try:
+                    self.on_error()
+                except Exception as e:
+                    logger.error(f"解码失败回调出错: {e}")
@@ -0,0 +1,82 @@
+import threading
+from typing import Dict, List, Optional
+
+
+class PlayQueue:
+    """播放队列
+
+    每个条目是一个字典，至少包含 "query"（搜索词）；搜索解析后补充 song_id、
+    display_name、duration 等字段。index 指向当前播放的条目，
+    最后一首播放完后越过队尾。
+    generation 在队列被替换或清空时递增，后台预取据此判断任务是否已过时。
+    """
+
+    def __init__(self):
+        self._items: List[Dict] = []
+        self._index = -1
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def replace(self, items: List[Dict]):
+        """用新的条目替换队列，从第一首开始"""
+        with self._lock:
+            self._items = list(items)
+            self._index = 0 if self._items else -1
+            self.generation += 1
+
+    def extend(self, items: List[Dict]):
+        with self._lock:
+            self._items.extend(items)
+            if self._index < 0 and self._items:
+                self._index = 0
+
+    def clear(self):
+        with self._lock:
+            self._items = []
+            self._index = -1
+            self.generation += 1
+
+    def current(self) -> Optional[Dict]:
+        with self._lock:
+            if 0 <= self._index < len(self._items):
+                return self._items[self._index]
+            return None
+
+    def advance(self) -> Optional[Dict]:
+        """移到下一首，没有下一首时返回 None 且位置不变"""
+        with self._lock:
+            if self._index + 1 >= len(self._items):
+                return None
+            self._index += 1
+            return self._items[self._index]
+
+    def finish(self):
+        """当前条目已播放完毕：游标移到下一个位置，可以越过队尾
+
+        越过队尾后 current() 返回 None，之后加入的条目成为新的当前条目。
+        """
+        with self._lock:
+            if 0 <= self._index < len(self._items):
+                self._index += 1
+
+    def back(self) -> Optional[Dict]:
+        """移到上一首，已在第一首时返回 None"""
+        with self._lock:
+            if self._index <= 0:
+                return None
+            self._index -= 1
+            return self._items[self._index]
+
+    def upcoming(self, count: int) -> List[Dict]:
+        """当前条目之后的 count 个条目"""
+        with self._lock:
+            start = self._index + 1
+            return self._items[start:start + count]
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [dict(item, current=(i == self._index)) for i, item in enumerate(self._items)]
@@ -0,0 +1,30 @@
+from typing import Callable
+
+
+class PlaybackClock:
+    """以混音器输出的采样数为准的播放位置
+
+    pos_ms 返回混音器已从音乐音源取走并写入输出流的时长，暂停时不前进，
+    因此不会像墙钟那样在暂停、TTS 打断后漂移。该读数是单调累加的，不感知
+    换歌和跳转，这里记录跳转时的基准位置和当时的读数，位置 = 基准 + 读数增量。
+    """
+
+    def __init__(self, pos_ms: Callable[[], int]):
+        self._pos_ms = pos_ms
+        self._base = 0.0
+        self._origin = 0
+        self._last = 0.0
+
+    def seek(self, position: float):
+        """开始播放或跳转后调用，以当前读数为新的起点"""
+        self._base = position
+        self._origin = max(0, self._pos_ms())
+        self._last = position
+
+    def position(self) -> float:
+        pos = self._pos_ms()
+        if pos < 0:
+            # 音乐音源尚未创建，返回最后一次读到的位置
+            return self._last
+        self._last = self._base + (pos - self._origin) / 1000.0
+        return self._last
@@ -0,0 +1,150 @@
+import ast
+import json
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from html import unescape
+from typing import Any, Dict, List, Optional
+
+# 评分权重：歌名、歌手、时长、接口原始排序
+TITLE_WEIGHT = 0.5
+ARTIST_WEIGHT = 0.25
+DURATION_WEIGHT = 0.1
+RANK_WEIGHT = 0.15
+# 查询词没有提到时降低现场版、伴奏、DJ 等版本的得分
+VARIANT_PENALTY = 0.3
+VARIANT_WORDS = ("live", "现场", "伴奏", "dj", "remix", "翻唱", "cover", "铃声",
+                 "片段", "纯音乐", "instrumental", "karaoke", "试听")
+# 时长短于此值（秒）的通常是片段或铃声
+FULL_TRACK_SECONDS = 90
+
+_BRACKETS = re.compile(r"[(（\[【<《].*?[)）\]】>》]")
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+_ARTIST_SEPARATORS = re.compile(r"[&＆、,，/;；]|\s+feat\.?\s+", re.IGNORECASE)
+
+
+def parse_search_response(text: str) -> List[Dict[str, Any]]:
+    """
+    解析酷我搜索接口的响应，返回 abslist 中的原始记录
+
+    接口声明返回 JSON，实际常是单引号的类 JSON 文本：先按 JSON 解析，
+    失败时按 Python 字面量解析，字符串中的引号和转义都能正确处理。
+    """
+    text = text.strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        try:
+            data = ast.literal_eval(text)
+        except (ValueError, SyntaxError) as e:
+            raise ValueError(f"无法解析搜索结果: {e}") from None
+    if not isinstance(data, dict):
+        raise ValueError("搜索结果格式不正确")
+    return [record for record in data.get("abslist") or [] if isinstance(record, dict)]
+
+
+def to_candidate(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """把一条原始记录转换为歌曲元数据，缺少歌曲ID时返回 None"""
+    song_id = str(record.get("DC_TARGETID") or "")
+    if not song_id:
+        song_id = str(record.get("MUSICRID") or "").replace("MUSIC_", "")
+    if not song_id:
+        return None
+
+    title = unescape(str(record.get("NAME") or record.get("SONGNAME") or "")).strip()
+    artist = unescape(str(record.get("ARTIST") or "")).strip()
+    album = unescape(str(record.get("ALBUM") or "")).strip()
+    try:
+        duration = int(record.get("DURATION") or 0)
+    except (TypeError, ValueError):
+        duration = 0
+
+    display_name = title
+    if artist:
+        display_name = f"{title} - {artist}"
+        if album:
+            display_name += f" ({album})"
+
+    return {
+        "song_id": song_id,
+        "title": title,
+        "artist": artist,
+        "album": album,
+        "duration": duration,
+        "display_name": display_name,
+    }
+
+
+def normalize(text: str, strip_brackets: bool = False) -> str:
+    """统一全半角和大小写，去掉空白和标点，用于比较"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    if strip_brackets:
+        text = _BRACKETS.sub("", text)
+    return _NON_WORD.sub("", text)
+
+
+def split_artists(artist: str) -> List[str]:
+    return [name for name in (normalize(part) for part in _ARTIST_SEPARATORS.split(artist)) if name]
+
+
+def score_candidate(candidate: Dict[str, Any], query: str, rank: int, total: int,
+                    duration: Optional[float] = None) -> float:
+    """
+    计算候选歌曲与查询词的匹配得分（0~1 左右）
+
+    参数:
+        candidate: to_candidate() 返回的元数据
+        query: 用户的查询词，可能同时包含歌名和歌手
+        rank: 在接口结果中的位置
+        total: 接口结果总数
+        duration: 期望的时长（秒），未知时偏好完整长度的歌曲
+    """
+    remaining = normalize(query)
+
+    # 查询词中出现的歌手名先移除，剩下的部分与歌名比较
+    artist_score = 0.0
+    for name in split_artists(candidate["artist"]):
+        if name in remaining:
+            artist_score = 1.0
+            remaining = remaining.replace(name, "")
+
+    title = normalize(candidate["title"], strip_brackets=True)
+    if not remaining:
+        title_score = 0.5
+    else:
+        title_score = SequenceMatcher(None, title, remaining).ratio()
+        if title and title in remaining:
+            title_score = max(title_score, 0.9)
+
+    length = candidate["duration"]
+    if duration:
+        duration_score = max(0.0, 1 - abs(length - duration) / 30)
+    elif length <= 0:
+        duration_score = 0.5
+    else:
+        duration_score = min(1.0, length / FULL_TRACK_SECONDS)
+
+    rank_score = 1 - rank / max(total, 1)
+
+    score = (TITLE_WEIGHT * title_score + ARTIST_WEIGHT * artist_score
+             + DURATION_WEIGHT * duration_score + RANK_WEIGHT * rank_score)
+
+    raw_query = query.lower()
+    variant_text = f"{candidate['title']} {candidate['album']}".lower()
+    if any(word in variant_text and word not in raw_query for word in VARIANT_WORDS):
+        score -= VARIANT_PENALTY
+    return score
+
+
+def rank_candidates(text: str, query: str, limit: int = 10,
+                    duration: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    解析搜索响应并按匹配得分排序，返回最多 limit 个候选（每个带 score 字段）
+    """
+    records = parse_search_response(text)
+    candidates = [candidate for candidate in map(to_candidate, records) if candidate]
+    total = len(candidates)
+    for rank, candidate in enumerate(candidates):
+        candidate["score"] = round(score_candidate(candidate, query, rank, total, duration), 3)
+    candidates.sort(key=lambda candidate: candidate["score"], reverse=True)
+    return candidates[:limit]
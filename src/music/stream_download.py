@@ -0,0 +1,167 @@
+import io
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+import requests
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class StreamingDownload:
+    """边下边播的后台下载
+
+    后台线程把 HTTP 响应顺序写入 part 文件，open_reader() 返回的读端可以在
+    下载过程中读取已写入的部分，读到尚未下载的位置时阻塞等待。播放器在缓冲到
+    几百 KB 后即可开始解码，剩余部分在后台继续写完。
+
+    下载完成后回调 on_complete(part_path, ok)，由调用方决定把文件提交到缓存还是删除。
+    """
+
+    def __init__(self, url: str, part_path: str, headers: Optional[Dict] = None,
+                 chunk_size: int = 32768, timeout: float = 30,
+                 on_complete: Optional[Callable[[str, bool], None]] = None):
+        self.url = url
+        self.part_path = part_path
+        self.headers = headers or {}
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.on_complete = on_complete
+
+        self.total_size = 0  # 0 表示服务器未提供 content-length
+        self.downloaded = 0
+        self.done = False
+        self.ok = False
+        self.error = None
+
+        self._cond = threading.Condition()
+        self._cancelled = False
+        self._thread = None
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.part_path), exist_ok=True)
+        # 先创建空文件，读端可以立即打开
+        open(self.part_path, "wb").close()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="music-download")
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """中止下载，阻塞中的读端会收到 EOF"""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def wait_ready(self, min_bytes: int, timeout: float) -> bool:
+        """等待至少 min_bytes 字节可读（或下载已结束），返回是否有可播放的数据"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self.done or self._cancelled or self.downloaded >= min_bytes,
+                timeout)
+            if self.done:
+                return self.ok
+            return self.downloaded >= min_bytes and not self._cancelled
+
+    def wait_for(self, offset: int) -> int:
+        """等待 offset 之前的数据写入，返回当前已下载字节数（读端调用）"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self.done or self._cancelled or self.downloaded >= offset)
+            return self.downloaded
+
+    def expected_size(self) -> int:
+        """文件最终大小，未知时等待下载结束"""
+        if self.total_size:
+            return self.total_size
+        return self.wait_for(float("inf"))
+
+    def open_reader(self) -> "StreamReader":
+        return StreamReader(self)
+
+    def _run(self):
+        try:
+            with requests.get(self.url, stream=True, headers=self.headers,
+                              timeout=self.timeout) as response:
+                response.raise_for_status()
+                self.total_size = int(response.headers.get("content-length", 0))
+                with open(self.part_path, "ab") as f:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if self._cancelled:
+                            logger.info("音乐下载被中止")
+                            break
+                        if not chunk:
+                            continue
+                        f.write(chunk)
+                        f.flush()
+                        with self._cond:
+                            self.downloaded += len(chunk)
+                            self._cond.notify_all()
+            self.ok = not self._cancelled and (
+                not self.total_size or self.downloaded == self.total_size)
+            if not self.ok and not self._cancelled:
+                logger.warning(f"音乐文件下载不完整: {self.downloaded}/{self.total_size}")
+        except Exception as e:
+            self.error = e
+            logger.error(f"下载音乐文件失败: {e}")
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+        if self.on_complete:
+            try:
+                self.on_complete(self.part_path, self.ok)
+            except Exception as e:
+                logger.error(f"处理下载完成回调失败: {e}")
+
+
+class StreamReader(io.RawIOBase):
+    """读取下载中的 part 文件，未下载到的位置阻塞等待，可直接交给解码器"""
+
+    def __init__(self, download: StreamingDownload):
+        super().__init__()
+        self._download = download
+        self._file = open(download.part_path, "rb")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = len(buffer)
+        if size == 0:
+            return 0
+        available = self._download.wait_for(self._pos + size)
+        size = min(size, available - self._pos)
+        if size <= 0:
+            return 0
+        self._file.seek(self._pos)
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._download.expected_size() + offset
+        else:
+            raise ValueError(f"无效的 whence: {whence}")
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
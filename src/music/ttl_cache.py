@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+
+class TtlCache:
+    """带过期时间的键值缓存，内存 LRU + 可选的 JSON 文件持久化
+
+    值必须可以被 JSON 序列化。每个条目有自己的过期时间，读取时过期的条目
+    视为不存在；超过 max_entries 时淘汰最久未使用的条目。指定 path 时
+    启动加载未过期的条目；写入只标记变更，flush_delay 秒后由后台定时器把这段
+    时间内的所有变更一次性原子地保存，序列化和写文件都不持有缓存锁。
+    需要立即落盘时（例如停止播放）调用 flush()。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 500,
+                 flush_delay: float = 5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_delay = flush_delay
+        self._entries: "OrderedDict[str, list]" = OrderedDict()  # key -> [expires_at, value]
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer = None
+        self._load()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = [time.time() + ttl, value]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._mark_dirty()
+
+    def delete(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._mark_dirty()
+
+    def flush(self):
+        """立即保存尚未写入文件的变更"""
+        if not self.path:
+            return
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                # 条目的值只会被整体替换，浅拷贝即可得到一致的快照
+                snapshot = dict(self._entries)
+                self._dirty = False
+            self._save(snapshot)
+
+    def _mark_dirty(self):
+        """记录有未保存的变更并安排一次延迟保存（调用方需持有锁）"""
+        if not self.path:
+            return
+        self._dirty = True
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self._delayed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _delayed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+        self.flush()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"读取缓存文件 {self.path} 失败: {str(e)}")
+            return
+        now = time.time()
+        for key, entry in data.items():
+            if entry[0] > now:
+                self._entries[key] = entry
+
+    def _save(self, snapshot):
+        """原子地写入缓存文件（调用方需持有 _write_lock）"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"保存缓存文件 {self.path} 失败: {str(e)}")
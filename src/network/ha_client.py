@@ -0,0 +1,255 @@
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_HA_URL = "http://123.60.32.150:8123"
+
+
+def _updated_at(state):
+    """状态对象的 last_updated 时间，缺失或无法解析时返回 None"""
+    if not state:
+        return None
+    try:
+        return datetime.fromisoformat(state["last_updated"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class HomeAssistantClient:
+    """Home Assistant REST API 客户端 - 单例模式
+
+    所有 HA 设备和 GUI 共用一个 requests.Session（keep-alive 连接池），
+    避免每次请求都重新建立 TCP/TLS 连接。实体状态通过一次 GET /api/states
+    批量拉取并缓存，STATE_TTL 内的重复查询直接读缓存；多个线程同时刷新时
+    只有一个真正发出请求，其余等待并复用结果。
+
+    开启 WebSocket 推送（HomeAssistantEventStream）后，缓存由 state_changed
+    事件实时更新，推送在线期间查询不再发请求。实体状态变化时通知通过
+    add_listener 注册的回调。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """获取单例实例"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        config = ConfigManager.get_instance()
+        self.url = None
+        self.token = None
+        self.timeout = config.get_config("HOME_ASSISTANT.TIMEOUT", 5)
+        self.state_ttl = config.get_config("HOME_ASSISTANT.STATE_TTL", 2.0)
+
+        pool_size = config.get_config("HOME_ASSISTANT.POOL_SIZE", 10)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._states = {}
+        self._states_time = 0.0
+        self._refresh_lock = threading.Lock()
+        self._states_lock = threading.Lock()
+        self._listeners = {}
+        self._push_active = False
+        self._stream_lock = threading.RLock()
+        self.event_stream = None
+        self.use_websocket = config.get_config("HOME_ASSISTANT.WEBSOCKET", True)
+
+        self.configure(
+            config.get_config("HOME_ASSISTANT.URL", DEFAULT_HA_URL),
+            config.get_config("HOME_ASSISTANT.TOKEN", "")
+        )
+
+    def configure(self, url, token):
+        """更新连接信息（GUI 中修改配置后调用），地址或令牌变化时清空状态缓存"""
+        url = (url or "").rstrip("/")
+        if url == self.url and token == self.token:
+            return
+        self.url = url
+        self.token = token
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        })
+        self.invalidate()
+
+        # 推送连接使用旧的地址和令牌，需要重建
+        with self._stream_lock:
+            if self.event_stream:
+                self.event_stream.stop()
+                self.event_stream = None
+                self.start_event_stream()
+
+    def start_event_stream(self):
+        """启动 WebSocket 状态推送（HOME_ASSISTANT.WEBSOCKET 为 False 时不启动，可重复调用）"""
+        with self._stream_lock:
+            if not self.use_websocket or self.event_stream or not self.url:
+                return
+            from src.network.ha_websocket import HomeAssistantEventStream
+            self.event_stream = HomeAssistantEventStream(self)
+            self.event_stream.start()
+
+    def close(self):
+        with self._stream_lock:
+            if self.event_stream:
+                self.event_stream.stop()
+                self.event_stream = None
+        self.session.close()
+
+    def set_push_active(self, active):
+        """由推送连接调用：在线期间缓存视为最新"""
+        self._push_active = active
+
+    def add_listener(self, entity_id, callback):
+        """注册实体状态变化回调 callback(state)，state 为 None 表示实体已被移除"""
+        with self._states_lock:
+            self._listeners.setdefault(entity_id, []).append(callback)
+
+    def remove_listener(self, entity_id, callback):
+        with self._states_lock:
+            callbacks = self._listeners.get(entity_id, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def apply_state(self, entity_id, state):
+        """
+        写入单个实体的新状态（来自推送事件）并通知监听者
+
+        重连后的全量同步期间到达的事件会在同步完成后才处理，其中的状态可能比
+        同步拿到的更旧：last_updated 不晚于缓存中的状态时丢弃该事件。
+
+        返回:
+            bool: 是否写入
+        """
+        with self._states_lock:
+            if state is None:
+                self._states.pop(entity_id, None)
+            else:
+                current = self._states.get(entity_id)
+                new_time, current_time = _updated_at(state), _updated_at(current)
+                if new_time and current_time and new_time <= current_time:
+                    return False
+                self._states[entity_id] = state
+        self._notify({entity_id: state})
+        return True
+
+    def _notify(self, changed):
+        with self._states_lock:
+            targets = [(callback, state) for entity_id, state in changed.items()
+                       for callback in self._listeners.get(entity_id, ())]
+        for callback, state in targets:
+            try:
+                callback(state)
+            except Exception as e:
+                logger.error(f"HA状态回调出错: {e}")
+
+    def invalidate(self):
+        """使状态缓存失效，下次查询会重新拉取"""
+        with self._states_lock:
+            self._states_time = 0.0
+
+    def refresh_states(self, max_age=None):
+        """
+        批量刷新所有实体状态
+
+        参数:
+            max_age: 缓存允许的最大时长（秒），默认使用 STATE_TTL，0 表示强制刷新
+
+        返回:
+            dict: entity_id -> 状态对象，请求失败时返回旧缓存
+        """
+        if max_age is None:
+            max_age = self.state_ttl
+
+        requested_at = time.monotonic()
+        with self._refresh_lock:
+            # 等锁期间别的线程可能已经刷新过；推送在线时缓存始终最新
+            with self._states_lock:
+                fresh = (self._states_time >= requested_at or
+                         (max_age > 0 and (self._push_active or
+                                           time.monotonic() - self._states_time < max_age)))
+                if fresh:
+                    return dict(self._states)
+
+            changed = {}
+            try:
+                response = self.session.get(f"{self.url}/api/states", timeout=self.timeout)
+                if response.status_code != 200:
+                    logger.error(f"批量获取HA状态失败, 状态码: {response.status_code}, "
+                                 f"响应: {response.text}")
+                else:
+                    states = {item["entity_id"]: item for item in response.json()
+                              if "entity_id" in item}
+                    with self._states_lock:
+                        changed = {entity_id: state for entity_id, state in states.items()
+                                   if self._states.get(entity_id) != state}
+                        self._states = states
+                        self._states_time = time.monotonic()
+                    logger.debug(f"已批量刷新 {len(states)} 个HA实体状态")
+            except Exception as e:
+                logger.error(f"批量获取HA状态出错: {e}")
+
+            if changed:
+                self._notify(changed)
+            with self._states_lock:
+                return dict(self._states)
+
+    def get_state(self, entity_id, max_age=None):
+        """获取单个实体的状态对象，不存在时返回 None"""
+        return self.refresh_states(max_age).get(entity_id)
+
+    def get_cached_state(self, entity_id):
+        """只读缓存，不发请求"""
+        with self._states_lock:
+            return self._states.get(entity_id)
+
+    def call_service(self, domain, action, payload):
+        """
+        调用HA服务
+
+        返回:
+            (bool, str, dict): 是否成功、错误信息、执行期间发生变化的实体状态
+            （entity_id -> 状态对象，同时写入缓存）
+        """
+        try:
+            response = self.session.post(
+                f"{self.url}/api/services/{domain}/{action}",
+                json=payload, timeout=self.timeout
+            )
+        except Exception as e:
+            return False, str(e), {}
+
+        if response.status_code not in (200, 201):
+            logger.error(f"调用HA服务 {domain}.{action} 失败, 状态码: {response.status_code}, "
+                         f"响应: {response.text}")
+            return False, f"HTTP状态码: {response.status_code}", {}
+
+        # 服务接口返回执行期间发生变化的实体状态列表
+        try:
+            changed = response.json()
+        except ValueError:
+            changed = []
+        if not isinstance(changed, list):
+            changed = []
+        changed = {item["entity_id"]: item for item in changed
+                   if isinstance(item, dict) and "entity_id" in item}
+        with self._states_lock:
+            self._states.update(changed)
+        self._notify(changed)
+        return True, "", changed
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+
+import websockets
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class HomeAssistantEventStream:
+    """Home Assistant WebSocket 状态推送
+
+    连接 /api/websocket 并订阅 state_changed 事件，把新状态写入
+    HomeAssistantClient 的状态缓存。推送在线期间缓存视为始终最新，
+    设备属性读取和状态查询不再产生任何轮询请求。断线后按指数退避重连，
+    每次重连都先批量拉取一次状态，补上断线期间错过的变化。
+    """
+
+    def __init__(self, client, max_backoff=60):
+        """
+        参数:
+            client: HomeAssistantClient 实例（提供地址、令牌和状态缓存）
+            max_backoff: 重连最大间隔（秒）
+        """
+        self.client = client
+        self.max_backoff = max_backoff
+        self.connected = False
+        self._running = False
+        self._loop = None
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        """在后台线程中启动推送连接"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True,
+                                        name="ha-websocket")
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._loop and self._task:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._run())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def _websocket_url(self):
+        url = self.client.url
+        if url.startswith("https://"):
+            url = "wss://" + url[len("https://"):]
+        elif url.startswith("http://"):
+            url = "ws://" + url[len("http://"):]
+        return f"{url}/api/websocket"
+
+    async def _run(self):
+        backoff = 1
+        while self._running:
+            try:
+                await self._session()
+                backoff = 1
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if self.connected or backoff == 1:
+                    logger.warning(f"Home Assistant 状态推送连接断开: {e}")
+                else:
+                    logger.debug(f"Home Assistant 状态推送重连失败: {e}")
+            finally:
+                if self.connected:
+                    self.connected = False
+                    self.client.set_push_active(False)
+
+            if self._running:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _session(self):
+        async with websockets.connect(self._websocket_url(), max_size=None) as websocket:
+            message = json.loads(await websocket.recv())
+            if message.get("type") == "auth_required":
+                await websocket.send(json.dumps({
+                    "type": "auth",
+                    "access_token": self.client.token
+                }))
+                message = json.loads(await websocket.recv())
+            if message.get("type") != "auth_ok":
+                raise RuntimeError(f"认证失败: {message.get('message', message.get('type'))}")
+
+            await websocket.send(json.dumps({
+                "id": 1,
+                "type": "subscribe_events",
+                "event_type": "state_changed"
+            }))
+
+            # 订阅后再全量同步一次，保证不漏掉订阅前的变化；同步期间缓冲的事件
+            # 随后按 last_updated 过滤，不会用旧状态覆盖同步结果
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.client.refresh_states, 0)
+            self.connected = True
+            self.client.set_push_active(True)
+            logger.info("Home Assistant 状态推送已连接")
+
+            async for raw in websocket:
+                message = json.loads(raw)
+                msg_type = message.get("type")
+                if msg_type == "event":
+                    data = message.get("event", {}).get("data", {})
+                    entity_id = data.get("entity_id")
+                    if entity_id:
+                        self.client.apply_state(entity_id, data.get("new_state"))
+                elif msg_type == "result" and not message.get("success", True):
+                    raise RuntimeError(f"订阅 state_changed 失败: {message.get('error')}")
@@ -0,0 +1,252 @@
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from paho.mqtt.client import topic_matches_sub
+
+from src.network.mqtt_client import MqttClient
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 主题 -> 回调列表 的路由缓存上限，超过后整体清空
+_ROUTE_CACHE_SIZE = 1024
+
+
+class MqttConnection:
+    """到单个 MQTT broker 的共享连接
+
+    同一 broker 上的所有订阅者共用一个 MqttClient（一个 TCP 连接、一个 paho
+    网络线程）。订阅按主题过滤器（支持 + / # 通配符）登记，收到消息时按主题
+    匹配分发给回调，主题到回调的匹配结果会缓存。连接断开重连后自动重新订阅。
+
+    回调在 paho 网络线程中执行，签名为 callback(msg)，应尽快返回。
+    """
+
+    def __init__(self, hub, server, port, username=None, password=None):
+        self.hub = hub
+        self.server = server
+        self.port = port
+        self.connected = False
+
+        self._subs: Dict[str, List[Callable]] = {}  # 主题过滤器 -> 回调
+        self._qos: Dict[str, int] = {}
+        self._routes: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+        self._outbox = deque(maxlen=hub.max_pending)
+
+        self.mqtt = MqttClient(
+            server=server,
+            port=port,
+            username=username,
+            password=password,
+            subscribe_topic=None,
+            client_id=f"xiaozhi-hub-{uuid.uuid4().hex[:12]}",
+            on_connect=self._on_connect,
+            on_message=self._on_message,
+            on_publish=lambda *args: None,
+            on_disconnect=self._on_disconnect,
+        )
+        self.mqtt.connect()
+        self.mqtt.start()
+
+    def subscribe(self, topic_filter: str, callback: Callable, qos: int = 0):
+        """登记订阅，同一过滤器只向 broker 订阅一次"""
+        with self._lock:
+            callbacks = self._subs.setdefault(topic_filter, [])
+            first = not callbacks
+            callbacks.append(callback)
+            self._qos[topic_filter] = max(qos, self._qos.get(topic_filter, 0))
+            self._routes.clear()
+            if first and self.connected:
+                self.mqtt.client.subscribe(topic_filter, self._qos[topic_filter])
+
+    def unsubscribe(self, topic_filter: str, callback: Callable):
+        """取消订阅，过滤器上没有回调时向 broker 退订"""
+        with self._lock:
+            callbacks = self._subs.get(topic_filter)
+            if not callbacks or callback not in callbacks:
+                return
+            callbacks.remove(callback)
+            self._routes.clear()
+            if not callbacks:
+                del self._subs[topic_filter]
+                self._qos.pop(topic_filter, None)
+                if self.connected:
+                    self.mqtt.client.unsubscribe(topic_filter)
+
+    def publish(self, topic: str, payload, qos: int = 0, retain: bool = False,
+                key: Optional[str] = None):
+        """
+        排队发布消息，由 MqttHub 按批次发送
+
+        Args:
+            key: 合并键，同一批次内 key 相同的消息只发送最后一条
+        """
+        with self._lock:
+            self._outbox.append((topic, payload, qos, retain, key))
+        self.hub._notify()
+
+    def has_pending(self) -> bool:
+        return self.connected and bool(self._outbox)
+
+    def flush(self) -> int:
+        """发送排队的消息，返回实际发送条数（由 MqttHub 的发送线程调用）"""
+        with self._lock:
+            if not self.connected or not self._outbox:
+                return 0
+            batch = list(self._outbox)
+            self._outbox.clear()
+
+        # 同一 key 只保留最后一条，其余消息保持原有顺序
+        latest = {}
+        for index, message in enumerate(batch):
+            if message[4] is not None:
+                latest[message[4]] = index
+        sent = 0
+        for index, (topic, payload, qos, retain, key) in enumerate(batch):
+            if key is not None and latest[key] != index:
+                continue
+            result = self.mqtt.client.publish(topic, payload, qos=qos, retain=retain)
+            if result.rc != 0:
+                logger.warning(f"MQTT 发布到 {topic} 失败，错误码: {result.rc}")
+            sent += 1
+        return sent
+
+    def _match(self, topic):
+        with self._lock:
+            callbacks = self._routes.get(topic)
+            if callbacks is None:
+                callbacks = tuple(
+                    callback
+                    for topic_filter, subscribed in self._subs.items()
+                    if topic_matches_sub(topic_filter, topic)
+                    for callback in subscribed
+                )
+                if len(self._routes) >= _ROUTE_CACHE_SIZE:
+                    self._routes.clear()
+                self._routes[topic] = callbacks
+            return callbacks
+
+    def _on_message(self, client, userdata, msg):
+        for callback in self._match(msg.topic):
+            try:
+                callback(msg)
+            except Exception as e:
+                logger.error(f"处理 MQTT 消息 {msg.topic} 时出错: {e}", exc_info=True)
+
+    def _on_connect(self, client, userdata, flags, rc, properties=None):
+        if rc != 0:
+            logger.error(f"连接 MQTT 服务器 {self.server}:{self.port} 失败，错误码: {rc}")
+            return
+        logger.info(f"已连接 MQTT 服务器 {self.server}:{self.port}")
+        with self._lock:
+            self.connected = True
+            # 一次 SUBSCRIBE 恢复全部订阅
+            topics = [(topic_filter, self._qos[topic_filter]) for topic_filter in self._subs]
+            if topics:
+                client.subscribe(topics)
+        # 断线期间排队的消息
+        self.hub._notify()
+
+    def _on_disconnect(self, client, userdata, rc, properties=None):
+        self.connected = False
+        logger.warning(f"与 MQTT 服务器 {self.server}:{self.port} 的连接已断开")
+
+    def close(self):
+        self.connected = False
+        self.mqtt.stop()
+
+
+class MqttHub:
+    """进程内共享的 MQTT 连接管理 - 单例模式
+
+    每个 broker（地址、端口、用户名）只建立一个 MqttConnection，传感器类 Thing
+    通过 connection() 取得连接后登记各自的主题订阅，不再各自创建客户端和网络线程。
+
+    所有连接的出站消息由一个发送线程批量发送：第一条消息到达后等待
+    MQTT_HUB.BATCH_WINDOW 秒收集同批消息再统一发出，断线期间的消息保留到重连后
+    （每个连接最多 MQTT_HUB.MAX_PENDING 条）。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """获取单例实例"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, batch_window=None, max_pending=None):
+        config = ConfigManager.get_instance()
+        self.batch_window = batch_window if batch_window is not None else config.get_config(
+            "MQTT_HUB.BATCH_WINDOW", 0.05)
+        self.max_pending = max_pending if max_pending is not None else config.get_config(
+            "MQTT_HUB.MAX_PENDING", 1000)
+
+        self._connections: Dict[tuple, MqttConnection] = {}
+        self._connections_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._signaled = False
+        self._running = True
+        self._sender = None
+
+    def connection(self, server, port=1883, username=None, password=None) -> MqttConnection:
+        """获取（必要时创建）到指定 broker 的共享连接"""
+        key = (server, int(port), username)
+        with self._connections_lock:
+            conn = self._connections.get(key)
+            if conn is None:
+                conn = MqttConnection(self, server, int(port), username, password)
+                self._connections[key] = conn
+            return conn
+
+    def _notify(self):
+        with self._cond:
+            if self._sender is None and self._running:
+                self._sender = threading.Thread(target=self._send_loop, daemon=True, name="mqtt-hub-sender")
+                self._sender.start()
+            self._signaled = True
+            self._cond.notify()
+
+    def _send_loop(self):
+        while True:
+            with self._cond:
+                while not self._signaled and self._running:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                self._signaled = False
+
+            # 收集同一批次的消息
+            time.sleep(self.batch_window)
+
+            with self._connections_lock:
+                connections = list(self._connections.values())
+            for conn in connections:
+                if conn.has_pending():
+                    try:
+                        conn.flush()
+                    except Exception as e:
+                        logger.error(f"批量发送 MQTT 消息失败: {e}")
+
+    def close(self):
+        """停止发送线程并断开所有连接"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.warning(f"关闭 MQTT 连接失败: {e}")
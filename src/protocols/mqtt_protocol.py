@@ -18,9 +18,15 @@ logger = get_logger(__name__)
 
 
 class MqttProtocol(Protocol):
-    def __init__(self, loop):
+    def __init__(self, loop, mqtt_info=None):
+        """
+        参数:
+            loop: 事件循环
+            mqtt_info: 覆盖配置中的MQTT连接信息（多会话无界面模式使用）
+        """
         super().__init__()
         self.loop = loop
+        self.mqtt_info = mqtt_info
         self.config = ConfigManager.get_instance()  # 在这里实例化
         self.mqtt_client = None
         self.udp_socket = None
@@ -29,6 +35,8 @@ class MqttProtocol(Protocol):
 
         # MQTT配置
         self.endpoint = None
+        self.port = 8883
+        self.use_tls = True
         self.client_id = None
         self.username = None
         self.password = None
@@ -54,7 +62,7 @@ class MqttProtocol(Protocol):
         # 首先尝试获取MQTT配置
         try:
             # 尝试从OTA服务器获取MQTT配置
-            mqtt_config = self.config.get_config("SYSTEM_OPTIONS.NETWORK.MQTT_INFO")
+            mqtt_config = self.mqtt_info or self.config.get_config("SYSTEM_OPTIONS.NETWORK.MQTT_INFO")
 
             print(mqtt_config)
 
@@ -66,6 +74,10 @@ class MqttProtocol(Protocol):
             self.publish_topic = mqtt_config.get("publish_topic")
             self.subscribe_topic = mqtt_config.get("subscribe_topic")
 
+            # endpoint 可带端口（host:port），默认使用 8883 + TLS
+            self.endpoint, self.port = self._parse_endpoint(self.endpoint)
+            self.use_tls = mqtt_config.get("tls", self.port == 8883)
+
             logger.info(f"已从OTA服务器获取MQTT配置: {self.endpoint}")
         except Exception as e:
             logger.warning(f"从OTA服务器获取MQTT配置失败: {e}")
@@ -92,16 +104,17 @@ class MqttProtocol(Protocol):
         self.mqtt_client.username_pw_set(self.username, self.password)
 
         # 配置TLS加密连接
-        try:
-            self.mqtt_client.tls_set(
-                ca_certs=None,
-                certfile=None,
-                keyfile=None,
-                cert_reqs=mqtt.ssl.CERT_REQUIRED,
-                tls_version=mqtt.ssl.PROTOCOL_TLS
-            )
-        except Exception as e:
-            logger.warning(f"TLS配置失败: {e}，尝试不使用TLS连接")
+        if self.use_tls:
+            try:
+                self.mqtt_client.tls_set(
+                    ca_certs=None,
+                    certfile=None,
+                    keyfile=None,
+                    cert_reqs=mqtt.ssl.CERT_REQUIRED,
+                    tls_version=mqtt.ssl.PROTOCOL_TLS
+                )
+            except Exception as e:
+                logger.warning(f"TLS配置失败: {e}，尝试不使用TLS连接")
 
         # 创建连接Future
         connect_future = self.loop.create_future()
@@ -154,8 +167,8 @@ class MqttProtocol(Protocol):
 
         try:
             # 连接MQTT服务器
-            logger.info(f"正在连接MQTT服务器: {self.endpoint}")
-            self.mqtt_client.connect_async(self.endpoint, 8883, 90)
+            logger.info(f"正在连接MQTT服务器: {self.endpoint}:{self.port}")
+            self.mqtt_client.connect_async(self.endpoint, self.port, 90)
             self.mqtt_client.loop_start()
 
             # 等待连接完成
@@ -218,6 +231,14 @@ class MqttProtocol(Protocol):
                 await self.on_network_error(f"连接MQTT服务器失败: {e}")
             return False
 
+    @staticmethod
+    def _parse_endpoint(endpoint):
+        """解析 host:port 形式的地址，未指定端口时使用 8883"""
+        host, sep, port = endpoint.rpartition(":")
+        if sep and port.isdigit():
+            return host, int(port)
+        return endpoint, 8883
+
     def _handle_mqtt_message(self, payload):
         """处理MQTT消息"""
         try:
@@ -240,8 +261,9 @@ class MqttProtocol(Protocol):
                     logger.error(f"不支持的传输方式: {transport}")
                     return
 
-                # 获取会话ID
+                # 获取会话ID，新的服务器会话需要重新发送IoT描述
                 self.session_id = data.get("session_id", "")
+                self.sent_descriptors_hash = None
 
                 # 获取UDP配置
                 udp = data.get("udp")
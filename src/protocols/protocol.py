@@ -12,6 +12,8 @@ class Protocol:
         self.on_audio_channel_opened = None
         self.on_audio_channel_closed = None
         self.on_network_error = None
+        # 本次服务器会话已发送的IoT描述哈希，新会话（收到服务器hello）时清空
+        self.sent_descriptors_hash = None
 
     def on_incoming_json(self, callback):
         """设置JSON消息接收回调函数"""
@@ -81,14 +83,40 @@ class Protocol:
         }
         await self.send_text(json.dumps(message))
 
-    async def send_iot_descriptors(self, descriptors):
-        """发送物联网设备描述信息"""
+    async def send_iot_descriptors(self, descriptors, descriptors_hash=None):
+        """发送物联网设备描述信息
+
+        参数:
+            descriptors: 描述JSON字符串（直接拼入消息，不再解析和重新序列化）或对象
+            descriptors_hash: 描述内容哈希，与本次会话已发送的相同时跳过发送
+
+        返回:
+            bool: 是否实际发送
+        """
+        if descriptors_hash and descriptors_hash == self.sent_descriptors_hash:
+            return False
+        if isinstance(descriptors, str):
+            message = (f'{{"session_id": {json.dumps(self.session_id)}, '
+                       f'"type": "iot", "descriptors": {descriptors}}}')
+        else:
+            message = json.dumps({
+                "session_id": self.session_id,
+                "type": "iot",
+                "descriptors": descriptors
+            })
+        await self.send_text(message)
+        self.sent_descriptors_hash = descriptors_hash
+        return True
+
+    async def send_iot_results(self, results):
+        """在一条 iot 消息中回传一批命令的执行结果（与命令顺序一致）"""
         message = {
             "session_id": self.session_id,
             "type": "iot",
-            "descriptors": json.loads(descriptors) if isinstance(descriptors, str) else descriptors
+            "results": results
         }
-        await self.send_text(json.dumps(message))
+        # 设备方法的返回值不一定都能序列化，无法序列化的转为字符串
+        await self.send_text(json.dumps(message, default=str))
 
     async def send_iot_states(self, states):
         """发送物联网设备状态信息"""
@@ -12,19 +12,23 @@ logger = get_logger(__name__)
 
 
 class WebsocketProtocol(Protocol):
-    def __init__(self):
+    def __init__(self, url=None, device_id=None, client_id=None):
+        """
+        参数:
+            url/device_id/client_id: 覆盖配置中的连接地址和设备身份（多会话无界面模式使用）
+        """
         super().__init__()
         # 获取配置管理器实例
         self.config = ConfigManager.get_instance()
         self.websocket = None
         self.connected = False
         self.hello_received = None  # 初始化时先设为 None
-        self.WEBSOCKET_URL = self.config.get_config("SYSTEM_OPTIONS.NETWORK.WEBSOCKET_URL")
+        self.WEBSOCKET_URL = url or self.config.get_config("SYSTEM_OPTIONS.NETWORK.WEBSOCKET_URL")
         self.HEADERS = {
             "Authorization": f"Bearer {self.config.get_config('SYSTEM_OPTIONS.NETWORK.WEBSOCKET_ACCESS_TOKEN')}",
             "Protocol-Version": "1",
-            "Device-Id": self.config.get_config("SYSTEM_OPTIONS.DEVICE_ID"),  # 获取设备MAC地址
-            "Client-Id": self.config.get_config("SYSTEM_OPTIONS.CLIENT_ID")
+            "Device-Id": device_id or self.config.get_config("SYSTEM_OPTIONS.DEVICE_ID"),  # 获取设备MAC地址
+            "Client-Id": client_id or self.config.get_config("SYSTEM_OPTIONS.CLIENT_ID")
         }
 
     async def connect(self) -> bool:
@@ -163,6 +167,9 @@ class WebsocketProtocol(Protocol):
                 return
             print("服务链接返回初始化配置", data)
 
+            # 新的服务器会话，之前发送的IoT描述不再有效
+            self.sent_descriptors_hash = None
+
             # 设置 hello 接收事件
             self.hello_received.set()
 
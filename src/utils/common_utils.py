@@ -163,8 +163,8 @@ def play_audio_nonblocking(text: str) -> None:
 
             # 导入必要的库
             import opuslib
-            import pyaudio
             import numpy as np
+            from src.audio_backends.audio_backend import get_audio_backend
             from src.constants.constants import AudioConfig
 
             async def generate_and_play():
@@ -176,15 +176,12 @@ def play_audio_nonblocking(text: str) -> None:
                 # 创建Opus解码器
                 decoder = opuslib.Decoder(AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS)
 
-                # 创建PyAudio实例
-                p = pyaudio.PyAudio()
-
-                # 打开音频输出流
-                stream = p.open(
-                    format=pyaudio.paInt16,
-                    channels=AudioConfig.CHANNELS,
+                # 从共享音频后端打开输出流
+                stream = get_audio_backend().open_stream(
+                    is_input=False,
                     rate=AudioConfig.OUTPUT_SAMPLE_RATE,
-                    output=True
+                    channels=AudioConfig.CHANNELS,
+                    frames_per_buffer=AudioConfig.OUTPUT_FRAME_SIZE
                 )
 
                 # 解码并播放每一帧
@@ -199,7 +196,6 @@ def play_audio_nonblocking(text: str) -> None:
                 # 清理资源
                 stream.stop_stream()
                 stream.close()
-                p.terminate()
 
                 logger.info(f"文本 \"{text}\" 已使用opus音频播放")
 
@@ -51,6 +51,76 @@ class ConfigManager:
                 "小美"
             ]
         },
+        "AUDIO_BACKEND": {
+            "TYPE": "portaudio",  # 可选值: portaudio, alsa, file, null
+            "INPUT_DEVICE": None,  # 设备索引或名称片段，None 使用默认设备
+            "OUTPUT_DEVICE": None,
+            "INPUT_FILE": None,  # file 后端回放的 WAV 文件
+            "OUTPUT_FILE": None,  # file 后端录制播放内容的 WAV 文件
+            "REALTIME": True,  # file/null 后端是否按实时节奏读写
+            "LOOP": True
+        },
+        "AUDIO_MIXER": {
+            "TTS_GAIN": 1.0,  # 各音源的增益
+            "MUSIC_GAIN": 1.0,
+            "NOTIFY_GAIN": 1.0,
+            "DUCK_GAIN": 0.2,  # TTS/提示音播放时音乐压低到的增益系数
+            "RAMP_MS": 30,  # 增益平滑过渡时间（毫秒）
+            "DUCK_HOLD_MS": 300,  # 语音结束后保持压低的时间（毫秒），避免句间音乐忽大忽小
+            "MUSIC_BUFFER_MS": 2000  # 音乐解码领先播放的最长时长（毫秒）
+        },
+        "SILENCE_GATE": {
+            "ENABLED": True,
+            "VAD_MODE": 2,
+            "SPEECH_RATIO": 0.3,
+            "HANGOVER_MS": 300,
+            "PREROLL_MS": 180,
+            "KEEPALIVE_MS": 400,
+            "ENDPOINT_MS": 800,
+            "MIN_SPEECH_MS": 200,
+            "RESPONSE_TIMEOUT_MS": 5000
+        },
+        "LATENCY_TRACE": {
+            "ENABLED": False,
+            "WINDOW_SIZE": 1000,
+            "OUTPUT_FILE": "logs/latency_trace.json"
+        },
+        "HOME_ASSISTANT": {
+            "POOL_SIZE": 10,  # 共享HTTP连接池大小
+            "TIMEOUT": 5,
+            "STATE_TTL": 2.0,  # 批量状态缓存有效期（秒）
+            "WEBSOCKET": True  # 订阅 state_changed 推送，在线期间不再轮询
+        },
+        "IOT_EXECUTOR": {
+            "MAX_WORKERS": 8,  # 不同设备的命令可并发执行的线程数
+            "DEFAULT_TIMEOUT": 10.0  # 单条命令超时（秒），0 表示不超时
+        },
+        "TIMER_SCHEDULER": {
+            "STORE_FILE": "cache/timers.db",  # 定时任务的 SQLite 存储位置
+            "MISSED_GRACE": 300,  # 停机期间错过的倒计时在多少秒内仍补执行
+            "LOOKAHEAD": 3600  # 只把未来多少秒内到期的任务载入内存
+        },
+        "HEADLESS": {
+            "SESSIONS": 1,  # 同一进程内的虚拟设备数
+            "TURNS": 3,  # 每个会话的对话轮数
+            "TURN_GAP": 1.0,  # 两轮之间的间隔（秒）
+            "RAMP_UP": 0.05,  # 相邻会话启动间隔（秒），避免同时建连
+            "TURN_TIMEOUT": 30.0
+        },
+        "MQTT_HUB": {
+            "BATCH_WINDOW": 0.05,  # 出站消息的批量收集窗口（秒）
+            "MAX_PENDING": 1000  # 每个连接断线期间最多保留的出站消息数
+        },
+        "MUSIC_PLAYER": {
+            "STREAM_PREBUFFER": 262144,  # 边下边播时缓冲多少字节后开始播放
+            "STREAM_START_TIMEOUT": 10,  # 等待首段缓冲的最长时间（秒）
+            "CACHE_MAX_BYTES": 536870912,  # 音乐缓存容量上限（字节），超出按 LRU 淘汰
+            "SEARCH_TTL": 86400,  # 搜索结果缓存时间（秒）
+            "SEARCH_CANDIDATES": 10,  # 每次搜索取回并排序的候选歌曲数
+            "PLAY_URL_TTL": 1200,  # 播放链接缓存时间（秒），链接会过期
+            "LYRICS_TTL": 604800,  # 歌词缓存时间（秒）
+            "PREFETCH_COUNT": 2  # 播放时在后台预取播放队列中接下来的几首
+        },
         "TEMPERATURE_SENSOR_MQTT_INFO": {
             "endpoint": "你的Mqtt连接地址",
             "port": 1883,
@@ -64,6 +134,16 @@ class ConfigManager:
             "frame_width": 640,
             "frame_height": 480,
             "fps": 30,
+            "preview": False,  # 是否显示预览窗口
+            "idle_after": 10,  # 多少秒没有识别请求后降低采集档位
+            "idle_fps": 2,  # 空闲时的采集帧率
+            "idle_frame_width": 0,  # 空闲时的分辨率，0 表示不降低分辨率
+            "idle_frame_height": 0,
+            "vl_max_side": 1024,  # 上传给视觉模型的图片最长边（像素）
+            "vl_format": "jpeg",  # 上传图片格式: jpeg, webp
+            "vl_quality": 80,  # 上传图片的压缩质量
+            "vl_cache_distance": 6,  # 画面感知哈希相差不超过多少位时复用识别结果
+            "vl_cache_ttl": 300,  # 识别结果复用的有效期（秒）
             "Loacl_VL_url": "https://open.bigmodel.cn/api/paas/v4/",
             "VLapi_key": "你自己的key",
             "models": "glm-4v-plus"
@@ -0,0 +1,191 @@
+import collections
+import json
+import threading
+import time
+from pathlib import Path
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TraceStage:
+    """逐帧计时的流水线阶段"""
+    CAPTURE_READ = "capture_read"    # 从采集设备读取一帧
+    ENCODE = "encode"                # Opus编码
+    SEND_AUDIO = "send_audio"        # 从入队到协议层发送完成
+    DECODE = "decode"                # Opus解码
+    DEVICE_WRITE = "device_write"    # 写入播放设备
+
+
+class TraceEvent:
+    """一轮对话中的事件，均相对于用户说完话的时刻计时"""
+    SPEECH_END = "speech_end"            # 本地结束监听（端点/手动停止）
+    STT = "stt"                          # 收到服务器stt消息
+    TTS_START = "tts_start"              # 收到服务器tts start消息
+    FIRST_DOWNLINK = "first_downlink"    # 收到第一个下行音频包
+    FIRST_WRITE = "first_write"          # 第一块TTS音频写入播放设备
+
+
+class LatencyStats:
+    """固定窗口的耗时统计（毫秒）"""
+
+    def __init__(self, window_size=1000):
+        self.samples = collections.deque(maxlen=window_size)
+        self.count = 0
+
+    def add(self, value_ms):
+        self.samples.append(value_ms)
+        self.count += 1
+
+    def percentile(self, ordered, p):
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "p50": round(self.percentile(ordered, 50), 3),
+            "p95": round(self.percentile(ordered, 95), 3),
+            "p99": round(self.percentile(ordered, 99), 3),
+            "max": round(ordered[-1], 3) if ordered else 0.0,
+        }
+
+
+class LatencyTracer:
+    """音频链路延迟追踪器 - 单例模式
+
+    默认关闭，通过配置 LATENCY_TRACE.ENABLED 开启。开启后：
+    - 各阶段用单调时钟计时，按阶段统计 p50/p95/p99；
+    - 以用户说完话（或最后一个上行音频包）为起点，统计 stt、tts start、
+      首个下行包、首次写入播放设备的延迟；
+    - 退出时把统计结果写入 LATENCY_TRACE.OUTPUT_FILE，CLI 下可用 p 命令查看。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """获取单例实例"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        config = ConfigManager.get_instance()
+        self.enabled = config.get_config("LATENCY_TRACE.ENABLED", False)
+        self.window_size = config.get_config("LATENCY_TRACE.WINDOW_SIZE", 1000)
+        output_file = Path(config.get_config(
+            "LATENCY_TRACE.OUTPUT_FILE", "logs/latency_trace.json"))
+        if not output_file.is_absolute():
+            output_file = Path(__file__).parent.parent.parent / output_file
+        self.output_file = output_file
+
+        self._stats_lock = threading.Lock()
+        self.stages = {}
+        self.events = {}
+
+        # 当前一轮对话的起点和已记录的事件
+        self._turn_origin = None
+        self._turn_seen = set()
+        self._last_uplink = None
+
+        if self.enabled:
+            logger.info(f"延迟追踪已开启，结果将写入: {self.output_file}")
+
+    @staticmethod
+    def now():
+        """单调时钟时间戳（秒）"""
+        return time.monotonic()
+
+    def _add(self, table, name, value_ms):
+        with self._stats_lock:
+            stats = table.get(name)
+            if stats is None:
+                stats = table[name] = LatencyStats(self.window_size)
+            stats.add(value_ms)
+
+    def record(self, stage, start):
+        """记录一个阶段从 start 到现在的耗时"""
+        if not self.enabled or start is None:
+            return
+        self._add(self.stages, stage, (time.monotonic() - start) * 1000)
+
+    def mark_uplink(self):
+        """记录最后一个上行音频包的时间（服务器端判停时作为对话起点）"""
+        if self.enabled:
+            self._last_uplink = time.monotonic()
+
+    def mark(self, event):
+        """记录一轮对话中的事件，同一轮中每个事件只记录第一次"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._stats_lock:
+            if event == TraceEvent.SPEECH_END:
+                self._turn_origin = now
+                self._turn_seen.clear()
+                return
+            if self._turn_origin is None:
+                # 服务器端判停时没有本地端点，以最后一个上行包为起点
+                if self._last_uplink is None:
+                    return
+                self._turn_origin = self._last_uplink
+                self._turn_seen.clear()
+            if event in self._turn_seen:
+                return
+            self._turn_seen.add(event)
+            origin = self._turn_origin
+        self._add(self.events, event, (now - origin) * 1000)
+
+    def end_turn(self):
+        """结束当前一轮对话（重新进入监听时调用）"""
+        if not self.enabled:
+            return
+        with self._stats_lock:
+            self._turn_origin = None
+            self._turn_seen.clear()
+            self._last_uplink = None
+
+    def get_summary(self):
+        """获取各阶段和事件的统计结果"""
+        with self._stats_lock:
+            return {
+                "stages": {name: stats.summary() for name, stats in self.stages.items()},
+                "events": {name: stats.summary() for name, stats in self.events.items()},
+            }
+
+    def format_summary(self):
+        """格式化统计结果，用于命令行显示"""
+        if not self.enabled:
+            return "延迟追踪未开启（配置 LATENCY_TRACE.ENABLED）"
+        summary = self.get_summary()
+        lines = [f"{'阶段/事件':<16}{'次数':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"]
+        for section in ("stages", "events"):
+            for name, item in summary[section].items():
+                lines.append(
+                    f"{name:<16}{item['count']:>8}{item['p50']:>10.1f}"
+                    f"{item['p95']:>10.1f}{item['p99']:>10.1f}{item['max']:>10.1f}"
+                )
+        return "\n".join(lines)
+
+    def dump(self):
+        """将统计结果写入文件"""
+        if not self.enabled:
+            return
+        try:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            self.output_file.write_text(
+                json.dumps(self.get_summary(), ensure_ascii=False, indent=2),
+                encoding="utf-8"
+            )
+            logger.info(f"延迟统计已写入: {self.output_file}")
+        except Exception as e:
+            logger.error(f"写入延迟统计失败: {e}")